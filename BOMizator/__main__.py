@@ -30,6 +30,7 @@ Entry point for bomizator
 """
 
 import sys
+import argparse
 from PyQt5.QtCore import QT_VERSION_STR
 from PyQt5.Qt import PYQT_VERSION_STR
 from PyQt5 import QtWidgets, QtCore
@@ -42,6 +43,16 @@ def main(args=None):
     """The main routine."""
     if args is None:
         args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        description="Assigns suppliers to the components of KiCad\
+ project")
+    parser.add_argument("project", nargs='?', default='',
+                        help="KiCad project file or its directory")
+    parser.add_argument("--profile", metavar="DIRECTORY",
+                        help="dump profiles of opening, saving and\
+ exporting the project into directory")
+    # the rest of arguments belongs to Qt
+    options, _ = parser.parse_known_args(args)
 
     print("ENVIRONMENT INFORMATION:")
     print("Running using python", sys.version)
@@ -54,12 +65,8 @@ def main(args=None):
     QtCore.QCoreApplication.setOrganizationName("dejfson")
     QtCore.QCoreApplication.setOrganizationDomain("github.com/dejfson")
     QtCore.QCoreApplication.setApplicationName("bomizator")
-    try:
-        project = args[0]
-    except IndexError:
-        project = ''
-
-    myWindow = BOMizator(project)
+    myWindow = BOMizator(options.project,
+                         profileDirectory=options.profile)
     myWindow.show()
     app.exec_()
 
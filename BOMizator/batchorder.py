@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Consolidated order of several projects (e.g. boards assembled into a
+panel). The projects are parsed in parallel processes, their amounts
+are summed per supplier and ordering code and rounded afterwards
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from .headernames import headernames
+from .projectparser import loadProject
+from .orderlist import orderList
+from .roundingpolicy import roundingPolicy
+
+
+def collectProject(job):
+    """ parses single project and returns its quantities (see
+    orderList.getQuantities). This is the function run by the worker
+    processes. Job is a tuple (project file, multiplier,
+    includeDisabledComponents, includeDoNotOrder)
+    """
+    projectFile, multiplier, includeDisabled, includeDoNotOrder = job
+    return orderList(loadProject(projectFile), multiplier).getQuantities(
+        includeDisabled,
+        includeDoNotOrder)
+
+
+class batchOrder(object):
+    """ takes list of tuples (project file, multiplier) and produces
+    single order of all of them. Multiplier overrides the global
+    multiplier of the project, None keeps the one of the project
+    """
+
+    def __init__(self, projects, workers=1):
+        self.header = headernames()
+        self.projects = projects
+        self.workers = workers
+
+    def getOrder(self, includeDisabledComponents=False,
+                 includeDoNotOrder=False):
+        """ parses all the projects and returns their consolidated
+        order in the same form as orderList.getOrder
+        """
+        jobs = [(projectFile,
+                 multiplier,
+                 includeDisabledComponents,
+                 includeDoNotOrder)
+                for projectFile, multiplier in self.projects]
+        if self.workers > 1 and len(jobs) > 1:
+            # map returns the results in the order of the projects,
+            # hence the order does not depend on the workers
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                quantities = list(pool.map(collectProject, jobs))
+        else:
+            quantities = list(map(collectProject, jobs))
+        names = self.getNames([projectFile
+                               for projectFile, _ in self.projects])
+        return self.merge(zip(names, quantities))
+
+    def getNames(self, projectFiles):
+        """ returns list of the names of the projects prefixing their
+        designators. The name is the shortest suffix of the project
+        path (without extension) distinguishing it from the other
+        projects, e.g. panel/main and test/main for two projects
+        main.pro. Project listed several times gets its index appended
+        to each of its names, e.g. main#1 and main#2
+        """
+        paths = [os.path.splitext(
+            os.path.abspath(projectFile))[0].split(os.sep)
+                 for projectFile in projectFiles]
+        names = []
+        for parts in paths:
+            others = [other for other in paths if other != parts]
+            for length in range(1, len(parts) + 1):
+                suffix = parts[-length:]
+                if all(map(lambda other: other[-length:] != suffix,
+                           others)):
+                    break
+            names.append('/'.join(suffix))
+        counts = dict((name, names.count(name)) for name in names)
+        indexes = dict((name, 0) for name in names)
+        for number, name in enumerate(names):
+            if counts[name] > 1:
+                indexes[name] += 1
+                names[number] = "%s#%d" % (name, indexes[name])
+        return names
+
+    def merge(self, projects):
+        """ merges quantities of the projects given as list of tuples
+        (project name, quantities). Amounts of the same supplier and
+        ordering code are summed and rounded by the coarsest rounding
+        policy of them. Manually entered totals are added after
+        rounding. Designators are prefixed by the project name (see
+        getNames)
+        """
+        merged = {}
+        for name, quantities in projects:
+            for supplier, item, amount, policy in quantities:
+                key = (supplier, item[self.header.SUPPNO])
+                try:
+                    entry = merged[key]
+                except KeyError:
+                    entry = {'item': OrderedDict(item),
+                             'amount': 0,
+                             'manual': 0,
+                             'policy': policy,
+                             'designators': []}
+                    merged[key] = entry
+                else:
+                    # descriptive data are taken from the first
+                    # project defining them
+                    for col, value in item.items():
+                        if not entry['item'][col]:
+                            entry['item'][col] = value
+                    entry['item'][self.header.DONOTORDER] =\
+                        entry['item'][self.header.DONOTORDER] or\
+                        item[self.header.DONOTORDER]
+                    entry['policy'] = max(entry['policy'], policy)
+                if amount is None:
+                    entry['manual'] += int(item[self.header.TOTAL])
+                else:
+                    entry['amount'] += amount
+                entry['designators'] += [
+                    "%s:%s" % (name, desig)
+                    for desig in item[self.header.DESIGNATORS]]
+
+        order = OrderedDict()
+        for supplier, ordercode in sorted(merged):
+            entry = merged[(supplier, ordercode)]
+            item = entry['item']
+            item[self.header.TOTAL] =\
+                roundingPolicy((entry['policy'], 0))(entry['amount']) +\
+                entry['manual']
+            item[self.header.DESIGNATORS] = entry['designators']
+            order.setdefault(supplier, []).append(item)
+        return order
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+implements base class for the storage of the BOM data of the project
+(multipliers, adders, rounding policies... per supplier and ordering
+code). The data are loaded and saved at once as dictionary of
+suppliers, ordering codes and their data. The storages are plugins
+named bomdata*access.py
+"""
+
+import os
+import imp
+import fnmatch
+
+localpath = os.path.dirname(os.path.realpath(__file__))
+
+# storage used for projects, which do not have BOM data stored yet
+DEFAULT_ACCESS_TYPE = "bomdatajsonaccess.py"
+
+
+class bomDataExceptionImplement(Exception):
+    pass
+
+
+class bomDataAccess(object):
+    """ defines base class for BOM data access. Does nothing except of
+    implementation of basic methods. The storage file is derived from
+    the project file by extension of the storage
+    """
+
+    # extension of the storage file replacing .pro extension
+    extension = None
+
+    def __init__(self, projectFile=None):
+        self.filename = None
+        if projectFile:
+            self.filename = os.path.splitext(projectFile)[0] +\
+                self.extension
+
+    def __str__(self):
+        return self.name() + " " + self.filename
+
+    def validate(self):
+        """ returns True if the storage of the project exists
+        """
+        return os.path.isfile(self.filename)
+
+    def load(self):
+        """ returns dictionary of all the BOM data
+        """
+        raise bomDataExceptionImplement("Load Not implemented")
+
+    def save(self, data):
+        """ replaces stored BOM data by data
+        """
+        raise bomDataExceptionImplement("Save Not implemented")
+
+    def name(self):
+        raise bomDataExceptionImplement("Name Not implemented")
+
+
+def getBOMDataAccessTypes():
+    """ returns dictionary of plugin filename and its class of all the
+    BOM data storages
+    """
+    plugins = {}
+    for filename in sorted(fnmatch.filter(os.listdir(localpath),
+                                          'bomdata*access.py')):
+        info = imp.load_source('', os.path.join(localpath,
+                                                filename)).DEFAULT_CLASS
+        if info:
+            plugins[filename] = info
+    return plugins
+
+
+def createBOMDataAccess(projectFile, accessType=None):
+    """ returns the BOM data storage of the project. If the project
+    already has BOM data stored in any of the storages, that one is
+    used. Otherwise accessType (plugin filename) selects the storage
+    """
+    plugins = getBOMDataAccessTypes()
+    for info in plugins.values():
+        access = info(projectFile)
+        if access.validate():
+            return access
+    return plugins[accessType or DEFAULT_ACCESS_TYPE](projectFile)
+
+
+# do not declare the default class name, as this is purely virtual
+# implementation
+DEFAULT_CLASS = None
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+implements storage of the BOM data in a single JSON document next to
+the project file
+"""
+from BOMizator.bomdataaccess import bomDataAccess
+import os
+import json
+
+
+class bomDataJSONAccess(bomDataAccess):
+
+    extension = ".bom.json"
+
+    def load(self):
+        """ loads and returns the BOM data from the file
+        """
+        with open(self.filename) as data_file:
+            return json.load(data_file)
+
+    def save(self, data):
+        """ writes the BOM data. Keys are sorted, hence the file
+        changes only where the data changed
+        """
+        # temporary file first, so the data are never left half
+        # written
+        with open(self.filename + "tmp", 'wt') as outfile:
+            json.dump(data, outfile, indent=1, sort_keys=True)
+        os.replace(self.filename + "tmp", self.filename)
+
+    def name(self):
+        return "JSON"
+
+
+DEFAULT_CLASS = bomDataJSONAccess
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+implements storage of the BOM data in SQLite database next to the
+project file
+"""
+from BOMizator.bomdataaccess import bomDataAccess
+import sqlite3
+
+
+class bomDataSQLiteAccess(bomDataAccess):
+
+    extension = ".bom.sqlite"
+
+    def connect(self):
+        """ opens the database, creating the table if needed. Each
+        row keeps a single value of an ordering code, SQLite keeps its
+        type (numbers vs. strings)
+        """
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE IF NOT EXISTS bomdata\
+ (supplier TEXT, ordercode TEXT, key TEXT, value,\
+ PRIMARY KEY (supplier, ordercode, key))")
+        return connection
+
+    def load(self):
+        """ loads and returns the BOM data in a single query
+        """
+        data = {}
+        connection = self.connect()
+        try:
+            for supplier, ordercode, key, value in connection.execute(
+                    "SELECT supplier, ordercode, key, value FROM bomdata"):
+                data.setdefault(supplier, {}).setdefault(
+                    ordercode, {})[key] = value
+        finally:
+            connection.close()
+        return data
+
+    def save(self, data):
+        """ replaces the BOM data in a single transaction
+        """
+        rows = [(supplier, ordercode, key, value)
+                for supplier, codes in data.items()
+                for ordercode, values in codes.items()
+                for key, value in values.items()]
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute("DELETE FROM bomdata")
+                connection.executemany(
+                    "INSERT INTO bomdata VALUES (?, ?, ?, ?)", rows)
+        finally:
+            connection.close()
+
+    def name(self):
+        return "SQLite"
+
+
+DEFAULT_CLASS = bomDataSQLiteAccess
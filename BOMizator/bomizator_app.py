@@ -49,6 +49,8 @@ from PyQt5 import QtGui, uic, QtCore, QtWidgets
 from .headers import headers
 from .qdesignatorsortmodel import QDesignatorSortModel
 from .qbommodel import QBOMModel
+from .qprojectloader import QProjectLoader
+from .stagetimer import stageTimer
 from .sch_parser import schParser
 from .qbomcomponentscache import QBOMComponentCache
 from .qbomitemmodel import QBOMItemModel
@@ -68,10 +70,13 @@ form_class = uic.loadUiType(os.path.join(localpath,
 
 class BOMizator(QtWidgets.QMainWindow, form_class):
 
-    def __init__(self, projectDirectory='', parent=None, flags=0):
+    def __init__(self, projectDirectory='', parent=None, flags=0,
+                 profileDirectory=None):
         """ Constructing small window with tree view of all components
     present in the schematics. Directory points to the KiCad project
-    directory containing .sch (they can be in sub-directories as well)
+    directory containing .sch (they can be in sub-directories as well).
+    When profileDirectory is given, the profiles of the long operations
+    are dumped there
         """
         global log
 
@@ -92,6 +97,10 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
         mwformatter = logging.Formatter('%(levelname)s - %(message)s')
         mw.setFormatter(mwformatter)
         self.logger.addHandler(mw)
+        # durations of the stages of long operations are logged and
+        # appended to the timing file next to the log
+        self.timer = stageTimer('bomizator-timing.jsonl',
+                                profileDirectory)
 
         self.isModified = False
         self.settings = QtCore.QSettings(self)
@@ -143,6 +152,7 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
         self.action_Preferences.triggered.connect(self.preferencesDialog)
         self.action_Components_Cache.triggered.connect(
             self.componentsCacheDialog)
+        self.action_Auto_assign.triggered.connect(self.autoAssignFromCache)
         # restore windows parameters
         self._readAndApplyWindowAttributeSettings()
         # update status for the first time
@@ -161,11 +171,18 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
                 # augment for pdf:
                 if not os.path.splitext(projdir)[-1]:
                     projdir += ".pdf"
-                order, additional = self.bomTree.getAllComponents()
-                self.reporters.generateBOM(self.bomExport.itemText(choice),
-                                           order,
-                                           projdir,
-                                           additional)
+                self.timer.begin("export_bom")
+                with self.timer.stage("collecting") as items:
+                    order, additional = self.bomTree.getAllComponents()
+                    items['suppliers'] = len(order)
+                    items['components'] = sum(map(len, order.values()))
+                with self.timer.stage("report"):
+                    self.reporters.generateBOM(
+                        self.bomExport.itemText(choice),
+                        order,
+                        projdir,
+                        additional)
+                self.timer.finish()
                 self.logger.info("Generated bill of material into %s"
                                  % (projdir,))
             self.bomExport.setCurrentIndex(0)
@@ -216,6 +233,13 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
                                    settingsCacheAccessType.itemData(
                                        mysettings.
                                        settingsCacheAccessType.currentIndex()))
+            self.settings.setValue("parserWorkers",
+                                   mysettings.settingsParserWorkers.value())
+            self.settings.setValue("bomDataAccessType",
+                                   mysettings.
+                                   settingsBOMDataAccessType.itemData(
+                                       mysettings.
+                                       settingsBOMDataAccessType.currentIndex()))
             self.reloadProject()
 
     def tabChanged(self, newidx):
@@ -223,16 +247,26 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
         with new model data
         """
         if self.tabWidget.tabText(newidx).upper().find("BOM") != -1:
+            # the BOM model is re-created only if the components or
+            # BOM data changed since it was built
+            state = (self.SCH, self.SCH.getRevision(),
+                     self.disabledComponentsHidden)
+            if getattr(self, 'bomTreeState', None) == state:
+                return
             # we have to re-create the new item model for BOM display
             # data
-            self.bomTree = QBOMItemModel(self.SCH,
-                                         self.disabledComponentsHidden,
-                                         self)
-            self.bomView.setModel(self.bomTree)
+            self.timer.begin("tabChanged")
+            with self.timer.stage("BOM model") as items:
+                self.bomTree = QBOMItemModel(self.SCH,
+                                             self.disabledComponentsHidden,
+                                             self)
+                self.bomView.setModel(self.bomTree)
+                items['suppliers'] = self.bomTree.rowCount()
             # and resize columns
-            self.bomView.expandAll()
-            for i in range(self.bomTree.columnCount()):
-                self.bomView.resizeColumnToContents(i)
+            with self.timer.stage("column resizing"):
+                self.bomView.expandAll()
+                for i in range(self.bomTree.columnCount()):
+                    self.bomView.resizeColumnToContents(i)
             # setup multiplier
             self.bomMultiplier.setText("%d" % (self.SCH.getGlobalMultiplier()))
             self.bomTree.modelModified.connect(self.modelModified)
@@ -240,15 +274,26 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
             # always shows 'export BOM'. User selects to perform the
             # action
             self.bomExport.setCurrentIndex(0)
+            # building the model fills in the missing totals, hence
+            # the revision is taken after
+            self.bomTreeState = (self.SCH, self.SCH.getRevision(),
+                                 self.disabledComponentsHidden)
+            self.timer.finish()
 
     def saveProject(self):
         """ this function generates the data out of all the components
         in the current data model, and passes these components to
         schematics parser to save
         """
-        self.SCH.save()
-        self.cCache.save()
+        self.timer.begin("saveProject")
+        with self.timer.stage("schematics") as items:
+            items['components'] = len(self.SCH.dirtyComponents)
+            items['sheets'] = len(self.SCH.getModifiedSheets())
+            self.SCH.save()
+        with self.timer.stage("components cache"):
+            self.cCache.save()
         self.modelModified(False)
+        self.timer.finish()
 
     def hideShowConsoleLog(self):
         """ enables/disables consolelog window
@@ -331,6 +376,8 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
                 # save data first
                 self.saveProject()
 
+        self.stopLoading()
+        self.cCache.close()
         event.accept()
         self._writeWindowAttributeSettings()
 
@@ -974,8 +1021,9 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
             # one theoretically, but we accept any number, i.e. when
             # subdirectory is given)
             for root, dirnames, filenames in os.walk(projectDirectory):
-                for filename in fnmatch.filter(filenames, '*.pro'):
-                    matches.append(os.path.join(root, filename))
+                for pattern in ['*.pro', '*.kicad_pro']:
+                    for filename in fnmatch.filter(filenames, pattern):
+                        matches.append(os.path.join(root, filename))
 
             if matches == []:
                 raise NoProjectGiven('Provided directory does not contain\
@@ -1040,7 +1088,8 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
 
     def openProject(self, projectDirectory=''):
         """ Opens directory search dialog, which asks for .pro file to
-        be used as project.  .pro is generated by kicad. It accepts as
+        be used as project.  .pro (.kicad_pro for KiCad 6+) is
+        generated by kicad. It accepts as
         well projectDirectory which can be directory pointing to
         project, or directly the project file. Returns none if no
         selection was done (cancelled dialog)
@@ -1054,7 +1103,7 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
                                                                "Open KiCad project",
                                                                '',
                                                                "Kicad\
- project file (*.pro)")
+ project file (*.pro *.kicad_pro)")
             if projdir:
                 canContinue = True
                 # we get directly the file
@@ -1066,11 +1115,37 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
             projectFile, projectDirectory = self.getProjectPaths(
                 projectDirectory)
 
-            # we have to find a single project file
-            self.SCH = schParser(projectFile)
-            self.SCH.parseComponents()
-            self.cCache = QBOMComponentCache(
-                self.generateCacheAccess(projectDirectory))
+            # we have to find a single project file. If it is the same
+            # as the one already opened (project reload), we just let
+            # the parser to re-read the files which changed
+            # loading of previous project (if any) is stopped first
+            self.stopLoading()
+            # the operation finishes when the project loader finishes
+            self.timer.begin("openProject")
+            oldSCH = getattr(self, 'SCH', None)
+            workers = self.settings.value("parserWorkers", 1, int)
+            with self.timer.stage("project settings"):
+                if oldSCH and os.path.realpath(oldSCH.projectFile) ==\
+                   os.path.realpath(projectFile):
+                    self.SCH.workers = workers
+                    self.SCH.reloadSettings()
+                else:
+                    self.SCH = schParser(
+                        projectFile,
+                        workers=workers,
+                        bomDataAccessType=self.settings.value(
+                            "bomDataAccessType", None, str))
+                    self.SCH.timer = self.timer
+            # components are merged one sheet after another as the
+            # sheets get parsed by the project loader
+            self.SCH.clearComponents()
+            with self.timer.stage("components cache"):
+                if getattr(self, 'cCache', None):
+                    # pending operations (e.g. git commit) of the
+                    # previous cache finish in background
+                    self.cCache.close(wait=False)
+                self.cCache = QBOMComponentCache(
+                    self.generateCacheAccess(projectDirectory))
             self.cCache.addedComponentIntoCache.connect(self.logCache)
             # generate new schematic parser
             self.model = QBOMModel(self.SCH,
@@ -1106,14 +1181,10 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
                 bool)
             self.action_Show_console_log.setChecked(cVisible)
 
-            self.model.fillModel(self.SCH.getDisabledDesignators(),
-                                 self.disabledComponentsHidden)
-            # as the model is filled with the data, we can resize columns
-            for i in range(len(self.header)):
-                self.treeView.resizeColumnToContents(i)
-
             self.projectDirectory = projectDirectory
             self.modelModified(False)
+            # the model is filled with the data by the project loader
+            self.startLoading()
 
         # if projectfile exists, we better return this as it helps us
         # to determine exactly what .pro file user wants (otherwise we
@@ -1126,6 +1197,86 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
         except UnboundLocalError:
             return projectDirectory
 
+    def startLoading(self):
+        """ starts parsing of the project schematic files in the
+        background. The model is filled by the components of each
+        sheet as soon as the sheet is parsed. The progress is shown
+        in a dialog, which allows to cancel the loading
+        """
+        self.loader = QProjectLoader(self.SCH, self)
+        # signals still queued from a stopped loader are recognised by
+        # the loader they come from
+        self.loader.sheetParsed.connect(
+            partial(self.sheetParsed, self.loader))
+        self.loader.finished.connect(
+            partial(self.loadingFinished, self.loader))
+        self.progress = QtWidgets.QProgressDialog(
+            self.tr("Loading project ..."),
+            self.tr("Cancel"), 0, 0, self)
+        self.progress.setWindowModality(QtCore.Qt.NonModal)
+        self.progress.setMinimumDuration(500)
+        self.progress.canceled.connect(self.loader.cancel)
+        # project cannot be saved nor its BOM shown until all the
+        # components are known
+        self.setProjectLoaded(False)
+        self.loader.start()
+
+    def stopLoading(self):
+        """ cancels the project loading (if running) and waits until
+        the loader finishes
+        """
+        loader = getattr(self, 'loader', None)
+        if loader and loader.isRunning():
+            loader.cancel()
+            loader.wait()
+            self.progress.reset()
+
+    def sheetParsed(self, loader, fname, number, count):
+        """ merges the components of just parsed sheet into the
+        project and shows them in the model
+        """
+        if loader is not self.loader:
+            return
+        with self.timer.stage("model filling") as items:
+            added = self.SCH.mergeSheet(fname)
+            self.model.appendComponents(added,
+                                        self.SCH.getDisabledDesignators(),
+                                        self.disabledComponentsHidden)
+            items['components'] = len(added)
+        self.progress.setMaximum(count)
+        self.progress.setValue(number)
+        self.treeSelection()
+
+    def loadingFinished(self, loader):
+        """ called when the project loader finishes. If the loading
+        was cancelled or failed, the project stays incomplete and
+        cannot be saved until reloaded
+        """
+        if loader is not self.loader:
+            return
+        self.progress.reset()
+        # as the model is filled with the data, we can resize columns
+        with self.timer.stage("column resizing"):
+            for i in range(len(self.header)):
+                self.treeView.resizeColumnToContents(i)
+        if loader.completed:
+            self.setProjectLoaded(True)
+        else:
+            self.logger.warning(self.tr(
+                "Project not loaded completely, reload it to be able\
+ to save it"))
+        self.treeSelection()
+        self.timer.finish()
+
+    def setProjectLoaded(self, loaded):
+        """ enables the actions, which need all the components of the
+        project
+        """
+        self.action_Save.setEnabled(loaded)
+        self.action_Auto_assign.setEnabled(loaded)
+        self.tabWidget.setTabEnabled(
+            self.tabWidget.indexOf(self.tab_bom), loaded)
+
     def droppedData(self, data, row, column):
         """ catches when data are dropped into the model. Data have to
         be textual and will be parsed by one of the suppliers strings.
@@ -1168,6 +1319,45 @@ class BOMizator(QtWidgets.QMainWindow, form_class):
         aa = self.proxy.mapToSource(self.treeView.selectedIndexes()[0])
         self.droppedData(cmpData, aa.row(), aa.column())
 
+    def autoAssignFromCache(self):
+        """ assigns the components from the cache to all the enabled
+        components, which do not have any data assigned yet. The
+        components are grouped by libref/value/footprint, each group is
+        looked up in the cache once and all the groups found are
+        assigned by single update of the model. Components having more
+        candidates in the cache are left to the user to choose from the
+        context menu. The summary is logged at the end
+        """
+        self.timer.begin("autoAssignFromCache")
+        with self.timer.stage("lookup") as items:
+            groups = self.model.getUnassignedComponents()
+            hits, ambiguous, misses = self.cCache.resolveComponents(
+                groups.keys())
+            items['components'] = sum(map(len, groups.values()))
+            items['unique'] = len(groups)
+        with self.timer.stage("assignment") as items:
+            self.model.assignComponents(
+                [(groups[key], data) for key, data in hits.items()])
+            # components found by their normalised libref/value/footprint
+            # are stored under their own key, the same as when the data
+            # are filled from the context menu
+            for key, data in hits.items():
+                self.cCache.storeComponents(
+                    [dict(zip(self.header.UNIQUEITEM, key))], data)
+            items['components'] = sum(len(groups[key]) for key in hits)
+        for key in sorted(ambiguous):
+            self.logger.info("%d components in cache for %s" %
+                             (len(ambiguous[key]), "/".join(key)))
+        self.logger.info(self.tr(
+            "Auto-assignment from cache: %d assigned, %d ambiguous, %d\
+ not found (%d, %d and %d unique components)") % (
+                sum(len(groups[key]) for key in hits),
+                sum(len(groups[key]) for key in ambiguous),
+                sum(len(groups[key]) for key in misses),
+                len(hits), len(ambiguous), len(misses)))
+        self.treeSelection()
+        self.timer.finish()
+
     def enableProxyItems(self, enable):
         """ looks for all selected items in proxy, maps them into base
         and enables/disables as needed. This function is called from
@@ -27,12 +27,21 @@
 
 """
 implements FILE access to the cache. Hence load/save operations over
-the cache file
+the cache file. The data of each component are stored only once in
+the table indexed by their hash, the libref/value/footprint index
+refers to them by the hash. Popular components used for many
+libref/value/footprint combinations are hence not repeated in the
+file, and the components loaded share the same data dictionary
 """
 from BOMizator.cacheioaccess import cacheIOAccess
 import os
 import json
 
+# version of the file format. Version 1 (no version in the file)
+# repeated the data under each libref/value/footprint, version 2
+# keeps table of the data indexed by hash
+FORMAT_VERSION = 2
+
 
 class cacheFileAccess(cacheIOAccess):
 
@@ -50,14 +59,19 @@ class cacheFileAccess(cacheIOAccess):
     def load(self):
         """ loads and returns the cache from the file
         """
+        return self.read()[0]
+
+    def read(self):
+        """ returns tuple (data, components) read from the file, see
+        unpack
+        """
         # load the complete dictionary if exists. (either in
         # project directory, or if generally specified)
         try:
             with open(self.filename) as data_file:
-                componentsCache = json.load(data_file)
+                return self.unpack(json.load(data_file))
         except FileNotFoundError:
-            componentsCache = {}
-        return componentsCache
+            return {}, {}
 
     def create(self, fname):
         self.filename = fname
@@ -67,7 +81,60 @@ class cacheFileAccess(cacheIOAccess):
         """ saves the cache to the disk
         """
         with open(self.filename, 'wt') as outfile:
-            json.dump(data, outfile)
+            json.dump(self.pack(data), outfile)
+
+    def pack(self, data):
+        """ returns the content of the file for the cache data: table
+        {hash: data} of the components and the index libref -> value
+        -> footprint -> [hashes]
+        """
+        index = {}
+        for libref, values in data.items():
+            for value, footprints in values.items():
+                for footprint, hashes in footprints.items():
+                    index.setdefault(libref, {}).setdefault(
+                        value, {})[footprint] = sorted(hashes)
+        return {"version": FORMAT_VERSION,
+                "components": self.getComponents(data),
+                "index": index}
+
+    def getComponents(self, data):
+        """ returns table {hash: data} of all the components of the
+        cache data
+        """
+        return {cmphash: cmpdata
+                for values in data.values()
+                for footprints in values.values()
+                for hashes in footprints.values()
+                for cmphash, cmpdata in hashes.items()}
+
+    def unpack(self, content):
+        """ returns tuple (data, components) of the cache data libref
+        -> value -> footprint -> hash -> data and the table {hash: data}
+        from the content of the file. The components having the same
+        hash share the same data dictionary
+        """
+        if not isinstance(content.get("version"), int):
+            # version 1 file, the data are repeated
+            components = {}
+            for values in content.values():
+                for footprints in values.values():
+                    for hashes in footprints.values():
+                        for cmphash, cmpdata in hashes.items():
+                            hashes[cmphash] = components.setdefault(
+                                cmphash, cmpdata)
+            return content, components
+        if content["version"] > FORMAT_VERSION:
+            raise ValueError("Components cache %s has unsupported version\
+ %d" % (self.filename, content["version"]))
+        components = content["components"]
+        return {libref: {value: {footprint: {cmphash: components[cmphash]
+                                             for cmphash in hashes}
+                                 for footprint, hashes in
+                                 footprints.items()}
+                         for value, footprints in values.items()}
+                for libref, values in content["index"].items()},\
+            components
 
     def name(self):
         return "File"
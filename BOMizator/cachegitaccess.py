@@ -26,15 +26,384 @@
 #
 
 """
-implements GIT access to the cache file. Hence even if the cache is
-about to be loaded/saved, git operation takes place first to fetch the
-newest or commit the oldest
+implements GIT access to the cache file. The cache file lives in a git
+working copy. When the cache is loaded, the changes of the upstream
+repository (local directory or file:// URL configured as upstream of
+the current branch) are pulled, when saved, the cache is committed
+and pushed. All git operations run in a background thread, hence the
+application never waits for them: the cache is loaded from the
+working copy and the components pulled later are merged into the
+cache in memory when they arrive. Saves following each other within
+COMMIT_DELAY seconds are committed together. Concurrent changes of the
+cache in different repositories are merged per component, hence they
+never conflict
 """
 from BOMizator.cachefileaccess import cacheFileAccess
+from concurrent.futures import ThreadPoolExecutor
+import os
+import json
+import logging
+import threading
+import subprocess
+
+# number of seconds the commit is delayed after the save, all the
+# saves done in the meantime get into the same commit
+COMMIT_DELAY = 5.0
+# number of attempts to push when the upstream changes in the meantime
+PUSH_ATTEMPTS = 3
+
+# git operations of all the caches run one after another in a single
+# background thread, hence the operations still pending for a closed
+# cache do not interfere with the cache of the same working copy
+# opened next. The thread is joined when the application exits
+executor = None
+# locks of the working copies (by directory) protecting the cache
+# files and the working copies, which are touched by the application
+# and the background thread
+locks = {}
+locksLock = threading.Lock()
 
 
 class cacheGitAccess(cacheFileAccess):
 
+    def __init__(self, fname=None):
+        super(cacheGitAccess, self).__init__(fname)
+        self.logger = logging.getLogger('bomizator')
+        self.commitDelay = COMMIT_DELAY
+        self.timer = None
+        self.identity = None
+        # entries {(libref, value, footprint, hash): data} of the cache
+        # as it was given to the application. The changes done by the
+        # application are the difference of its cache to these
+        self.base = {}
+
+    def __str__(self):
+        return "git " + self.filename
+
+    @property
+    def lock(self):
+        """ lock of the working copy the cache file is in
+        """
+        with locksLock:
+            return locks.setdefault(self.getDirectory(), threading.RLock())
+
+    def getDirectory(self):
+        """ returns the directory of the cache file, all git commands
+        are executed there
+        """
+        return os.path.dirname(os.path.abspath(self.filename))
+
+    def getPath(self):
+        """ returns the path of the cache file relative to the current
+        directory of git commands, usable in revision:path notation
+        """
+        return "./" + os.path.basename(self.filename)
+
+    def getFullPath(self):
+        """ returns the path of the cache file relative to the top
+        directory of the working copy, as listed by git
+        """
+        return self.git("rev-parse", "--show-prefix").stdout.strip() +\
+            os.path.basename(self.filename)
+
+    def git(self, *args, check=True):
+        """ executes git command and returns the completed process
+        with the output decoded. CalledProcessError is raised if the
+        command fails and check is set
+        """
+        return subprocess.run(("git", ) + self.getIdentity() + args,
+                              cwd=self.getDirectory(),
+                              stdin=subprocess.DEVNULL,
+                              stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE,
+                              encoding="utf-8",
+                              check=check)
+
+    def getIdentity(self):
+        """ returns git options providing the identity of the commits
+        if the user did not configure it
+        """
+        if self.identity is None:
+            self.identity = ()
+            if subprocess.run(("git", "config", "user.email"),
+                              cwd=self.getDirectory(),
+                              stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode:
+                self.identity = ("-c", "user.name=BOMizator",
+                                 "-c", "user.email=bomizator@localhost")
+        return self.identity
+
+    def validate(self):
+        """ returns true if the cache file exists in a git working copy
+        """
+        if not os.path.isfile(self.filename):
+            return False
+        try:
+            return self.git("rev-parse", "--is-inside-work-tree",
+                            check=False).stdout.strip() == "true"
+        except OSError:
+            # git is not installed
+            return False
+
+    def create(self, fname):
+        """ initializes git repository in the directory of the cache
+        file, unless the directory is already in a working copy
+        """
+        self.filename = fname
+        os.makedirs(self.getDirectory(), exist_ok=True)
+        if self.git("rev-parse", "--is-inside-work-tree",
+                    check=False).returncode:
+            self.git("init", "--quiet")
+
+    def load(self):
+        """ loads the cache from the working copy and pulls the
+        upstream changes in background
+        """
+        with self.lock:
+            data = super(cacheGitAccess, self).load()
+            self.base = self.getEntries(data)
+        self.getExecutor().submit(self.synchronise)
+        return data
+
+    def save(self, data):
+        """ saves the cache into the working copy, the changes pulled
+        since the cache was loaded are kept. The commit is scheduled
+        """
+        with self.lock:
+            current = self.getEntries(super(cacheGitAccess, self).load())
+            entries = self.mergeEntries(self.base,
+                                        self.getEntries(data),
+                                        current)
+            self.write(self.getCache(entries))
+            # the components pulled are not in the application cache
+            # until merged, hence they stay the changes of theirs
+            self.base = self.getEntries(data)
+            if self.timer is None:
+                self.timer = threading.Timer(self.commitDelay,
+                                             self.getExecutor().submit,
+                                             (self.synchronise, ))
+                self.timer.daemon = True
+                self.timer.start()
+
+    def merge(self, data):
+        """ returns the cache data merged with the changes pulled
+        since the cache was loaded
+        """
+        with self.lock:
+            current = self.getEntries(super(cacheGitAccess, self).load())
+            entries = self.mergeEntries(self.base,
+                                        self.getEntries(data),
+                                        current)
+            # the changes of the application are still to be saved,
+            # hence they are compared to the working copy
+            self.base = current
+        return self.getCache(entries)
+
+    def write(self, data):
+        """ writes the cache file. Indented file keeps the commits
+        small and readable
+        """
+        with open(self.filename, 'wt') as outfile:
+            json.dump(self.pack(data), outfile, indent=1, sort_keys=True)
+            outfile.write("\n")
+
+    def getEntries(self, data):
+        """ returns dictionary {(libref, value, footprint, hash): data}
+        of all the components of the cache
+        """
+        return {(libref, value, footprint, cmphash): cmpdata
+                for libref, values in data.items()
+                for value, footprints in values.items()
+                for footprint, components in footprints.items()
+                for cmphash, cmpdata in components.items()}
+
+    def getCache(self, entries):
+        """ returns the cache made of entries, the components having
+        the same hash share the data
+        """
+        data = {}
+        components = {}
+        for (libref, value, footprint, cmphash), cmpdata in\
+                entries.items():
+            data.setdefault(libref, {}).setdefault(
+                value, {}).setdefault(footprint, {})[cmphash] =\
+                components.setdefault(cmphash, cmpdata)
+        return data
+
+    def mergeEntries(self, base, ours, theirs):
+        """ three-way merge of the entries. The components added,
+        changed and removed in ours since the base are applied to
+        theirs
+        """
+        merged = dict(theirs)
+        for entry in base.keys() - ours.keys():
+            merged.pop(entry, None)
+        for entry, cmpdata in ours.items():
+            if base.get(entry) != cmpdata:
+                merged[entry] = cmpdata
+        return merged
+
+    def getExecutor(self):
+        """ returns executor running the git operations
+        """
+        global executor
+        with locksLock:
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=1)
+            return executor
+
+    def getUpstream(self):
+        """ returns tuple (remote, branch) the current branch is
+        tracking or None if there is none
+        """
+        branch = self.git("symbolic-ref", "--quiet", "--short", "HEAD",
+                          check=False).stdout.strip()
+        remote = self.git("config", "branch.%s.remote" % (branch, ),
+                          check=False).stdout.strip()
+        merge = self.git("config", "branch.%s.merge" % (branch, ),
+                         check=False).stdout.strip()
+        if not (branch and remote and merge):
+            return None
+        return remote, merge
+
+    def isAncestor(self, ancestor, revision):
+        """ returns true if the ancestor revision is reachable from the
+        revision
+        """
+        return not self.git("merge-base", "--is-ancestor", ancestor,
+                            revision, check=False).returncode
+
+    def show(self, revision):
+        """ returns entries of the cache file in the revision, empty
+        when the file or the revision does not exist
+        """
+        shown = self.git("show", "%s:%s" % (revision, self.getPath()),
+                         check=False)
+        if shown.returncode:
+            return {}
+        return self.getEntries(self.unpack(json.loads(shown.stdout))[0])
+
+    def commit(self, message="Update components cache", merge=False):
+        """ commits the cache file if it changed or if the merge is
+        being concluded. Returns true if the commit was made
+        """
+        if not os.path.isfile(self.filename):
+            return False
+        self.git("add", "--", self.getPath())
+        if merge:
+            # merge is concluded with all the files merged
+            self.git("commit", "--quiet", "--no-verify", "-m", message)
+            return True
+        if not self.git("diff", "--cached", "--quiet", "--",
+                        self.getPath(), check=False).returncode:
+            return False
+        # other changes staged by the user are not committed
+        self.git("commit", "--quiet", "--no-verify", "-m", message,
+                 "--only", "--", self.getPath())
+        return True
+
+    def fetch(self, remote, branch):
+        """ fetches the upstream branch into FETCH_HEAD. Returns false
+        if the branch does not exist yet (e.g. empty remote repository)
+        """
+        if self.git("ls-remote", "--exit-code", remote, branch,
+                    check=False).returncode == 2:
+            return False
+        self.git("fetch", "--quiet", remote, branch)
+        return True
+
+    def pull(self):
+        """ merges the fetched upstream into the working copy. Returns
+        true if the cache file changed
+        """
+        with self.lock:
+            self.commit()
+            if self.isAncestor("FETCH_HEAD", "HEAD"):
+                return False
+            if self.git("rev-parse", "--verify", "--quiet", "HEAD",
+                        check=False).returncode or\
+               self.isAncestor("HEAD", "FETCH_HEAD"):
+                self.git("merge", "--quiet", "--ff-only", "FETCH_HEAD")
+                return True
+            # both sides changed. The other files of the repository
+            # are merged by git, the cache is merged per component (git
+            # would merge the lines of the file and produce conflicts)
+            base = self.git("merge-base", "HEAD",
+                            "FETCH_HEAD").stdout.strip()
+            entries = self.mergeEntries(self.show(base),
+                                        self.show("HEAD"),
+                                        self.show("FETCH_HEAD"))
+            self.git("merge", "--quiet", "--no-commit", "--no-ff",
+                     "FETCH_HEAD", check=False)
+            conflicts = set(self.git("diff", "--name-only",
+                                     "--diff-filter=U").stdout.split("\n"))
+            conflicts -= {"", self.getFullPath()}
+            if conflicts:
+                self.git("merge", "--abort")
+                raise ValueError("upstream changes conflict in %s" %
+                                 (', '.join(sorted(conflicts)), ))
+            self.write(self.getCache(entries))
+            self.commit("Merge components cache", merge=True)
+            return True
+
+    def synchronise(self):
+        """ commits the saved cache, merges the upstream changes and
+        pushes the result. Runs in the background thread
+        """
+        with self.lock:
+            self.timer = None
+        try:
+            with self.lock:
+                self.commit()
+            upstream = self.getUpstream()
+            if upstream is None:
+                return
+            remote, branch = upstream
+            for attempt in range(PUSH_ATTEMPTS):
+                fetched = self.fetch(remote, branch)
+                if fetched:
+                    if self.pull() and self.listener is not None:
+                        self.listener()
+                    if self.isAncestor("HEAD", "FETCH_HEAD"):
+                        return
+                elif self.git("rev-parse", "--verify", "--quiet", "HEAD",
+                              check=False).returncode:
+                    # nothing committed on either side yet
+                    return
+                # rejected push means that upstream changed after the
+                # fetch, hence we merge once more
+                if not self.git("push", "--quiet", remote,
+                                "HEAD:" + branch, check=False).returncode:
+                    return
+            self.logger.warning("Components cache was not pushed to %s,\
+ upstream changes too often" % (remote, ))
+        except subprocess.CalledProcessError as e:
+            self.logger.warning("Git operation on components cache\
+ failed: %s" % (e.stderr.strip() or e, ))
+        except (OSError, ValueError) as e:
+            self.logger.warning("Git operation on components cache\
+ failed: %s" % (e, ))
+
+    def flush(self, wait=True):
+        """ runs the scheduled commit immediately. If wait is set, it
+        waits until all git operations finish
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+                self.getExecutor().submit(self.synchronise)
+        if wait:
+            self.getExecutor().submit(lambda: None).result()
+
+    def close(self, wait=True):
+        """ finishes all git operations, the pending commit is done.
+        Without wait the operations finish in background (the
+        application waits for them only when it exits)
+        """
+        self.flush(wait)
+
     def name(self):
         return "Git"
 
@@ -39,6 +39,18 @@ class cacheIOAccess(object):
     implementation of basic methods
     """
 
+    # incremental access implements store and remove, hence only the
+    # changes of the cache are written when saved
+    incremental = False
+    # indexed access is incremental and implements find, hence the
+    # cache does not need to be loaded completely to find or add the
+    # components
+    indexed = False
+
+    # access changing the cache in background (e.g. when pulled from
+    # remote repository) calls listener without arguments
+    listener = None
+
     def __init__(self, fname=None):
         self.filename = fname
 
@@ -63,6 +75,49 @@ class cacheIOAccess(object):
         """
         raise cacheExceptionImplement("Save Not implemented")
 
+    def find(self, libref, value, footprint):
+        """ indexed access returns dictionary {hash: data} of the
+        components stored for the libref/value/footprint
+        """
+        raise cacheExceptionImplement("Find Not implemented")
+
+    def keys(self):
+        """ indexed access returns list of all the keys (libref,
+        value, footprint) stored
+        """
+        raise cacheExceptionImplement("Keys Not implemented")
+
+    def store(self, entries):
+        """ incremental access stores list of tuples (libref, value,
+        footprint, hash, data) in a single transaction
+        """
+        raise cacheExceptionImplement("Store Not implemented")
+
+    def remove(self, entries):
+        """ incremental access removes list of tuples (libref, value,
+        footprint, hash) in a single transaction
+        """
+        raise cacheExceptionImplement("Remove Not implemented")
+
+    def merge(self, data):
+        """ access calling listener returns the cache data merged with
+        the changes done in background
+        """
+        raise cacheExceptionImplement("Merge Not implemented")
+
+    def setListener(self, listener):
+        """ sets the function called when the cache changes in
+        background
+        """
+        self.listener = listener
+
+    def close(self, wait=True):
+        """ finishes all pending operations and releases the
+        resources. Without wait the operations running in background
+        may finish later
+        """
+        pass
+
     def name(self):
         raise cacheExceptionImplement("Name Not implemented")
 
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+implements journaled FILE access to the cache. The cache file keeps
+the snapshot of the cache in the same format as cacheFileAccess,
+the changes (added and removed components) are appended as records to
+the journal next to it (componentsCache.bmc.journal). Saving costs
+only the size of the changes and a write interrupted by a crash
+loses at most the record being written. The data of the component are
+written only by the first record of its hash, further records refer
+to the data already stored in the snapshot or the journal (which are
+read again when another instance of the application compacted the
+journal in the meantime). The journal is compacted into the snapshot
+when it got long, either when the cache is loaded or when the changes
+are saved
+"""
+from BOMizator.cachefileaccess import cacheFileAccess
+import os
+import json
+import logging
+
+# number of journal records, above which the journal is compacted
+# into the snapshot
+COMPACT_RECORDS = 1000
+
+
+class cacheJournalAccess(cacheFileAccess):
+
+    incremental = True
+    # extension of the journal appended to the cache filename
+    extension = ".journal"
+
+    def __init__(self, fname=None):
+        super(cacheJournalAccess, self).__init__(fname)
+        self.logger = logging.getLogger('bomizator')
+        self.compactRecords = COMPACT_RECORDS
+        # table {hash: data} of the components stored in the snapshot
+        # or in the journal. It is valid as long as the snapshot is
+        # the same and the journal is at least journalSize bytes long
+        self.components = {}
+        self.snapshot = None
+        self.journalSize = 0
+        # number of records in the journal known to this instance
+        self.journalRecords = 0
+
+    def __str__(self):
+        return "journal " + self.filename
+
+    def getJournal(self):
+        """ returns filename of the journal
+        """
+        return self.filename + self.extension
+
+    def getRotatedJournal(self):
+        """ returns filename, under which the journal is kept while
+        the snapshot is replaced. It is tied to the temporary file of
+        the new snapshot
+        """
+        return self.filename + "tmp" + self.extension
+
+    def validate(self):
+        """ returns true if the snapshot or the journal exists
+        """
+        return os.path.isfile(self.filename) or\
+            os.path.isfile(self.getJournal()) or\
+            os.path.isfile(self.getRotatedJournal())
+
+    def getSnapshot(self):
+        """ returns tuple identifying the snapshot file, which changes
+        whenever the snapshot is replaced. None if it does not exist
+        """
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def getJournalSize(self):
+        """ returns the size of the journal, 0 if it does not exist
+        """
+        try:
+            return os.path.getsize(self.getJournal())
+        except FileNotFoundError:
+            return 0
+
+    def read(self):
+        """ reads the snapshot, see cacheFileAccess.read. The
+        snapshot read is remembered
+        """
+        self.snapshot = self.getSnapshot()
+        self.journalSize = 0
+        self.journalRecords = 0
+        return super(cacheJournalAccess, self).read()
+
+    def load(self):
+        """ loads the snapshot and replays the journal over it. If the
+        journal has too many records, it is compacted
+        """
+        data, self.components = self.read()
+        self.replay(data)
+        if self.journalRecords > self.compactRecords:
+            self.compact(data)
+        return data
+
+    def compact(self, data=None):
+        """ writes the data into the snapshot and removes the journal.
+        If the data are not given, they are read from the snapshot
+        and the journal
+        """
+        self.logger.info("Compacting components cache journal %s" %
+                         (self.getJournal(), ))
+        if data is None:
+            data, self.components = self.read()
+            self.replay(data)
+        self.save(data)
+
+    def replay(self, data):
+        """ applies the records of the journal to the data and returns
+        the number of records. The rotated journal is left only when
+        crashed while replacing the snapshot, it is applied first. If
+        the snapshot was already replaced, its records are in the
+        snapshot and applying them again does not change the data
+        """
+        records = self.replayJournal(self.getRotatedJournal(), data)
+        records += self.replayJournal(self.getJournal(), data)
+        self.journalRecords = records
+        return records
+
+    def replayJournal(self, fname, data):
+        """ applies the records of the journal fname to the data and
+        returns the number of records. Incomplete or corrupted records
+        (e.g. the record written when crashed) are ignored
+        """
+        records = 0
+        try:
+            with open(fname, "rt") as journal:
+                if fname == self.getJournal():
+                    # records appended later by another instance are
+                    # not known yet
+                    self.journalSize = os.fstat(journal.fileno()).st_size
+                for line in journal:
+                    try:
+                        if not line.endswith('\n'):
+                            raise ValueError("incomplete record")
+                        record = json.loads(line)
+                        op, libref, value, footprint, cmphash =\
+                            record[:5]
+                        if op == "+" and len(record) > 5:
+                            cmpdata = self.components.setdefault(
+                                cmphash, record[5])
+                        elif op == "+":
+                            cmpdata = self.components[cmphash]
+                    except (ValueError, TypeError, KeyError):
+                        self.logger.warning("Ignoring corrupted record of\
+ components cache journal %s" % (fname, ))
+                        continue
+                    records += 1
+                    if op == "+":
+                        data.setdefault(libref, {}).setdefault(
+                            value, {}).setdefault(
+                                footprint, {})[cmphash] = cmpdata
+                    elif op == "-":
+                        self.removeKey(data, libref, value, footprint,
+                                       cmphash)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def removeKey(self, data, libref, value, footprint, cmphash):
+        """ removes the component from the data including the empty
+        branches
+        """
+        try:
+            footprints = data[libref][value]
+            footprints[footprint].pop(cmphash, None)
+        except KeyError:
+            return
+        if not footprints[footprint]:
+            footprints.pop(footprint)
+        if not footprints:
+            data[libref].pop(value)
+        if not data[libref]:
+            data.pop(libref)
+
+    def append(self, records):
+        """ appends the records to the journal and waits until they
+        are written to the disk
+        """
+        with open(self.getJournal(), "a+b") as journal:
+            text = ''.join(map(lambda record: json.dumps(record) + '\n',
+                               records))
+            if journal.tell():
+                # record incompletely written when crashed is
+                # terminated, such the new records can be read
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b'\n':
+                    text = '\n' + text
+            journal.write(text.encode('utf-8'))
+            journal.flush()
+            os.fsync(journal.fileno())
+            self.journalSize = journal.tell()
+        self.journalRecords += len(records)
+
+    def store(self, entries):
+        """ appends list of tuples (libref, value, footprint, hash,
+        data) to the journal. The data already stored are not repeated
+        """
+        if self.snapshot != self.getSnapshot() or\
+           self.journalSize > self.getJournalSize():
+            # snapshot replaced or journal truncated by another
+            # instance, the components known might not be stored any
+            # more
+            data, self.components = self.read()
+            self.replay(data)
+        records = []
+        components = {}
+        for libref, value, footprint, cmphash, cmpdata in entries:
+            if cmphash in self.components or cmphash in components:
+                records.append(["+", libref, value, footprint, cmphash])
+            else:
+                components[cmphash] = cmpdata
+                records.append(["+", libref, value, footprint, cmphash,
+                                cmpdata])
+        self.append(records)
+        # referred only when written
+        self.components.update(components)
+        if self.journalRecords > self.compactRecords:
+            self.compact()
+
+    def remove(self, entries):
+        """ appends list of tuples (libref, value, footprint, hash) to
+        the journal
+        """
+        self.append([["-"] + list(entry) for entry in entries])
+        if self.journalRecords > self.compactRecords:
+            self.compact()
+
+    def save(self, data):
+        """ writes complete data into the snapshot and removes the
+        journal. The snapshot is replaced only when completely
+        written. The journal is rotated before, such the records
+        appended meanwhile go to the new journal, and removed after
+        the snapshot is replaced. If crashed in between, the rotated
+        journal is applied again when loaded (see replay)
+        """
+        with open(self.filename + "tmp", 'wt') as outfile:
+            json.dump(self.pack(data), outfile)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        try:
+            os.replace(self.getJournal(), self.getRotatedJournal())
+        except FileNotFoundError:
+            pass
+        os.replace(self.filename + "tmp", self.filename)
+        self.components = self.getComponents(data)
+        try:
+            os.remove(self.getRotatedJournal())
+        except FileNotFoundError:
+            pass
+        self.snapshot = self.getSnapshot()
+        self.journalSize = 0
+        self.journalRecords = 0
+
+    def name(self):
+        return "Journal"
+
+
+DEFAULT_CLASS = cacheJournalAccess
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+implements SQLite access to the cache. The libref/value/footprint ->
+hash relation is stored in a database table indexed by
+libref/value/footprint, the data of the components in a table indexed
+by hash, hence the components are looked up and added without loading
+and saving the complete cache, and the data used by many components
+are stored once. The database is stored next to the cache file
+(componentsCache.bmc.sqlite for componentsCache.bmc), the cache file
+is imported into the database when it is created
+"""
+from BOMizator.cacheioaccess import cacheIOAccess
+from BOMizator.cachefileaccess import cacheFileAccess
+import os
+import json
+import sqlite3
+import logging
+
+
+class cacheSQLiteAccess(cacheIOAccess):
+
+    incremental = True
+    indexed = True
+    # extension of the database replacing the extension of the cache
+    # file
+    extension = ".bmc.sqlite"
+
+    def __init__(self, fname=None):
+        super(cacheSQLiteAccess, self).__init__(fname)
+        self.logger = logging.getLogger('bomizator')
+        # the connection is kept open, as the components are looked
+        # up one by one (e.g. when the context menu opens)
+        self.connection = None
+        # components found by libref/value/footprint, these are
+        # queried repeatedly for the same component and decoding of
+        # the data is not for free
+        self.found = {}
+        # decoded data {hash: data}, shared by all the components
+        # having the same hash
+        self.decoded = {}
+
+    def __str__(self):
+        return "SQLite " + self.getDatabase()
+
+    def getDatabase(self):
+        """ returns filename of the database
+        """
+        return os.path.splitext(self.filename)[0] + self.extension
+
+    def connect(self):
+        """ returns connection to the database, which is opened and
+        the tables created if needed. The primary key indexes the
+        components by libref/value/footprint, the data are indexed by
+        hash
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.getDatabase())
+            with self.connection:
+                self.connection.execute("CREATE TABLE IF NOT EXISTS\
+ componentkeys (libref TEXT, value TEXT, footprint TEXT, hash TEXT,\
+ PRIMARY KEY (libref, value, footprint, hash)) WITHOUT ROWID")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS\
+ componentkeys_hash ON componentkeys (hash)")
+                self.connection.execute("CREATE TABLE IF NOT EXISTS\
+ componentdata (hash TEXT PRIMARY KEY, data TEXT) WITHOUT ROWID")
+        return self.connection
+
+    def close(self, wait=True):
+        """ closes the connection to the database
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def validate(self):
+        """ returns true if the database exists
+        """
+        return os.path.isfile(self.getDatabase())
+
+    def create(self, fname):
+        """ creates the database. If the cache file exists, its
+        components are imported
+        """
+        self.close()
+        self.filename = fname
+        try:
+            data = cacheFileAccess(fname).load()
+        except ValueError:
+            self.logger.warning("Components cache %s is not readable,\
+ creating empty database" % (fname, ))
+            data = {}
+        self.save(data)
+
+    def load(self):
+        """ loads and returns the complete cache in a single query
+        """
+        data = {}
+        for libref, value, footprint, cmphash, cmpdata in\
+            self.connect().execute("SELECT libref, value, footprint,\
+ hash, data FROM componentkeys JOIN componentdata USING (hash)"):
+            data.setdefault(libref, {}).setdefault(
+                value, {}).setdefault(
+                    footprint, {})[cmphash] = self.decode(cmphash, cmpdata)
+        return data
+
+    def save(self, data):
+        """ replaces the complete cache in a single transaction
+        """
+        connection = self.connect()
+        self.found = {}
+        with connection:
+            connection.execute("DELETE FROM componentkeys")
+            connection.execute("DELETE FROM componentdata")
+            self.insert(connection,
+                        [(libref, value, footprint, cmphash, cmpdata)
+                         for libref, values in data.items()
+                         for value, footprints in values.items()
+                         for footprint, hashes in footprints.items()
+                         for cmphash, cmpdata in hashes.items()])
+
+    def find(self, libref, value, footprint):
+        """ returns dictionary {hash: data} of the components stored
+        for the libref/value/footprint
+        """
+        key = (libref, value, footprint)
+        if key not in self.found:
+            self.found[key] = dict(
+                map(lambda row: (row[0], self.decode(*row)),
+                    self.connect().execute(
+                        "SELECT hash, data FROM componentkeys JOIN\
+ componentdata USING (hash) WHERE libref = ? AND value = ? AND\
+ footprint = ?", key)))
+        return dict(self.found[key])
+
+    def keys(self):
+        """ returns list of all the keys (libref, value, footprint)
+        stored, these are read from the index
+        """
+        return self.connect().execute("SELECT DISTINCT libref, value,\
+ footprint FROM componentkeys").fetchall()
+
+    def store(self, entries):
+        """ adds list of tuples (libref, value, footprint, hash, data)
+        in a single transaction. Components already stored are kept
+        """
+        connection = self.connect()
+        self.found = {}
+        with connection:
+            self.insert(connection, entries)
+
+    def remove(self, entries):
+        """ removes list of tuples (libref, value, footprint, hash) in
+        a single transaction. The data not used by any component are
+        removed as well
+        """
+        connection = self.connect()
+        self.found = {}
+        with connection:
+            connection.executemany(
+                "DELETE FROM componentkeys WHERE libref = ? AND value = ?\
+ AND footprint = ? AND hash = ?", entries)
+            connection.executemany(
+                "DELETE FROM componentdata WHERE hash = ? AND NOT EXISTS\
+ (SELECT 1 FROM componentkeys WHERE hash = componentdata.hash)",
+                [(cmphash, ) for cmphash in
+                 set(entry[3] for entry in entries)])
+
+    def insert(self, connection, entries):
+        """ inserts list of tuples (libref, value, footprint, hash,
+        data) into the tables. The data are encoded as JSON once for
+        each hash
+        """
+        connection.executemany(
+            "INSERT OR IGNORE INTO componentdata VALUES (?, ?)",
+            [(cmphash, json.dumps(cmpdata, sort_keys=True))
+             for cmphash, cmpdata in
+             dict((entry[3], entry[4]) for entry in entries).items()])
+        connection.executemany(
+            "INSERT OR IGNORE INTO componentkeys VALUES (?, ?, ?, ?)",
+            [entry[:4] for entry in entries])
+
+    def decode(self, cmphash, cmpdata):
+        """ returns the data of the hash decoded from JSON. The data
+        are decoded once for each hash
+        """
+        if cmphash not in self.decoded:
+            self.decoded[cmphash] = json.loads(cmpdata)
+        return self.decoded[cmphash]
+
+    def name(self):
+        return "SQLite"
+
+
+DEFAULT_CLASS = cacheSQLiteAccess
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Command line entry point for bomizator. Parses the project, applies
+the BOM data of the project (multipliers, adders, rounding policies)
+and writes the order list grouped by supplier. It does not use Qt,
+hence it runs on machines without display
+"""
+
+import os
+import sys
+import csv
+import json
+import logging
+import argparse
+from .headernames import headernames
+from .projectparser import loadProject
+from .orderlist import orderList
+from .batchorder import batchOrder
+
+
+def getPlugins():
+    """ returns dictionary of supplier plugins. These are only needed
+    for fast-paste format, hence they are loaded on demand
+    """
+    from .supplier_selector import supplier_selector
+    return supplier_selector().plugins
+
+
+def formatText(order, output):
+    """ writes fast-paste text of each supplier. The format is given
+    by the supplier plugin, suppliers without plugin get ordercode,
+    amount lines
+    """
+    plugins = dict((name.lower(), plugin)
+                   for name, plugin in getPlugins().items())
+    header = headernames()
+    for supplier, items in order.items():
+        data = [(item[header.SUPPNO], item[header.TOTAL]) for item in items]
+        try:
+            text = plugins[supplier.lower()].getFastPasteText(data)
+        except KeyError:
+            text = '\n'.join(["%s, %s" % (str(ix[0]),
+                                          str(ix[1])) for ix in data])
+        output.write("[%s]\n%s\n\n" % (supplier, text))
+
+
+def formatCSV(order, output):
+    """ writes single table of all the ordering items, supplier is
+    the first column
+    """
+    header = headernames()
+    writer = csv.writer(output)
+    columns = None
+    for supplier, items in order.items():
+        for item in items:
+            if columns is None:
+                columns = list(item.keys())
+                writer.writerow([header.SUPPLIER] + columns)
+            row = dict(item)
+            row[header.DESIGNATORS] = ', '.join(row[header.DESIGNATORS])
+            writer.writerow([supplier] + [row[col] for col in columns])
+
+
+def formatJSON(order, output):
+    """ writes the order as JSON object with key of supplier
+    """
+    json.dump(order, output, indent=1)
+    output.write("\n")
+
+
+FORMATS = {'text': formatText,
+           'csv': formatCSV,
+           'json': formatJSON}
+
+
+def projectArgument(text):
+    """ splits project argument of form project.pro[:multiplier]
+    into tuple (project file, multiplier). Multiplier is None if not
+    given
+    """
+    projectFile, sep, multiplier = text.rpartition(':')
+    if sep and multiplier.isdigit():
+        return (projectFile, int(multiplier))
+    return (text, None)
+
+
+def main(args=None):
+    """ command line entry point
+    """
+    parser = argparse.ArgumentParser(
+        prog='bomizator-cli',
+        description="Generates order list of KiCad project grouped by\
+ supplier using BOM data of the project. When more projects are given,\
+ single order of all of them is generated, the amounts are summed\
+ before rounding")
+    parser.add_argument('projects', nargs='+', metavar='project',
+                        type=projectArgument,
+                        help="KiCad project file (.pro or .kicad_pro), optionally\
+ followed by :multiplier overriding global multiplier of the project")
+    parser.add_argument('-f', '--format',
+                        choices=sorted(FORMATS.keys()),
+                        default='text',
+                        help="output format, text is the fast-paste\
+ format of the suppliers (default: %(default)s)")
+    parser.add_argument('-o', '--output',
+                        help="output file (default: standard output)")
+    parser.add_argument('-m', '--multiplier', type=int,
+                        help="global multiplier overriding the one of\
+ the projects without own multiplier")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="number of processes parsing the\
+ schematic files of single project, or the projects of multiple\
+ projects (default: 1 for single project, number of processors\
+ otherwise)")
+    parser.add_argument('--include-disabled', action='store_true',
+                        help="include disabled components")
+    parser.add_argument('--include-do-not-order', action='store_true',
+                        help="include components marked as not to be\
+ ordered")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="print parser messages")
+    options = parser.parse_args(args)
+
+    logging.basicConfig(
+        format='%(levelname)s: %(message)s',
+        level=logging.INFO if options.verbose else logging.CRITICAL)
+
+    projects = []
+    for projectFile, multiplier in options.projects:
+        if not os.path.isfile(projectFile):
+            parser.error("project file %s does not exist" % (projectFile, ))
+        if multiplier is None:
+            multiplier = options.multiplier
+        projects.append((projectFile, multiplier))
+
+    if len(projects) == 1:
+        projectFile, multiplier = projects[0]
+        project = loadProject(projectFile, options.workers or 1)
+        order = orderList(project, multiplier).getOrder(
+            options.include_disabled,
+            options.include_do_not_order)
+    else:
+        order = batchOrder(projects,
+                           options.workers or os.cpu_count()).getOrder(
+                               options.include_disabled,
+                               options.include_do_not_order)
+
+    if options.output:
+        with open(options.output, "wt", newline='') as output:
+            FORMATS[options.format](order, output)
+    else:
+        FORMATS[options.format](order, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Normalises libref/value/footprint of the components, such that the
+same part written in different ways (100n, 100nF, 0.1u, 100 nF 10%)
+resolves into the same key. Used by the components cache to find the
+components, which are not stored under exactly the same key
+"""
+
+import re
+
+
+class componentNormaliser(object):
+    """ converts the libref/value/footprint of the component into its
+    normalised key. Engineering values are converted into numbers
+    (SI prefixes, R/k/M as decimal mark, units and tolerances are
+    dropped), the footprints into canonical names. Values, which are
+    not engineering values (e.g. part names) are compared case
+    insensitively
+    """
+
+    # SI prefixes, R means no prefix (e.g. 4R7 for resistors)
+    PREFIXES = {'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'µ': 1e-6,
+                'μ': 1e-6, 'm': 1e-3, 'R': 1, 'r': 1, 'k': 1e3,
+                'K': 1e3, 'M': 1e6, 'G': 1e9}
+    # number, optional prefix possibly followed by decimals (4k7),
+    # and optional unit
+    VALUE = re.compile(r'(\d*[.,]?\d+)([pnuµμmRrkKMG]?)(\d*)'
+                       r'(F|H|Ω|Ω|[oO]hms?|Hz|A|V|W)?$')
+    # tolerances, e.g. 1%, +/-5 %, separated from the value
+    TOLERANCE = re.compile(r'[\s/_]*(±|\+/-)?\s*\d+([.,]\d+)?\s*%')
+    # library nickname of the footprint and the suffixes, which do
+    # not change the package
+    LIBRARY = re.compile(r'^[^:]*:')
+    FOOTPRINT_SUFFIXES = re.compile(r'_\d+metric|_handsolder')
+
+    def __init__(self):
+        # the same values and footprints repeat over the cache, hence
+        # these are normalised only once
+        self.values = {}
+        self.footprints = {}
+
+    def __call__(self, libref, value, footprint):
+        """ returns normalised key of the component
+        """
+        return self.getKey(libref, value, footprint)
+
+    def getKey(self, libref, value, footprint):
+        """ returns tuple (libref, value, footprint) normalised
+        """
+        if value not in self.values:
+            self.values[value] = self.normaliseValue(value)
+        if footprint not in self.footprints:
+            self.footprints[footprint] = self.normaliseFootprint(footprint)
+        return (libref.casefold(),
+                self.values[value],
+                self.footprints[footprint])
+
+    def normaliseValue(self, value):
+        """ returns engineering value converted into its number
+        formatted with 6 significant digits, other values are returned
+        case folded without whitespace
+        """
+        text = self.TOLERANCE.sub('', value).replace(' ', '')
+        match = self.VALUE.match(text)
+        if match is None:
+            return ''.join(value.split()).casefold()
+        number, prefix, decimals, unit = match.groups()
+        if decimals:
+            if not prefix or '.' in number or ',' in number:
+                # e.g. 1.5k7 or 47 decimals without prefix
+                return ''.join(value.split()).casefold()
+            number += '.' + decimals
+        number = float(number.replace(',', '.'))
+        if prefix:
+            number *= self.PREFIXES[prefix]
+        return '%.6g' % (number, )
+
+    def normaliseFootprint(self, footprint):
+        """ returns footprint without library nickname and the
+        suffixes not changing the package (metric size, hand
+        soldering), case folded
+        """
+        return self.FOOTPRINT_SUFFIXES.sub(
+            '', self.LIBRARY.sub('', footprint).casefold())
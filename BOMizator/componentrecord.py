@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Implements compact record of a single component of the
+schematic. Large projects contain thousands of components, each of
+them having the same few attributes, hence a dictionary per component
+wastes most of the memory for the hash table
+"""
+
+import sys
+from .headernames import headernames
+
+
+class componentRecord(object):
+    """ keeps attributes of a single component in slots. The record
+    behaves as dictionary indexed by the header names (as
+    defaultdict(str) used before): reading an attribute, which is not
+    set, returns empty string and sets it. Hence the set of the
+    attributes present in the component is the same as it was with the
+    dictionary, and the same attributes are written into the schematic
+    when saved
+    """
+
+    # header name -> slot, the slot order is the order of the
+    # attributes when the record is iterated
+    FIELDS = {headernames.DESIGNATOR: 'designator',
+              headernames.LIBREF: 'libref',
+              headernames.VALUE: 'value',
+              headernames.FOOTPRINT: 'footprint',
+              headernames.DATASHEET: 'datasheet',
+              headernames.SUPPNO: 'suppno',
+              headernames.SUPPLIER: 'supplier',
+              headernames.MANUFACTURER: 'manufacturer',
+              headernames.MFRNO: 'mfrno'}
+    # these attributes repeat in many components, a single copy of
+    # each string is kept
+    INTERNED = ('libref', 'value', 'footprint', 'supplier', 'manufacturer')
+    # distinct orders of the attributes. There are only few of them
+    # in the project, hence all the records share the same tuples
+    ORDERS = {}
+
+    __slots__ = ('designator', 'libref', 'value', 'footprint',
+                 'datasheet', 'suppno', 'supplier', 'manufacturer',
+                 'mfrno', 'order')
+
+    def __init__(self, data=()):
+        # order keeps header names of the attributes in the order of
+        # their assignment, as the dictionary did. It is shared among
+        # the records having the same attributes set
+        self.order = ()
+        for key, val in dict(data).items():
+            self[key] = val
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self.FIELDS[key])
+        except AttributeError:
+            # not yet set, behave as defaultdict
+            self[key] = ''
+            return ''
+
+    def __setitem__(self, key, val):
+        slot = self.FIELDS[key]
+        if slot in self.INTERNED and type(val) is str:
+            val = sys.intern(val)
+        if not hasattr(self, slot):
+            order = self.order + (key, )
+            self.order = self.ORDERS.setdefault(order, order)
+        setattr(self, slot, val)
+
+    def __contains__(self, key):
+        return key in self.order
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __repr__(self):
+        return "componentRecord(%r)" % (dict(self.items()), )
+
+    def __eq__(self, other):
+        return dict(self.items()) == dict(other.items())
+
+    def __getstate__(self):
+        return self.toTuple()
+
+    def __setstate__(self, state):
+        self.order = ()
+        self.fromTuple(state, self)
+
+    def get(self, key, default=None):
+        """ returns attribute or default if not set. Unlike item
+        access it does not set the attribute
+        """
+        if key in self.order:
+            return self[key]
+        return default
+
+    def keys(self):
+        """ returns header names of the attributes set
+        """
+        return list(self.order)
+
+    def values(self):
+        """ returns values of the attributes set
+        """
+        return [self[key] for key in self.order]
+
+    def items(self):
+        """ returns list of (header name, value) of the attributes set
+        """
+        return [(key, self[key]) for key in self.order]
+
+    def copy(self):
+        """ returns shallow copy of the record
+        """
+        other = componentRecord.__new__(componentRecord)
+        other.order = self.order
+        for key in self.order:
+            slot = self.FIELDS[key]
+            setattr(other, slot, getattr(self, slot))
+        return other
+
+    def pop(self, key, *default):
+        """ removes attribute and returns its value
+        """
+        if key not in self.order:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        val = self[key]
+        delattr(self, self.FIELDS[key])
+        order = tuple(filter(lambda k: k != key, self.order))
+        self.order = self.ORDERS.setdefault(order, order)
+        return val
+
+    def toTuple(self):
+        """ returns the record as tuple of attribute names and values,
+        which can be stored by marshal
+        """
+        return (self.order, tuple(self.values()))
+
+    @classmethod
+    def fromTuple(cls, data, record=None):
+        """ creates (or fills given) record from the tuple returned
+        by toTuple
+        """
+        if record is None:
+            record = cls()
+        for key, val in zip(*data):
+            record[key] = val
+        return record
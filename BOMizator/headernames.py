@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Names of the component attributes and BOM columns. These do not
+depend on Qt, hence they can be used by the parser running without
+graphical interface
+"""
+
+
+class headernames(object):
+    # text references to assure that all parties are talking the
+    # same dictionary keys
+    DESIGNATOR = "Designator"
+    DESIGNATORS = "Designators"
+    MULTIPLYFACTOR = "Multiplier"
+    ADDFACTOR = "Adder"
+    LIBREF = "LibRef"
+    VALUE = "Value"
+    FOOTPRINT = "Footprint"
+    MANUFACTURER = "Manufacturer"
+    MFRNO = "Mfr. no"
+    SUPPLIER = "Supplier"
+    SUPPNO = "Supplier no"
+    DATASHEET = "Datasheet"
+    TOTAL = "Total"
+    POLICY = "Rounding Policy"
+    DONOTORDER = "Do not order"
+
+    # list defining names of all columns which uniquely identify the
+    # component
+    UNIQUEITEM = [LIBREF,
+                  VALUE,
+                  FOOTPRINT]
+
+    # this list defines all items which are added by user
+    USERITEMS = [MANUFACTURER,
+                 MFRNO,
+                 SUPPLIER,
+                 SUPPNO,
+                 DATASHEET]
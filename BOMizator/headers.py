@@ -30,40 +30,12 @@ Class of constants
 """
 from PyQt5 import QtCore
 from .headerbase import headerbase
+from .headernames import headernames
 
 
-class headers(headerbase):
-    # this class declares how to display the data. First text
-    # references to assure that all parties are talking the same
-    # dictionary keys
-    DESIGNATOR = "Designator"
-    DESIGNATORS = "Designators"
-    MULTIPLYFACTOR = "Multiplier"
-    ADDFACTOR = "Adder"
-    LIBREF = "LibRef"
-    VALUE = "Value"
-    FOOTPRINT = "Footprint"
-    MANUFACTURER = "Manufacturer"
-    MFRNO = "Mfr. no"
-    SUPPLIER = "Supplier"
-    SUPPNO = "Supplier no"
-    DATASHEET = "Datasheet"
-    TOTAL = "Total"
-    POLICY = "Rounding Policy"
-    DONOTORDER = "Do not order"
-
-    # list defining names of all columns which uniquely identify the
-    # component
-    UNIQUEITEM = [LIBREF,
-                  VALUE,
-                  FOOTPRINT]
-
-    # this list defines all items which are added by user
-    USERITEMS = [MANUFACTURER,
-                 MFRNO,
-                 SUPPLIER,
-                 SUPPNO,
-                 DATASHEET]
+class headers(headerbase, headernames):
+    # this class declares how to display the data. The names of the
+    # columns are shared with the parser through headernames
 
     # itemenabled is the enable/disable flag associated with a
     # particular modelindex. We can get the info about it just by
@@ -71,26 +43,26 @@ class headers(headerbase):
     ItemEnabled = QtCore.Qt.UserRole + 1
 
     # this header is used for
-    BOMHEADER = {DESIGNATORS: {"column": 0,
-                               "flags": QtCore.Qt.NoItemFlags},
-                 MULTIPLYFACTOR: {"column": 1,
-                                  "flags": QtCore.Qt.ItemIsEditable},
-                 ADDFACTOR: {"column": 2,
-                             "flags": QtCore.Qt.ItemIsEditable},
-                 TOTAL: {"column": 3,
-                         "flags": QtCore.Qt.NoItemFlags},
-                 SUPPNO: {"column": 4,
-                          "flags": QtCore.Qt.ItemIsEditable},
-                 LIBREF: {"column": 5,
-                          "flags": QtCore.Qt.NoItemFlags},
-                 VALUE: {"column": 6,
-                         "flags": QtCore.Qt.NoItemFlags},
-                 MANUFACTURER: {"column": 7,
-                                "flags": QtCore.Qt.NoItemFlags},
-                 MFRNO: {"column": 8,
-                         "flags": QtCore.Qt.NoItemFlags},
-                 DATASHEET: {"column": 9,
-                             "flags": QtCore.Qt.NoItemFlags}}
+    BOMHEADER = {headernames.DESIGNATORS: {"column": 0,
+                                           "flags": QtCore.Qt.NoItemFlags},
+                 headernames.MULTIPLYFACTOR: {"column": 1,
+                                              "flags": QtCore.Qt.ItemIsEditable},
+                 headernames.ADDFACTOR: {"column": 2,
+                                         "flags": QtCore.Qt.ItemIsEditable},
+                 headernames.TOTAL: {"column": 3,
+                                     "flags": QtCore.Qt.NoItemFlags},
+                 headernames.SUPPNO: {"column": 4,
+                                      "flags": QtCore.Qt.ItemIsEditable},
+                 headernames.LIBREF: {"column": 5,
+                                      "flags": QtCore.Qt.NoItemFlags},
+                 headernames.VALUE: {"column": 6,
+                                     "flags": QtCore.Qt.NoItemFlags},
+                 headernames.MANUFACTURER: {"column": 7,
+                                            "flags": QtCore.Qt.NoItemFlags},
+                 headernames.MFRNO: {"column": 8,
+                                     "flags": QtCore.Qt.NoItemFlags},
+                 headernames.DATASHEET: {"column": 9,
+                                         "flags": QtCore.Qt.NoItemFlags}}
 
     def __init__(self):
         super(headers, self).__init__()
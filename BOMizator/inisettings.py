@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Reader of the project configuration (.bmz) files without Qt. The
+files are written by QSettings in INI format, this class decodes them
+in the same way and provides the part of QSettings interface used by
+the project parser
+"""
+
+import re
+import struct
+import logging
+
+
+class iniSettings(object):
+    """ read-only QSettings look-alike for INI files. Keys are
+    accessed within groups opened by beginGroup, the values are
+    converted by value() in the same way as PyQt does
+    """
+
+    # escaped characters of the values
+    ESCAPES = {'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r',
+               't': '\t', 'v': '\v'}
+    # percent-encoded characters of keys and sections
+    KEYESCAPE = re.compile(r'%U([0-9A-Fa-f]{4})|%([0-9A-Fa-f]{2})')
+
+    def __init__(self, fname):
+        self.logger = logging.getLogger('bomizator')
+        self.filename = fname
+        self.group = []
+        self.sync()
+
+    def sync(self):
+        """ (re)reads the file. Missing file means no settings
+        """
+        # keys are stored with their full path, groups separated by
+        # slash, the same way as QSettings presents them
+        self.data = {}
+        try:
+            with open(self.filename, "rt", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        section = ''
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in ';#':
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                section = line[1:-1]
+                if section == 'General':
+                    # general section holds keys of the top level
+                    section = ''
+                elif section == '%General':
+                    # group named General is escaped
+                    section = 'General/'
+                else:
+                    section = self.unescapeKey(section) + '/'
+                continue
+            key, sep, value = line.partition('=')
+            if not sep:
+                continue
+            key = section + self.unescapeKey(key.strip())
+            self.data[key] = self.unescapeValue(value.strip())
+
+    def unescapeKey(self, key):
+        """ returns key (or section) name decoded from the file
+        form. Backslash separates the groups within the key
+        """
+        key = key.replace('\\', '/')
+        return self.KEYESCAPE.sub(
+            lambda m: chr(int(m.group(1) or m.group(2), 16)), key)
+
+    def unescapeValue(self, text):
+        """ returns the value decoded from the file form. Comma
+        separated values form a list, quoted strings and escaped
+        characters are resolved
+        """
+        items = []
+        current = []
+        quoted = False
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            i += 1
+            if ch == '"':
+                quoted = not quoted
+            elif ch == '\\' and i < len(text):
+                ch = text[i]
+                i += 1
+                if ch == 'x':
+                    digits = re.match('[0-9A-Fa-f]*', text[i:]).group(0)
+                    i += len(digits)
+                    current.append(chr(int(digits or '0', 16)))
+                elif ch in '01234567':
+                    digits = re.match('[0-7]*', text[i:]).group(0)
+                    i += len(digits)
+                    current.append(chr(int(ch + digits, 8)))
+                else:
+                    current.append(self.ESCAPES.get(ch, ch))
+            elif ch == ',' and not quoted:
+                items.append(''.join(current).strip())
+                current = []
+            else:
+                current.append(ch)
+        if items:
+            items.append(''.join(current).strip())
+            return items
+        return self.unescapeSpecial(''.join(current))
+
+    def unescapeSpecial(self, text):
+        """ values starting with @ carry special types
+        """
+        if not text.startswith('@'):
+            return text
+        if text.startswith('@@'):
+            return text[1:]
+        if text == '@Invalid()':
+            return None
+        if text.startswith('@ByteArray(') and text.endswith(')'):
+            return text[11:-1].encode('latin-1')
+        if text.startswith('@Variant(') and text.endswith(')'):
+            try:
+                value, _ = self.decodeVariant(
+                    text[9:-1].encode('latin-1'), 0)
+                return value
+            except (struct.error, ValueError, KeyError):
+                self.logger.warning("%s: cannot decode %s" %
+                                    (self.filename, text))
+                return None
+        return text
+
+    def decodeVariant(self, data, pos):
+        """ decodes QVariant serialized by QDataStream from data
+        starting at pos. Only the types which can appear in the
+        project configuration are supported. Returns tuple (value,
+        position after the value)
+        """
+        # QSettings uses Qt 4.0 stream format, there is no null flag
+        # after the type
+        vtype, = struct.unpack_from('>I', data, pos)
+        pos += 4
+        if vtype == 1:
+            return bool(data[pos]), pos + 1
+        if vtype in (2, 3):
+            return struct.unpack_from('>i' if vtype == 2 else '>I',
+                                      data, pos)[0], pos + 4
+        if vtype in (4, 5):
+            return struct.unpack_from('>q' if vtype == 4 else '>Q',
+                                      data, pos)[0], pos + 8
+        if vtype == 6:
+            return struct.unpack_from('>d', data, pos)[0], pos + 8
+        if vtype == 10:
+            return self.decodeString(data, pos)
+        if vtype in (9, 11):
+            count, = struct.unpack_from('>I', data, pos)
+            pos += 4
+            items = []
+            for _ in range(count):
+                if vtype == 9:
+                    item, pos = self.decodeVariant(data, pos)
+                else:
+                    item, pos = self.decodeString(data, pos)
+                items.append(item)
+            return items, pos
+        raise ValueError("Unsupported variant type %d" % (vtype, ))
+
+    def decodeString(self, data, pos):
+        """ decodes QString (UTF-16) serialized by QDataStream
+        """
+        length, = struct.unpack_from('>I', data, pos)
+        pos += 4
+        if length == 0xffffffff:
+            return '', pos
+        return data[pos:pos + length].decode('utf-16-be'), pos + length
+
+    def beginGroup(self, group):
+        self.group.append(group)
+
+    def endGroup(self):
+        self.group.pop()
+
+    def prefix(self):
+        """ returns key prefix of currently open group
+        """
+        return ''.join(map(lambda g: g + '/', self.group))
+
+    def childGroups(self):
+        """ returns sorted list of groups within current group
+        """
+        prefix = self.prefix()
+        groups = set([])
+        for key in self.data:
+            if key.startswith(prefix) and '/' in key[len(prefix):]:
+                groups.add(key[len(prefix):].split('/', 1)[0])
+        return sorted(groups)
+
+    def childKeys(self):
+        """ returns sorted list of keys within current group
+        """
+        prefix = self.prefix()
+        return sorted(key[len(prefix):] for key in self.data
+                      if key.startswith(prefix) and
+                      '/' not in key[len(prefix):])
+
+    def contains(self, key):
+        return self.prefix() + key in self.data
+
+    def value(self, key, defaultValue=None, type=None):
+        """ returns value of the key converted to the type, or
+        default value if the key is not defined
+        """
+        value = self.data.get(self.prefix() + key)
+        if value is None:
+            value = defaultValue
+        if type is None or value is None:
+            return value
+        if isinstance(value, list):
+            return list(map(type, value))
+        return type(value)
@@ -30,7 +30,18 @@ Logging handler sending the data in full color to listwidget
 """
 
 import logging
-from PyQt5 import QtGui, QtWidgets
+from PyQt5 import QtGui, QtCore, QtWidgets
+
+
+class ListViewEmitter(QtCore.QObject):
+    """ delivers the log messages to the GUI thread. Messages
+    logged from other threads (project loading) are queued by Qt and
+    processed by the event loop of the GUI thread
+    """
+
+    """ signal carrying severity and message text
+    """
+    message = QtCore.pyqtSignal(str, str)
 
 
 class ListViewHandler(logging.StreamHandler):
@@ -51,6 +62,10 @@ class ListViewHandler(logging.StreamHandler):
         """
         super(ListViewHandler, self).__init__()
         self.listWidget = listWidget
+        # widgets can be touched only from the GUI thread, hence the
+        # messages pass through the signal
+        self.emitter = ListViewEmitter()
+        self.emitter.message.connect(self.addMessage)
 
     def emit(self, record):
         try:
@@ -58,12 +73,17 @@ class ListViewHandler(logging.StreamHandler):
             kk = msg.split(" ")
             severity = kk[0]
             message = ' '.join(kk[1:])
-            # having message we can push it to the listwidget
-            ni = QtWidgets.QListWidgetItem(message)
-            ni.setForeground(self.COLORS[severity.strip().upper()])
-            self.listWidget.addItem(ni)
-            self.listWidget.scrollToItem(ni)
+            self.emitter.message.emit(severity, message)
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
             self.handleError(record)
+
+    def addMessage(self, severity, message):
+        """ pushes the message to the listwidget, called in the GUI
+        thread
+        """
+        ni = QtWidgets.QListWidgetItem(message)
+        ni.setForeground(self.COLORS[severity.strip().upper()])
+        self.listWidget.addItem(ni)
+        self.listWidget.scrollToItem(ni)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Calculates order list of the project: components collected by
+supplier and ordering code together with the amount to order. It is
+the same calculation as done by the BOM view, but without Qt
+"""
+
+from collections import OrderedDict
+from .headernames import headernames
+from .qdesignatorcomparator import QDesignatorComparator
+from .roundingpolicy import roundingPolicy
+
+
+class orderList(object):
+    """ takes parsed project (projectParser) and calculates total
+    amounts of the components to order. The amount is given by number
+    of designators, local multiplier and adder from BOM data, global
+    multiplier and rounding policy. Global multiplier of the project
+    can be overriden
+    """
+
+    def __init__(self, project, globalMultiplier=None):
+        self.header = headernames()
+        self.project = project
+        if globalMultiplier is None:
+            globalMultiplier = project.getGlobalMultiplier()
+        self.globalMultiplier = globalMultiplier
+
+    def getAmount(self, cdata):
+        """ returns amount of components to order before rounding,
+        calculated from collected component data. When multiplier and
+        adder are empty, the total was entered manually and None is
+        returned
+        """
+        try:
+            a = int(cdata[self.header.MULTIPLYFACTOR])
+            b = int(cdata[self.header.ADDFACTOR])
+        except ValueError:
+            return None
+        return len(cdata[self.header.DESIGNATORS]) *\
+            a *\
+            self.globalMultiplier +\
+            b
+
+    def getTotal(self, cdata):
+        """ returns amount of components to order from collected
+        component data rounded by its rounding policy, or the total
+        entered manually
+        """
+        amount = self.getAmount(cdata)
+        if amount is None:
+            return cdata[self.header.TOTAL]
+        return roundingPolicy((cdata[self.header.POLICY], 0))(amount)
+
+    def getItems(self, includeDisabledComponents=False,
+                 includeDoNotOrder=False):
+        """ generates tuples (supplier, ordering item, collected
+        component data) sorted by supplier and ordering code. Each
+        ordering item is a dictionary of ordering code, total, sorted
+        designators and manufacturer data. Components which are
+        marked as not to be ordered are skipped unless
+        includeDoNotOrder is set
+        """
+        collected = self.project.getCollectedComponents(
+            includeDisabledComponents)
+        for supplier in sorted(collected):
+            for ordercode in sorted(collected[supplier]):
+                cdata = collected[supplier][ordercode]
+                donotorder = bool(cdata[self.header.DONOTORDER])
+                if donotorder and not includeDoNotOrder:
+                    continue
+                item = OrderedDict([
+                    (self.header.SUPPNO, ordercode),
+                    (self.header.TOTAL, self.getTotal(cdata)),
+                    (self.header.DESIGNATORS,
+                     sorted(cdata[self.header.DESIGNATORS],
+                            key=QDesignatorComparator())),
+                    (self.header.MANUFACTURER,
+                     cdata[self.header.MANUFACTURER]),
+                    (self.header.MFRNO, cdata[self.header.MFRNO]),
+                    (self.header.VALUE, cdata[self.header.VALUE]),
+                    (self.header.LIBREF, cdata[self.header.LIBREF]),
+                    (self.header.DATASHEET, cdata[self.header.DATASHEET]),
+                    (self.header.DONOTORDER, donotorder)])
+                yield supplier, item, cdata
+
+    def getOrder(self, includeDisabledComponents=False,
+                 includeDoNotOrder=False):
+        """ returns ordered dictionary with key of supplier and list
+        of ordering items (see getItems) of the supplier
+        """
+        order = OrderedDict()
+        for supplier, item, _ in self.getItems(includeDisabledComponents,
+                                               includeDoNotOrder):
+            order.setdefault(supplier, []).append(item)
+        return order
+
+    def getQuantities(self, includeDisabledComponents=False,
+                      includeDoNotOrder=False):
+        """ returns list of tuples (supplier, ordering item, amount
+        before rounding, rounding policy). Amount is None if the total
+        was entered manually. These are used to sum the amounts of
+        several projects before rounding
+        """
+        return [(supplier,
+                 item,
+                 self.getAmount(cdata),
+                 cdata[self.header.POLICY])
+                for supplier, item, cdata in self.getItems(
+                    includeDisabledComponents,
+                    includeDoNotOrder)]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+implements persistent cache of parsed schematic files. For each
+schematic file, identified by the hash of its content, the cache keeps
+the list of its sub-sheets and components (with the data needed to
+resolve the designators of KiCad 6+ sheets), hence unchanged project
+can be opened without parsing its schematic files. The cache is
+stored next to the project file in a compact binary form. The entries
+are loaded only when needed and released when saved, as the
+components are kept by the project anyway
+"""
+import os
+import marshal
+import logging
+from array import array
+from collections import OrderedDict
+from .sheetparser import PARSER_VERSION
+from .componentrecord import componentRecord
+
+# maximum number of entries kept in the cache, which do not belong to
+# any of the sheets of the project. These are sheets of previous
+# versions of the project, which might get back e.g. when switching
+# between the branches of the project repository
+PARSE_CACHE_SIZE = 256
+
+# data of the sheet kept in the cache: sub-sheets filenames and uuids
+# of their instances, symbol instances of the KiCad 6 top-level sheet,
+# the designators of the symbols the components were parsed with, the
+# components themselves and their layout in the legacy sheet
+SHEET_FIELDS = ('subsheets', 'sheetids', 'symbolinstances', 'references',
+                'components', 'layout')
+
+
+class parseCache(object):
+    """ loads, updates and saves the parse cache file. The entries
+    are identified by the content hash of the schematic file and are
+    valid only for the parser version, which created them. Any other
+    cache file is ignored and overwritten on next save
+    """
+
+    def __init__(self, fname):
+        self.logger = logging.getLogger('bomizator')
+        self.filename = fname
+        self.modified = False
+        self.entries = None
+
+    def load(self):
+        """ loads and returns the entries stored in the cache
+        file. Entries are kept in the order of their use, the least
+        recently used first
+        """
+        try:
+            with open(self.filename, "rb") as f:
+                data = marshal.load(f)
+            if data['version'] != PARSER_VERSION:
+                self.logger.info("Parse cache %s created by different\
+ parser version, ignoring" % (self.filename, ))
+                return OrderedDict()
+            return OrderedDict(data['sheets'])
+        except FileNotFoundError:
+            pass
+        except (EOFError, ValueError, TypeError, KeyError):
+            self.logger.warning("Parse cache %s is corrupted, ignoring" %
+                                (self.filename, ))
+        return OrderedDict()
+
+    def getEntries(self):
+        """ returns the entries, which are loaded if released
+        """
+        if self.entries is None:
+            self.entries = self.load()
+        return self.entries
+
+    def get(self, digest):
+        """ returns dictionary of the data of the sheet with given
+        content hash (the SHEET_FIELDS of the sheet, see store), or
+        None if the sheet is not cached
+        """
+        entries = self.getEntries()
+        try:
+            entry = entries[digest]
+        except KeyError:
+            return None
+        entries.move_to_end(digest)
+        sheet = dict(zip(SHEET_FIELDS, entry))
+        sheet['components'] = [componentRecord.fromTuple(component)
+                               for component in sheet['components']]
+        if sheet['layout'] is not None:
+            names, layout = sheet['layout']
+            sheet['layout'] = (list(names), array('l'))
+            sheet['layout'][1].frombytes(layout)
+        return sheet
+
+    def store(self, digest, sheet):
+        """ stores the data of the sheet with given content hash. Sheet
+        is the dictionary describing the sheet, the SHEET_FIELDS of it
+        are stored
+        """
+        entry = [sheet[field] for field in SHEET_FIELDS]
+        entry[SHEET_FIELDS.index('components')] = [
+            component.toTuple() for component in sheet['components']]
+        if sheet['layout'] is not None:
+            # marshal does not store arrays
+            names, layout = sheet['layout']
+            entry[SHEET_FIELDS.index('layout')] = (names, layout.tobytes())
+        self.getEntries()[digest] = tuple(entry)
+        self.modified = True
+
+    def save(self, keep):
+        """ writes the cache into the file. Entries of the hashes in
+        keep (the sheets of the project) are always stored, from the
+        others only PARSE_CACHE_SIZE most recently used are kept. The
+        entries are released afterwards
+        """
+        if self.entries is None:
+            return
+        stale = [digest for digest in self.entries if digest not in keep]
+        for digest in stale[:max(0, len(stale) - PARSE_CACHE_SIZE)]:
+            self.entries.pop(digest)
+            self.modified = True
+        if self.modified:
+            data = {'version': PARSER_VERSION,
+                    'sheets': dict(self.entries)}
+            # write into temporary file first, so the cache is never
+            # left half written
+            try:
+                with open(self.filename + "tmp", "wb") as f:
+                    marshal.dump(data, f)
+                os.replace(self.filename + "tmp", self.filename)
+                self.modified = False
+            except OSError as e:
+                self.logger.warning("Cannot write parse cache %s: %s" %
+                                    (self.filename, str(e)))
+                # kept to be written next time
+                return
+        self.entries = None
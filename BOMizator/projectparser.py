@@ -0,0 +1,1315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Class responsible for simple parsing of SCH files. It takes as input
+argument a directory and searches for all .sch (or .kicad_sch) files,
+then looks for all the embedded components. It does not depend on Qt, hence it is
+used by the graphical interface as well as by the command line tools
+"""
+
+import os
+import filecmp
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from .headernames import headernames
+from .qdesignatorcomparator import QDesignatorComparator
+from .schtokenizer import schTokenizer
+from .sheetparser import sheetLines, parseSheet, SHEET_ENCODING
+from .sexprsheetparser import sexprSheetParser, isSexprSheet
+from .parsecache import parseCache
+from .inisettings import iniSettings
+from .bomdataaccess import createBOMDataAccess
+from .stagetimer import stageTimer
+from .suppexceptions import DesignatorNotFound
+import logging
+
+
+def loadProject(projectFile, workers=1):
+    """ parses the project without Qt and returns projectParser with
+    the project configuration read from its .bmz file
+    """
+    bzfile = os.path.splitext(projectFile)[0] + ".bmz"
+    project = projectParser(projectFile, iniSettings(bzfile), workers)
+    project.parseComponents()
+    return project
+
+
+class projectParser(object):
+    """ Parses the KiCad schematics files for components
+    """
+
+    # KiCad 6+ projects (.kicad_pro) use schematic files in
+    # S-expression format, older (.pro) the legacy ones
+    SEXPR_PROJECT = ".kicad_pro"
+    SEXPR_EXTENSION = ".kicad_sch"
+    LEGACY_EXTENSION = ".sch"
+
+    def __init__(self, projectFile, localSettings, workers=1,
+                 bomDataAccessType=None):
+        """ projectFile points to a specific .pro file from KiCad,
+        localSettings give access to the project configuration (.bmz)
+        file through QSettings interface, workers is the number of
+        processes used to parse the schematic files. With single
+        worker all the files are parsed in the current process.
+        bomDataAccessType selects the storage of BOM data (plugin
+        filename) if the project does not have them stored yet
+        """
+        self.logger = logging.getLogger('bomizator')
+
+        self.projectFile = projectFile
+        # configuration filename is derived from projectname
+        cfile = os.path.splitext(self.projectFile)[0]
+        # KiCad 7+ sheets shared by several projects keep the
+        # designators of each of them, named by the project filename
+        self.projectName = os.path.basename(cfile)
+        # local settings are read directly from the project
+        # directory. If exist, they store information about suppressed
+        # items (and other things for the future)
+        self.localSettings = localSettings
+        self.header = headernames()
+        self.workers = workers
+        # measures the stages of parsing when an operation is being
+        # timed, the application sets up its own
+        self.timer = stageTimer()
+        # tokenizer splitting the attribute lines, shared by load and
+        # save
+        self.tokenize = schTokenizer()
+        # we cannot do a simple looking for schematic files. Instead
+        # we need to walk through the files and look for particular
+        # project file, which tells us (from the filename), which is
+        # the top-level schematic. this one has to be then parsed for
+        # $sheet items and their attributes to see all the schematic
+        # files appearing in the project. If we do not do so, we might
+        # parse schematic files, which are broken, or are not part of
+        # the project.
+        # sheets keep for each schematic file its size, mtime and
+        # content hash together with the data derived from its content
+        # (sub-sheets and components). These are used to re-parse
+        # only the sheets, which changed since last parsing. The same
+        # data are persistently stored in the parse cache, hence even
+        # the first parsing of unchanged sheets is avoided
+        self.sheets = {}
+        self.parseCache = parseCache(cfile + ".bpc")
+        # schematic files of the project in the project order, they
+        # are collected when the components are parsed
+        self.matches = []
+
+        # components is a dictionary of dict. each component is
+        # identified by dictionary of
+        # designator/libref/value/footprint .... to uniquely match it
+        # to the bill of material. IF SOME ATTRIBUTES DO NOT EXIST (as
+        # e.g. mfg), they are not created during the file writing, but
+        # they are created on fly by a dynamic assignment of the data.
+        # this list is the one giving the BOM data
+        self.components = {}
+        # designator index maps each single designator to the
+        # normalised designator under which the component is stored in
+        # self.components. It is maintained by addComponent and
+        # removeComponent and makes the lookup of the component from
+        # any of its designators a single dictionary access
+        self.designatorIndex = {}
+        # order code index maps (supplier, supplier no) to the set of
+        # normalised designators of the components ordered under
+        # this code. It is maintained by addComponent, removeComponent
+        # and updateComponents, hence looking up the components of an
+        # ordering item does not pass through all the components
+        self.orderCodeIndex = defaultdict(set)
+        # ordering items keep for each (supplier, supplier no) the
+        # data collected from its components (see
+        # getCollectedComponents). They are kept separately with and
+        # without disabled components, built on first request and
+        # then only the items touched by modifications (stale items)
+        # are collected again
+        self.orderItems = {}
+        self.staleOrderItems = {}
+        # revision is incremented by each modification of the
+        # collected components or BOM data, hence views know whether
+        # they have to be rebuilt
+        self.revision = 0
+        # normalised designators of the components modified since the
+        # project was loaded or saved. Only the schematic files
+        # containing these components are rewritten by save
+        self.dirtyComponents = set()
+        # bomdata collect information from supplier/ref of how many
+        # mult/add/policy per each such item is needed. They are
+        # stored separately from the project settings
+        self.bomDataAccess = createBOMDataAccess(projectFile,
+                                                 bomDataAccessType)
+        self.bomdata = self.loadBOMData()
+
+        # disabled designators are those which are 'grayed out' and
+        # any modification operation over them is ignored. Their list
+        # is loaded from project configuration file
+        self.loadDisabledDesignators()
+
+        # general multiplier is used to multiple the unit-production
+        # amount of components by a specific amount to generate total
+        # BOM for x-pieces.
+        self.loadGlobalMultiplier()
+
+    def reload(self):
+        """ reloads the project. All unsaved changes are discarded,
+        project settings are read again and only the schematic files
+        which changed since the last parsing are parsed again. Their
+        components are spliced with the ones of unchanged sheets
+        """
+        self.reloadSettings()
+        self.parseComponents()
+
+    def reloadSettings(self):
+        """ reads again the project settings and BOM data, the
+        components are not touched
+        """
+        self.localSettings.sync()
+        self.bomdata = self.loadBOMData()
+        self.loadDisabledDesignators()
+        self.loadGlobalMultiplier()
+
+    def loadGlobalMultiplier(self):
+        self.globalMultiplier = self.localSettings.value(
+            'globalMultiplier',
+            1,
+            int)
+
+    def setGlobalMultiplier(self, mlt):
+        """ sets new global multiplier for the data
+        """
+        self.globalMultiplier = mlt
+        self.revision += 1
+
+    def getGlobalMultiplier(self):
+        return self.globalMultiplier
+
+    def loadDisabledDesignators(self):
+        """ stores list of disabled operators into the local set
+        """
+        self.disabledDesignators = set(self.localSettings.value(
+            'disabledDesignators',
+            [],
+            str))
+        self.invalidateOrderItems()
+
+    def getDisabledDesignators(self):
+        """ returns _set_ of currently disabled designators. We return
+        set because it represents unique items. Each designator is
+        only single unique item (even if containing multiple designators)
+        """
+        return self.disabledDesignators
+
+    def disableDesignators(self, desig):
+        """ list of designators provided will be stored in the
+        designator file.
+        """
+        self.disabledDesignators = set(desig)
+        self.invalidateOrderItems()
+
+    def enableDesignator(self, desig, value):
+        """ removes or adds designator to the disabled designators
+        list according to what is requested. True enables the
+        designator by removing it from the disabledDesignators list
+        """
+        if not value:
+            self.disabledDesignators.add(desig)
+        else:
+            self.disabledDesignators.discard(desig)
+        try:
+            self.invalidateOrderItems([self.getOrderCode(
+                self.getComponent(desig))])
+        except KeyError:
+            # not loaded component
+            pass
+
+    def getComponents(self):
+        """ returns dictionary of all loaded components
+        """
+        return self.components
+
+    def getBOMData(self, supplier, ocode):
+        """ returns BOM data for given supplier and ordering code
+        """
+        return self.bomdata[supplier][ocode]
+
+    def updateBOMData(self, supplier, ocode, data):
+        """ for given supplier and ocode we update the BOM data. data
+        is a dictionary stating which data have to be changed by what value
+        """
+        self.bomdata[supplier][ocode].update(data)
+        self.revision += 1
+
+    def getDoNotOrder(self, components):
+        """ give list of (supplier, orderno) it returns a vector of
+        true/false if the components are disabled/enabled for
+        ordering.
+        """
+        iss = map(lambda ix:
+                  self.bomdata[ix[0]][ix[1]][self.header.DONOTORDER],
+                  components)
+        return list(map(bool, iss))
+
+    def updateComponents(self, targets, newdata):
+        """ Update all the componenents identified by list of
+        normalised designators by new data for each key of
+        newdata. Newdata is a dictionary of
+        items to change, designators is a list of designators whose
+        values have changed
+        """
+        # we filter all the components having the designators. Problem
+        # here is, that in order to filter items of interest we need
+        # to compare if one of the designators is in one of the set of
+        # the components, and we need to do it one by one (due to
+        # multichannel design)
+        reindex = self.header.SUPPLIER in newdata or\
+            self.header.SUPPNO in newdata
+        # designators, libref, value and footprint identify the
+        # component in the schematic and are never written, the
+        # model passes them e.g. when a row gets enabled
+        newdata = dict(filter(lambda item: item[0] not in
+                              [self.header.DESIGNATOR] +
+                              self.header.UNIQUEITEM,
+                              newdata.items()))
+        for normDesig in targets:
+            dsg = self.getNormalisedKey(normDesig)
+            target = self.components[dsg]
+            ordercode = self.getOrderCode(target)
+            if reindex:
+                self.unindexOrderCode(dsg, target)
+            # we browse here all the components and update their
+            # parameters. The component becomes dirty only if the
+            # value really changes (the model sets all the columns
+            # when the row is e.g. enabled)
+            modified = False
+            for key, val in newdata.items():
+                if target[key] != val:
+                    target[key] = val
+                    modified = True
+            if reindex:
+                self.indexOrderCode(dsg, target)
+            if modified:
+                self.dirtyComponents.add(dsg)
+                self.invalidateOrderItems([ordercode,
+                                           self.getOrderCode(target)])
+
+    def getComponent(self, normDesig):
+        """ returns component identified by normalised designator, or
+        by any single designator of the component
+        """
+        return self.components[self.getNormalisedKey(normDesig)]
+
+    def getNormalisedKey(self, desig):
+        """ returns normalised designator (key into components) of
+        the component to which desig belongs. Desig can be either
+        normalised designator or any single designator of the
+        component. KeyError is raised if no such component exists
+        """
+        if desig in self.components:
+            return desig
+        return self.designatorIndex[desig]
+
+    def addComponent(self, component):
+        """ stores component into the list of components under its
+        normalised designator and registers all its designators in the
+        designator index. Returns the normalised designator
+        """
+        dsg = self.getNormalisedDesignators(component[self.header.DESIGNATOR])
+        self.components[dsg] = component
+        for desig in component[self.header.DESIGNATOR]:
+            self.designatorIndex[desig] = dsg
+        self.indexOrderCode(dsg, component)
+        return dsg
+
+    def removeComponent(self, normDesig):
+        """ removes the component identified by normalised designator
+        (or any of its designators) from the list of components and
+        from the designator index. Returns the removed component
+        """
+        dsg = self.getNormalisedKey(normDesig)
+        component = self.components.pop(dsg)
+        for desig in component[self.header.DESIGNATOR]:
+            self.designatorIndex.pop(desig, None)
+        self.unindexOrderCode(dsg, component)
+        return component
+
+    def indexOrderCode(self, normDesig, component):
+        """ registers the component stored under normalised
+        designator in the order code index
+        """
+        ordercode = self.getOrderCode(component)
+        self.orderCodeIndex[ordercode].add(normDesig)
+        self.invalidateOrderItems([ordercode])
+
+    def unindexOrderCode(self, normDesig, component):
+        """ removes the component from the order code index, the
+        ordering items without components are forgotten
+        """
+        key = self.getOrderCode(component)
+        designators = self.orderCodeIndex.get(key)
+        if designators is not None:
+            designators.discard(normDesig)
+            if not designators:
+                self.orderCodeIndex.pop(key)
+        self.invalidateOrderItems([key])
+
+    def getOrderCode(self, component):
+        """ returns tuple (supplier, supplier no) of the
+        component. Unlike item access it does not create the
+        attributes, which are not set, hence the saved schematic does
+        not get empty fields
+        """
+        return (component.get(self.header.SUPPLIER, ''),
+                component.get(self.header.SUPPNO, ''))
+
+    def getOrderCodeDesignators(self, supplier, ordercode):
+        """ returns set of normalised designators of the components
+        ordered from the supplier under the ordering code
+        """
+        return set(self.orderCodeIndex.get((supplier, ordercode), ()))
+
+    def getComponentsByOrderCode(self, ordercode, supplier=None):
+        """ returns component definition from its ordering code. If
+        the supplier is not given, components of all the suppliers
+        using the ordering code are returned
+        """
+        if supplier is None:
+            keys = filter(lambda key: key[1] == ordercode,
+                          list(self.orderCodeIndex))
+        else:
+            keys = [(supplier, ordercode)]
+        return [self.components[dsg]
+                for key in keys
+                for dsg in sorted(self.getOrderCodeDesignators(*key),
+                                  key=QDesignatorComparator())]
+
+    def getCollectedComponents(self, includeDisabledComponents=False):
+        """ returns dictionary of all components _collected by
+        supplier and  supplier reference. When some components are
+        disabled, they do not appear in the list of collected
+        components unless includeDisabledComponents is set to true.
+        The suppliers and their ordering codes are sorted
+        """
+        items = self.getOrderItems(includeDisabledComponents)
+        collected = defaultdict(dict)
+        for supplier, ordercode in sorted(items):
+            item = items[(supplier, ordercode)]
+            cdata = dict(item)
+            cdata['Designators'] = set(item['Designators'])
+            # update new data by supplier information, we have to
+            # create the SAFE bom data if not existing
+            try:
+                bomdata = self.bomdata[supplier][ordercode]
+            except KeyError:
+                bomdata = self.getDefaultBOMData()
+                self.bomdata.setdefault(supplier, {})[ordercode] = bomdata
+            cdata.update(bomdata)
+            collected[supplier][ordercode] = cdata
+        unassigned = set()
+        for (supplier, ordercode), designators in\
+                self.orderCodeIndex.items():
+            if ordercode == '':
+                unassigned.update(designators)
+        if not includeDisabledComponents:
+            unassigned -= self.disabledDesignators
+        if unassigned:
+            self.logger.warning("%s: unassigned supplier,\
+ ignoring" % (', '.join(sorted(unassigned,
+                               key=QDesignatorComparator()))))
+        return collected
+
+    def getOrderItems(self, includeDisabledComponents=False):
+        """ returns dictionary of the ordering items, which keys are
+        tuples (supplier, supplier no) and values are dictionaries of
+        data collected from the components ordered under this
+        code. The items, which components changed since the last
+        call are collected again
+        """
+        items = self.orderItems.get(includeDisabledComponents)
+        if items is None:
+            items = {}
+            stale = set(self.orderCodeIndex)
+        else:
+            stale = self.staleOrderItems[includeDisabledComponents]
+        for key in stale:
+            item = self.collectOrderItem(key, includeDisabledComponents)
+            if item is None:
+                items.pop(key, None)
+            else:
+                items[key] = item
+        self.orderItems[includeDisabledComponents] = items
+        self.staleOrderItems[includeDisabledComponents] = set()
+        return items
+
+    def collectOrderItem(self, key, includeDisabledComponents=False):
+        """ collects the data of the ordering item identified by key
+        (supplier, supplier no) from its components. Returns None if
+        there is no such component (or all of them are disabled) or
+        if the supplier number is not assigned
+        """
+        if key[1] == '':
+            return None
+        item = None
+        for dsg in sorted(self.orderCodeIndex.get(key, ()),
+                          key=QDesignatorComparator()):
+            if dsg in self.disabledDesignators and\
+               not includeDisabledComponents:
+                continue
+            component = self.components[dsg]
+            if item is None:
+                item = {'Designators': set()}
+            # copy original data from the component (!! ALL OF THEM
+            # SHOULD BE THE SAME!!)
+            for hx in [self.header.MANUFACTURER,
+                       self.header.MFRNO,
+                       self.header.DATASHEET,
+                       self.header.LIBREF,
+                       self.header.VALUE]:
+                item[hx] = component[hx]
+            item['Designators'].update(component[self.header.DESIGNATOR])
+        return item
+
+    def invalidateOrderItems(self, keys=None):
+        """ marks the ordering items of given keys (supplier,
+        supplier no) to be collected again. Without keys all of them
+        are forgotten
+        """
+        self.revision += 1
+        if keys is None:
+            self.orderItems = {}
+            self.staleOrderItems = {}
+            return
+        for stale in self.staleOrderItems.values():
+            stale.update(keys)
+
+    def getRevision(self):
+        """ returns number, which changes whenever the collected
+        components or their BOM data change
+        """
+        return self.revision
+
+    def getDefaultBOMData(self):
+        """ returns dictionary of BOMDATA such, that if 'no initial
+        condition' is defined, the total number of components calculus
+        returns exact value. Total is by default set to -1 to
+        indicate, that the value is invalid (and hence if model gets
+        loaded, the data are automatically pre-filled in
+        """
+        return {self.header.MULTIPLYFACTOR: "1",
+                self.header.ADDFACTOR: "0",
+                self.header.DONOTORDER: 0,
+                self.header.TOTAL: -1,
+                self.header.POLICY: 1}
+
+    def saveBOMData(self):
+        """ currently assigned BOMdata are written at once into the
+        BOM data storage. BOM data of older projects stored in the
+        settings file are removed from there, as they are migrated
+        """
+        self.bomDataAccess.save(self.bomdata)
+        for supplier in self.localSettings.childGroups():
+            self.localSettings.remove(supplier)
+
+    def getGroupName(self, supp, ref):
+        """ returns settings group name for bomdata
+        """
+        return '-'.join([supp, ref])
+
+    def loadBOMData(self):
+        """ loads the BOM data from the BOM data storage and returns
+        the dictionary of these data. If the storage does not exist
+        yet, BOM data are read from the settings file, where older
+        projects keep them (they get migrated on next save)
+        """
+        if not self.bomDataAccess.validate():
+            return self.loadSettingsBOMData()
+        self.logger.info("Loading BOM data from %s" % (self.bomDataAccess, ))
+        coll = self.bomDataAccess.load()
+        for supplier in coll.values():
+            for cmpn in supplier.values():
+                for keys, val in cmpn.items():
+                    cmpn[keys] = self.getBOMValue(keys, val)
+        return coll
+
+    def getBOMValue(self, keys, val):
+        """ returns BOM data value converted to the type used by the
+        models, in the same way as when read from the settings file
+        """
+        if keys in [self.header.MULTIPLYFACTOR,
+                    self.header.ADDFACTOR]:
+            # missing value is empty string, as in the settings file
+            return "" if val is None else str(val)
+        try:
+            return int(val)
+        except (TypeError, ValueError):
+            # e.g. null stored in the JSON file
+            return -1
+
+    def loadSettingsBOMData(self):
+        """ loads the BOM data as stores in the configuration file,
+        returns the dictionary of these data
+        """
+        coll = {}
+        for supplier in self.localSettings.childGroups():
+            self.localSettings.beginGroup(supplier)
+            coll[supplier] = {}
+            for refname in self.localSettings.childGroups():
+                self.localSettings.beginGroup(refname)
+                coll[supplier][refname] = {}
+                for keys in self.localSettings.childKeys():
+                    # by default selects -1, but that is only the case
+                    # when the file is _broken_ as we're reading
+                    # existing values
+                    if keys in [self.header.MULTIPLYFACTOR,
+                                self.header.ADDFACTOR]:
+                        # these two are treated as strings as when
+                        # total is enforced, these values are empty
+                        coll[supplier][refname][keys] = self.localSettings.value(
+                            keys,
+                            "",
+                            str)
+                    else:
+                        # all other are treated as integers, even
+                        # 'donotorder', which when -1, then it is not defined
+                        coll[supplier][refname][keys] = self.localSettings.value(
+                            keys,
+                            -1,
+                            int)
+
+                self.localSettings.endGroup()
+            self.localSettings.endGroup()
+        return coll
+
+    def save(self):
+        """ function parses all the project schematic files,
+        identifies all the components and _replaces particular
+        attributes_ to get all the information from the treeview
+        stored directly in kicad sch as attribute. Now, the attribute
+        in kicad corresponding to 'user' attribute is the one starting
+        with 'F'. First three F attributes (F0, F1, F2) are defined
+        purpose. The F3 attribute is 'documentation',
+        i.e. datasheet. All other attributes are user definable and
+        have following format:
+        F 4 "1737246" H 9850 1300 60  0001 C CNN "FARNELL"
+
+        F4 is the attribute, followed by attribute's value,
+        horizontal, x, y, length, visibility, center, further, and at
+        the end the attribute name, which is in this case farnell. WE
+        CANNOT IMPOSE THE ATTRIBUTE NUMBER TO BE FIXED as user might
+        already enter another attributes from the schematic, but we
+        can make our own just by adding first free number, or we can
+        modify already existing ones, if these are different from the
+        data given.
+
+        The data variable is the complete dictionary of the data to be
+        changed. They are only updated in the schematics if the
+        attribute of a given component is either missing, or different
+        from our data.
+
+        The algorithm for save uses the same mechanism as loading the
+        data - the state machine parses the document, identifying
+        header, position, designator etc, and when in saving mode we
+        put an attention into parsing the F attributes and their
+        change depending of currently detected designator.
+
+        """
+
+        # first save project variables
+        self.localSettings.setValue('disabledDesignators',
+                                    list(self.disabledDesignators))
+        self.localSettings.setValue('globalMultiplier',
+                                    self.globalMultiplier)
+
+        # then parse schematic files and make them update the
+        # parameters. Go through the schematic files containing
+        # modified components
+        for schfile in self.getModifiedSheets():
+            # the updated file is written into schfile+"tmp"
+            if schfile.endswith(self.SEXPR_EXTENSION):
+                self.writeSexprSheet(schfile)
+            elif not self.spliceLegacySheet(schfile):
+                self.writeLegacySheet(schfile)
+            # if nothing changed in the file (e.g. the value was set
+            # back), we keep the original untouched
+            if filecmp.cmp(schfile, schfile+"tmp", shallow=False):
+                os.remove(schfile+"tmp")
+                continue
+            # now we just move the newly created file to the old one
+            # and ... pray. WINDOWS COMPATIBILITY: one cannot rename
+            # the tmp file directly to target if target exists (under
+            # linux this works), hence we need first to delete the
+            # original
+            exfile = os.path.splitext(schfile)[0]
+            try:
+                # yeah, windows style :(
+                os.remove(exfile+".bak")
+            except FileNotFoundError:
+                pass
+            os.rename(schfile, exfile+".bak")
+            os.rename(schfile+"tmp", schfile)
+        # all the modifications are now written
+        self.dirtyComponents = set()
+        # and save BOM:
+        self.saveBOMData()
+
+    def spliceLegacySheet(self, schfile):
+        """ writes the legacy schematic file schfile with updated
+        attributes of the components into schfile+"tmp" using the
+        layout of the components in the file. Only the values of the
+        attributes, which differ, are replaced and the new attributes
+        are inserted, everything else is copied as is. Returns False
+        if the layout is not available or the file changed since it
+        was parsed, then nothing is written
+        """
+        with open(schfile, "rb") as f:
+            content = f.read()
+        sheet = self.sheets.get(schfile)
+        if not sheet or hashlib.md5(content).hexdigest() != sheet['hash'] or\
+           sheet.get('layout') is None:
+            return False
+        names, layout = sheet['layout']
+        # edits are tuples (start, end, replacement) in the order of
+        # the file
+        edits = []
+        index = 0
+        for component in sheet['components']:
+            # layout of the component, see sheetParser.getSheetLayout
+            highestF, x, y, body, count = layout[index:index + 5]
+            fields = [(layout[field], names[layout[field + 1]],
+                       layout[field + 2], layout[field + 3])
+                      for field in range(index + 5, index + 5 + 4 * count,
+                                         4)]
+            index += 5 + 4 * count
+            designator = min(component[self.header.DESIGNATOR])
+            try:
+                datain = self.components[self.designatorIndex[designator]]
+            except KeyError:
+                raise DesignatorNotFound(
+                    "Designator %s found in %s does\
+ not resolve in any parsed component. Was the schematic modified\
+ since the project was loaded?" % (designator, schfile))
+            # items identifying the component are not written (see
+            # writeLegacySheet)
+            replaceby = dict(datain.items())
+            replaceby.pop(self.header.VALUE)
+            replaceby.pop(self.header.FOOTPRINT)
+            replaceby.pop(self.header.LIBREF)
+            replaceby.pop(self.header.DESIGNATOR)
+            for number, name, start, end in fields:
+                if number == 3:
+                    # datasheet
+                    value = replaceby.pop(self.header.DATASHEET, None)
+                elif number > 3 and name in replaceby:
+                    value = replaceby.pop(name)
+                else:
+                    continue
+                if value is None:
+                    continue
+                value = ('"' + value + '"').encode(SHEET_ENCODING)
+                if content[start:end] != value:
+                    edits.append((start, end, value))
+            if replaceby and body >= 0:
+                # new attributes are inserted before the component
+                # body, formatted as kicad does
+                newline = b'\r\n' if content[:body].endswith(b'\r\n')\
+                    else b'\n'
+                newattrs = []
+                for number, (key, val) in enumerate(replaceby.items()):
+                    newattrs.append(
+                        ('F %d "%s" H %s %s 60  0001 C CNN "%s"'
+                         % (highestF + 1 + number, val, x, y, key)).encode(
+                             SHEET_ENCODING) + newline)
+                edits.append((body, body, b''.join(newattrs)))
+        # unchanged parts of the file are copied in between the edits
+        with open(schfile+"tmp", "wb") as f:
+            position = 0
+            for start, end, replacement in edits:
+                f.write(content[position:start])
+                f.write(replacement)
+                position = end
+            f.write(content[position:])
+        return True
+
+    def writeLegacySheet(self, schfile):
+        """ writes the legacy schematic file schfile with updated
+        attributes of the components into schfile+"tmp". The file is
+        parsed again, this is used when the file changed since it was
+        loaded or its layout is not known
+        """
+        inComponent = False
+        # and now let's run through
+        with open(schfile, "rt") as codeline:
+            # first let's open new filename
+            with open(schfile+"tmp", "wt") as wrline:
+                for code in codeline:
+                    # by default the line we write into output
+                    # file is the same as input one
+                    lineOut = code
+                    # let's wait until component header gets in
+                    if not inComponent and\
+                       code.startswith("$Comp"):
+                        inComponent = True
+                        # ignore is used to skip all
+                        # non-interesting components, starting
+                        # with hash (as e.g. #PWR11)
+                        ignore = False
+                        # clear out such, that if some attributes
+                        # were not identified during traversing
+                        # the list, they would cause keyerror
+                        designator, libref = None, None
+                        center = None
+                        replaceby = None
+                    # end of component identified
+                    elif inComponent and\
+                         code.startswith("$EndComp"):
+                        inComponent = False
+                    # catching L attribute containing footprint
+                    # and designator.
+                    elif inComponent and not ignore and\
+                         code.startswith("L "):
+                        # get designator and reference
+                        _, libref, designator = self.tokenize(code)
+                        # and we can identify which component
+                        # we're replacing. There has to be
+                        # _exactly one_. If not, there's an issue!
+                        # (so that's why we do not try here, but
+                        # assume)
+                        if designator.startswith("#"):
+                            ignore = True
+                        else:
+                            # the point is: EACH DESIGNATOR MUST
+                            # RESOLVE IN EXACTLY ONE COMPONENT. If
+                            # not, this is an error. It gets slightly
+                            # more difficult as hierarchical designs
+                            # export multiple designators for each
+                            # component if that one is part of a
+                            # shared sheet. That's why we're looking
+                            # for a designator in the designator
+                            # index, which maps each single
+                            # designator to its component
+                            try:
+                                datain = self.components[
+                                    self.designatorIndex[designator]]
+                            except KeyError:
+                                raise DesignatorNotFound(
+                                    "Designator %s found in %s does\
+ not resolve in any parsed component. Was the schematic modified\
+ since the project was loaded?" % (designator, schfile))
+                            # we need to create a copy for poping
+                            # the data out (such we find which
+                            # items are still to be written into
+                            # the component)
+                            replaceby = dict(datain.items())
+                            # we pop out items, which are
+                            # non-writable:
+                            replaceby.pop(self.header.VALUE)
+                            replaceby.pop(self.header.FOOTPRINT)
+                            replaceby.pop(self.header.LIBREF)
+                            replaceby.pop(self.header.DESIGNATOR)
+                            # save highest seen F attribute
+                            # (needed to add new attr)
+                            highestF = 0
+                    # we can completely ignore here U and AR attributes as
+                    # well as numeric attributes because we do not
+                    # need them. We however need P attribute just
+                    # in case to add new (not-existing) attribute
+                    elif inComponent and not ignore and\
+                         code.startswith("P "):
+                        # center point of the component
+                        center = self.tokenize(code)[1:]
+                    # F-parameters - the core of our work: we have
+                    # to look on their content and modify/add if
+                    # necessary.
+                    elif inComponent and not ignore and\
+                         code.startswith("F "):
+                        # here we have to split lexically as
+                        # parameters might contain spaces within
+                        # quotes, which count as a single string
+                        fattr = self.tokenize(code)
+                        # store highest F attribute seen
+                        if highestF < int(fattr[1]):
+                            highestF = int(fattr[1])
+
+                        # we completely ignore attribures F0->F2
+                        # as they identify component
+                        if fattr[1] not in ['0', '1', '2']:
+                            # follow custom attributes. F3 is
+                            # always present and it is a
+                            # datasheet, we always overwrite it
+                            # this will _ONLY REPLACE EXISTING
+                            # ATTRIBUTES_
+                            if fattr[1] == '3':
+                                # refurbish datasheet attribute
+                                lpart = ' '.join(
+                                    [fattr[0], fattr[1]] +
+                                    ['"' +
+                                     replaceby.pop(self.header.DATASHEET) +
+                                     '"', ] +
+                                    fattr[3:7])
+                                rpart = ' '.join(fattr[7:])
+                                lineOut = lpart + "  " + rpart + "\n"
+                            elif fattr[-1] in replaceby.keys():
+                                # we have found one of the
+                                # attributes, modify its value
+                                lpart = ' '.join(
+                                    [fattr[0], fattr[1]] +
+                                    ['"' +
+                                     replaceby.pop(fattr[-1]) +
+                                     '"', ] +
+                                    fattr[3:7])
+                                rpart = ' '.join(
+                                    fattr[7:-1] +
+                                    ['"' +
+                                     fattr[-1] +
+                                     '"\n'])
+                                lineOut = lpart + "  " + rpart
+                    elif inComponent and not ignore and\
+                         code.startswith("\t"):
+                        # this is definition code. At this
+                        # place we need to _add nonexisting F
+                        # attributes_ before we write down
+                        # others, as e.g.:
+                        # F 4 "NC" H 6775 4400 60  0000 C CNN "Mounted"
+                        newattrs = []
+                        # default assignment
+                        lineOut = code
+                        try:
+                            # go through all the undefined
+                            # attributes:
+                            # NOTE THAT THERE ARE (FROM UNKNOWN
+                            # REASONS) TWO SPACES BETWEEN WIDTH
+                            # AND VISIBILITY ATTRIBUTE. we will
+                            # keep it as kicad wants as we want to
+                            # see only differences caused by
+                            # bomizator, and not due to different formatting
+                            for number, (key, val) in\
+                                enumerate(replaceby.items()):
+                                newattrs.append(
+                                'F %d "%s" H %s %s 60  0001 C CNN "%s"'\
+                                % (highestF + 1 + number,
+                                   val,
+                                   center[0],
+                                   center[1],
+                                   key))
+                            # at the end of loop we need to clear
+                            # out the dictionary as all attributes
+                            # were defined
+                            replaceby = {}
+                            # add the original code:
+                            lout = '\n'.join(newattrs + [code, ])
+                            lineOut = lout
+                        except KeyError:
+                            # there's nothing in the dictionary
+                            # any more, however to be sure we rise
+                            # keyerror if there's indeed something
+                            if len(replaceby):
+                                raise KeyError(replaceby)
+
+                    wrline.write(lineOut)
+
+    def writeSexprSheet(self, schfile):
+        """ writes the KiCad 6+ schematic file schfile with updated
+        properties of the components into schfile+"tmp". Only the
+        values of the properties are patched, the rest of the file is
+        kept as it is
+        """
+        def getComponent(designator):
+            try:
+                return self.components[self.designatorIndex[designator]]
+            except KeyError:
+                raise DesignatorNotFound(
+                    "Designator %s found in %s does\
+ not resolve in any parsed component. Was the schematic modified\
+ since the project was loaded?" % (designator, schfile))
+        # newline translation is disabled, such the offsets of the
+        # tokens correspond to the content and the line endings are
+        # kept
+        with open(schfile, "rt", encoding='utf-8', newline='') as f:
+            text = f.read()
+        with open(schfile+"tmp", "wt", encoding='utf-8', newline='') as f:
+            f.write(sexprSheetParser(
+                self.projectName,
+                self.sheets[schfile].get('references')).update(
+                    text, getComponent))
+
+    def getModifiedSheets(self):
+        """ returns list of schematic files containing at least one
+        of the modified components. As the components of shared
+        sheets and multipart components appear in several files, all
+        of them are returned
+        """
+        dirty = set()
+        for normDesig in self.dirtyComponents:
+            try:
+                dirty.update(
+                    self.getComponent(normDesig)[self.header.DESIGNATOR])
+            except KeyError:
+                # component no longer exists
+                pass
+        return list(filter(lambda fname:
+                           any(map(lambda component:
+                                   not dirty.isdisjoint(
+                                       component[self.header.DESIGNATOR]),
+                                   self.sheets[fname]['components'])),
+                           self.matches))
+
+    def collectFiles(self):
+        """ uses project directory to pass through the projects
+        """
+
+        # having the project file the top-level schematic shares the
+        # filenames, we can recursively search through using simple
+        # parsing. Sheet instances count how many times is each sheet
+        # used in the project
+        projectFiles = []
+        self.sheetInstances = defaultdict(int)
+        # designators of the symbols of KiCad 6 sheets given by the
+        # top-level sheet, see getSheetReferences
+        self.sheetReferences = {}
+        fname = os.path.splitext(self.projectFile)[0] +\
+            self.getSheetExtension()
+        dirname, core = os.path.split(fname)
+        for fn in os.listdir(dirname):
+            if core.lower() == fn.lower():
+                # case insensitive match of the file:
+                toparse = os.path.realpath(os.path.join(dirname, fn))
+                projectFiles += self.getSheets(toparse)
+        for sheet, count in self.sheetInstances.items():
+            if count > 1:
+                self.logger.info("Sheet %s used %d times" % (sheet, count))
+        # order is kept as it determines which of the multiply
+        # defined designators is kept
+        return list(dict.fromkeys(projectFiles))
+
+    def getSheetExtension(self):
+        """ returns extension of the schematic files of the project
+        """
+        if self.projectFile.lower().endswith(self.SEXPR_PROJECT):
+            return self.SEXPR_EXTENSION
+        return self.LEGACY_EXTENSION
+
+    def getSheet(self, fname):
+        """ returns dictionary describing the schematic file
+        fname. It contains size, mtime and content hash of the file,
+        and if the file changed since the last call, its content. Data
+        derived from the content (sub-sheets, components) are stored
+        into the same dictionary, hence they are available as long as
+        the file does not change. If size or mtime of the file are
+        modified, the file is read and if its hash differs, new
+        dictionary is returned
+        """
+        stat = os.stat(fname)
+        sheet = self.sheets.get(fname)
+        if sheet and sheet['size'] == stat.st_size and\
+           sheet['mtime'] == stat.st_mtime_ns:
+            return sheet
+        with open(fname, "rb") as f:
+            content = f.read()
+        digest = hashlib.md5(content).hexdigest()
+        if sheet and sheet['hash'] == digest:
+            # file touched, but its content is the same
+            sheet['size'] = stat.st_size
+            sheet['mtime'] = stat.st_mtime_ns
+            return sheet
+        sheet = {'size': stat.st_size,
+                 'mtime': stat.st_mtime_ns,
+                 'hash': digest}
+        cached = self.parseCache.get(digest)
+        if cached:
+            sheet.update(cached)
+        else:
+            sheet['content'] = content
+        self.sheets[fname] = sheet
+        return sheet
+
+    def getSheets(self, fname):
+        """ opens the sheet fname, parses it for sub-sheets and
+        returns their list. Each sheet appears in the list only once,
+        even if it is used several times in the hierarchy, the number
+        of its instances is added to self.sheetInstances.
+        """
+        # sheets are walked in depth first order, each of them only
+        # once. Having the sub-sheets of each sheet, the number of
+        # instances is propagated from parents to children in reverse
+        # post-order, in which each parent comes before its children
+        preorder, postorder, children = [], [], {}
+        self.walkSheets(fname, frozenset(), preorder, postorder, children)
+        instances = defaultdict(int)
+        instances[fname] = 1
+        for parent in reversed(postorder):
+            for child, _ in children[parent]:
+                instances[child] += instances[parent]
+        for sheet, count in instances.items():
+            self.sheetInstances[sheet] += count
+        self.sheetReferences.update(self.getSheetReferences(fname,
+                                                            children))
+        return preorder
+
+    def getSheetReferences(self, fname, children):
+        """ returns dictionary {sheet: {symbol uuid: [designators]}}
+        resolving the symbol_instances of KiCad 6 top-level sheet
+        fname. Each path of the symbol instances is composed of the
+        uuids of the sheet instances leading to the symbol, children
+        gives for each sheet the list of (sub-sheet, sheet uuid) of
+        its sub-sheet instances (see walkSheets). The designators of
+        the sheet used several times are collected from all the paths
+        leading to it
+        """
+        symbolInstances = self.sheets[fname]['symbolinstances']
+        if not symbolInstances:
+            return {}
+        # sheet path -> sheet. The walk excluded cyclic references,
+        # hence all the paths are finite
+        paths = {'': fname}
+        pending = [('', fname)]
+        while pending:
+            path, sheet = pending.pop()
+            for child, sheetid in children[sheet]:
+                paths[path + '/' + sheetid] = child
+                pending.append((path + '/' + sheetid, child))
+        references = {}
+        for path, designator in symbolInstances.items():
+            sheetpath, _, uuid = path.rpartition('/')
+            if sheetpath not in paths:
+                self.logger.warning("Symbol instance %s (%s) is not\
+ placed in any sheet, ignoring" % (path, designator))
+                continue
+            references.setdefault(paths[sheetpath], {}).setdefault(
+                uuid, []).append(designator)
+        return references
+
+    def walkSheets(self, fname, ancestors, preorder, postorder, children):
+        """ recursively walks the sheet fname and its sub-sheets, which
+        were not walked yet. Sheets are identified by their resolved
+        paths, children collects for each sheet the list of its
+        sub-sheets (one tuple (sub-sheet, sheet uuid) per sub-sheet
+        instance). Ancestors are
+        the sheets on the path from the top-level sheet, sub-sheet
+        referencing one of them is a cyclic reference and is ignored
+        """
+        if fname in children:
+            # already walked
+            return
+        children[fname] = []
+        preorder.append(fname)
+        sheet = self.getSheet(fname)
+        if 'subsheets' not in sheet:
+            self.logger.info("Parsing " + fname)
+            if isSexprSheet(sheet['content']):
+                sheet['subsheets'], sheet['sheetids'],\
+                    sheet['symbolinstances'] = sexprSheetParser(
+                    ).getHierarchy(sheet['content'])
+            else:
+                sheet['subsheets'] = self.getLegacySubsheets(
+                    sheet['content'])
+                sheet['sheetids'] = [''] * len(sheet['subsheets'])
+                sheet['symbolinstances'] = {}
+        dirname, core = os.path.split(fname)
+        ancestors = ancestors | {fname}
+        for sht, sheetid in zip(sheet['subsheets'], sheet['sheetids']):
+            # append proper dirname and re-request to parse the
+            # sub-sheet in this moment
+            subsheet = os.path.realpath(os.path.join(dirname, sht))
+            if subsheet in ancestors:
+                self.logger.error("Sheet %s references %s, which\
+ contains it. Ignoring cyclic reference" % (fname, subsheet))
+                continue
+            children[fname].append((subsheet, sheetid))
+            self.walkSheets(subsheet, ancestors, preorder, postorder,
+                            children)
+        postorder.append(fname)
+
+    def getLegacySubsheets(self, content):
+        """ returns list of filenames of the sub-sheets referenced by
+        the content of legacy schematic file
+        """
+        subsheets = []
+        insheet = False
+        for line in sheetLines(content):
+            if line.startswith("$Sheet"):
+                insheet = True
+            elif line.startswith("F1 ") and insheet:
+                # we have reached an attribute of the sheet, which
+                # tells us the filename of a subsheet
+                sht = line.split(" ")[1].replace('"', '')
+                subsheets.append(sht)
+            elif line.startswith('$EndSheet') and insheet:
+                insheet = False
+        return subsheets
+
+    def getNormalisedDesignators(self, designators):
+        """ takes set of designators, sorts them and normalises to
+        produce a single string identifying all the designators of
+        given component
+        """
+        return ', '.join(sorted(designators, key=QDesignatorComparator()))
+
+    def designatorDefined(self, designator):
+        """ returns true if any of the designators given is already
+        defined
+        """
+        # each designator of each component is registered in the
+        # designator index, hence no need to pass through entire
+        # component space
+        return any(map(lambda desig: desig in self.designatorIndex,
+                       designator))
+
+    def parseComponents(self):
+        """ after initial filenames matching this function parses all
+        the schematics files and gets the components names from the
+        files. These are pulled into the dictionary, which is later on
+        used either to get the info about the component, _or_ add/modify
+        appropriate attributes. Only the files which changed since
+        the last call are parsed, components of the others are
+        reused. When more than one worker is configured, the files
+        are parsed in parallel by a pool of processes.
+        """
+        self.clearComponents()
+        for fname, number, count in self.iterParseSheets():
+            self.mergeSheet(fname)
+
+    def iterParseSheets(self):
+        """ generator collecting the schematic files of the project
+        and parsing those, which changed since the last call. For each
+        sheet, in the project order, it yields tuple (filename, sheet
+        number, number of sheets) as soon as the components of the
+        sheet are available. The components are not merged into the
+        list of components, this is left to the caller (see
+        mergeSheet). Closing the generator before it is exhausted
+        cancels the parsing of the remaining sheets.
+        """
+        with self.timer.stage("discovery") as items:
+            self.matches = self.collectFiles()
+            toparse = []
+            for fname in self.matches:
+                sheet = self.getSheet(fname)
+                references = self.sheetReferences.get(fname, {})
+                if sheet.get('references') != references:
+                    # designators given by the top-level sheet changed
+                    # (or the sheet is not parsed yet)
+                    sheet.pop('components', None)
+                    sheet['references'] = references
+                if 'components' not in sheet:
+                    self.logger.info("Parsing " +
+                                     fname)
+                    if 'content' not in sheet:
+                        # unchanged sheet, which content was released
+                        with open(fname, "rb") as f:
+                            sheet['content'] = f.read()
+                    toparse.append(sheet)
+            items['sheets'] = len(self.matches)
+        # content is not needed any more after parsing, all the
+        # information is extracted
+        arguments = [(sheet.pop('content'), self.projectName,
+                      sheet['references']) for sheet in toparse]
+        pool = None
+        try:
+            if self.workers > 1 and len(toparse) > 1:
+                # futures are collected in the order of the sheets,
+                # hence the result does not depend on which worker
+                # finishes first
+                pool = ProcessPoolExecutor(max_workers=self.workers)
+                futures = [pool.submit(parseSheet, *args)
+                           for args in arguments]
+                parsed = iter(futures)
+            else:
+                # parsed one by one when requested
+                parsed = iter(arguments)
+            for number, fname in enumerate(self.matches):
+                sheet = self.sheets[fname]
+                if 'components' not in sheet:
+                    with self.timer.stage("parsing") as items:
+                        if pool:
+                            components, layout = next(parsed).result()
+                        else:
+                            components, layout = parseSheet(*next(parsed))
+                        items['sheets'] = 1
+                    sheet['components'] = components
+                    sheet['layout'] = layout
+                    self.parseCache.store(sheet['hash'], sheet)
+                yield fname, number + 1, len(self.matches)
+        finally:
+            if pool:
+                # when cancelled, sheets waiting for a worker are not
+                # parsed at all (cancel_futures argument of shutdown
+                # is not available before python 3.9)
+                for future in futures:
+                    future.cancel()
+                pool.shutdown(wait=True)
+            # forget files, which are no longer part of the project,
+            # and the sheets, which parsing was cancelled (their
+            # content is gone, they have to be read again)
+            for fname in list(self.sheets):
+                if fname not in self.matches or\
+                   'components' not in self.sheets[fname]:
+                    self.sheets.pop(fname)
+            with self.timer.stage("parse cache"):
+                self.parseCache.save(set(map(lambda sheet: sheet['hash'],
+                                             self.sheets.values())))
+
+    def clearComponents(self):
+        """ forgets all the components and their modifications
+        """
+        self.components = {}
+        self.designatorIndex = {}
+        self.orderCodeIndex = defaultdict(set)
+        self.dirtyComponents = set()
+        self.invalidateOrderItems()
+
+    def mergeSheet(self, fname):
+        """ adds the components of parsed sheet fname to the list of
+        components. Sheets have to be merged in the project order, as
+        for each multiply defined designator the first definition is
+        kept. Returns the list of normalised designators of the added
+        components
+        """
+        added = []
+        for xm in self.sheets[fname]['components']:
+            # before we append this component into selection we
+            # might check, whether it is not yet existing. This is
+            # done by checking in all previously defined
+            # components. This MIGHT happen with multipart
+            # devices, which are in schematic treated separately
+            if not self.designatorDefined(xm[self.header.DESIGNATOR]):
+                added.append(self.addComponent(xm.copy()))
+            else:
+                dgs = ', '.join(map(str,
+                                    xm[self.header.DESIGNATOR]))
+                txt = "Component(s) " + dgs +\
+                      " already defined. Multipart component?"
+                self.logger.warning(txt)
+        return added
+
+    def BOM(self):
+        """ iterator returns always a text-based list of [designator,
+        library part, manufacturer, mfg reference]. If some of those
+        do not exist, empty strings are returned. The returned tuple
+        contains following information:
+        [ designator, libref, value, footprint,
+        """
+
+        # returning each component separately
+        for component in self.components:
+                yield component
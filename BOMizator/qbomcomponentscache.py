@@ -31,10 +31,14 @@ user. Caching is based on making a relationship between
 libref/value/footprint and appropriate component dragged by user from
 web page into the application. Component cache allows an efficient
 reuse of the previously selected components such, that in another
-project the same components can be used
+project the same components can be used. The components are found
+as well by their normalised libref/value/footprint, hence e.g. 100n
+capacitor finds the ones stored as 0.1uF
 """
 from PyQt5 import QtCore
+from collections import defaultdict
 from .headers import headers
+from .componentnormaliser import componentNormaliser
 import json
 import hashlib
 
@@ -47,6 +51,12 @@ class QBOMComponentCache(QtCore.QObject):
     """
     addedComponentIntoCache = QtCore.pyqtSignal(dict, dict)
 
+    """ emitted when the access changes the cache in background. The
+    access calls listener from its thread, the signal delivers the
+    change into the thread of the cache
+    """
+    cacheChanged = QtCore.pyqtSignal()
+
     def __init__(self, cacheFile):
         """ initializes component cache based on application settings
         and the project directory. cacheFile is CLASS HANDLER, which
@@ -56,30 +66,180 @@ class QBOMComponentCache(QtCore.QObject):
         super(QBOMComponentCache, self).__init__()
         self.componentsCacheFile = cacheFile
         self.header = headers()
-        self.componentsCache = cacheFile.load()
+        # incremental access (e.g. cacheJournalAccess) writes only the
+        # changes of the cache. The components added since the last
+        # save are kept in added dictionary {(libref, value,
+        # footprint): {hash: data}}, the removed ones in removed set of
+        # (libref, value, footprint, hash). Indexed access (e.g.
+        # cacheSQLiteAccess) is moreover queried for the components,
+        # the complete cache is loaded only when requested by getCache
+        self.incremental = cacheFile.incremental
+        self.indexed = cacheFile.indexed
+        self.added = {}
+        self.removed = set()
+        if self.indexed:
+            self.componentsCache = None
+        else:
+            self.componentsCache = cacheFile.load()
+        # secondary index mapping normalised libref/value/footprint to
+        # the set of the keys stored in the cache
+        self.normaliser = componentNormaliser()
+        self.normalisedKeys = defaultdict(set)
+        if self.indexed:
+            self.indexKeys(cacheFile.keys())
+        else:
+            self.indexKeys(self.getKeys(self.componentsCache))
+        self.cacheChanged.connect(self.reloadCache)
+        cacheFile.setListener(self.cacheChanged.emit)
 
     def getCache(self):
         """ returns cache dictionary
         """
+        if self.componentsCache is None:
+            # removals are recorded only by setCache, which gets the
+            # complete cache first, hence only the added components
+            # are not stored yet
+            self.componentsCache = self.componentsCacheFile.load()
+            for (libref, value, footprint), added in self.added.items():
+                self.createKey({self.header.LIBREF: libref,
+                                self.header.VALUE: value,
+                                self.header.FOOTPRINT: footprint}).update(
+                                    added)
         return self.componentsCache
 
     def setCache(self, cache):
-        """ sets up a new cache
+        """ sets up a new cache. For incremental access the
+        differences to the current cache are recorded
         """
+        if self.incremental:
+            current = self.getEntries(self.getCache())
+            new = self.getEntries(cache)
+            for entry in current.keys() - new.keys():
+                self.removeEntry(entry)
+            for entry in new.keys() - current.keys():
+                self.addEntry(entry, new[entry])
         self.componentsCache = cache
+        self.normalisedKeys = defaultdict(set)
+        self.indexKeys(self.getKeys(cache))
+
+    def reloadCache(self):
+        """ called when the access changed the cache in background
+        (e.g. components pulled from remote repository). The changes
+        are merged into the cache, the components not saved yet are
+        kept
+        """
+        self.componentsCache = self.componentsCacheFile.merge(
+            self.getCache())
+        self.normalisedKeys = defaultdict(set)
+        self.indexKeys(self.getKeys(self.componentsCache))
+
+    def getKeys(self, cache):
+        """ returns generator of all the keys (libref, value,
+        footprint) of the cache
+        """
+        return ((libref, value, footprint)
+                for libref, values in cache.items()
+                for value, footprints in values.items()
+                for footprint in footprints.keys())
+
+    def indexKeys(self, keys):
+        """ adds the keys (libref, value, footprint) into the index of
+        normalised keys
+        """
+        for key in keys:
+            self.normalisedKeys[self.normaliser(*key)].add(key)
+
+    def getEntries(self, cache):
+        """ returns dictionary {(libref, value, footprint, hash): data}
+        of all the components of the cache
+        """
+        return dict(((libref, value, footprint, cmphash), data)
+                    for libref, values in cache.items()
+                    for value, footprints in values.items()
+                    for footprint, hashes in footprints.items()
+                    for cmphash, data in hashes.items())
+
+    def addEntry(self, entry, data):
+        """ records addition of the component entry (libref, value,
+        footprint, hash) for incremental access
+        """
+        if entry in self.removed:
+            # still stored, the same hash means the same data
+            self.removed.discard(entry)
+        else:
+            self.added.setdefault(entry[:3], {})[entry[3]] = data
+
+    def removeEntry(self, entry):
+        """ records removal of the component entry (libref, value,
+        footprint, hash) for incremental access
+        """
+        added = self.added.get(entry[:3], {})
+        if entry[3] in added:
+            # not stored yet
+            added.pop(entry[3])
+            if not added:
+                self.added.pop(entry[:3])
+        else:
+            self.removed.add(entry)
 
     def findComponent(self, itms):
         """ given dictionary of (libref, value, footprint) this function
-        returns dictionary items of the component. None is returned if
-        no component with these three items exists
+        returns dictionary items of the component. If there is no
+        component with exactly these three items, the components with
+        the same normalised items are returned. None is returned if
+        there is no such component
         """
-        try:
-            refdata = self.componentsCache[itms[self.header.LIBREF]]\
-                      [itms[self.header.VALUE]]\
-                      [itms[self.header.FOOTPRINT]].items()
-        except KeyError:
-            refdata = None
-        return refdata
+        key = self.getKey(itms)
+        refdata = self.getComponents(key)
+        if not refdata:
+            refdata = {}
+            for similar in sorted(self.normalisedKeys.get(
+                    self.normaliser(*key), ())):
+                refdata.update(self.getComponents(similar))
+        if not refdata:
+            return None
+        return refdata.items()
+
+    def resolveComponents(self, keys):
+        """ looks up all the keys (libref, value, footprint) in the
+        cache. Returns tuple (hits, ambiguous, misses), where hits is
+        dictionary {key: data} of the keys resolved to a single
+        component, ambiguous is dictionary {key: [data]} of the keys
+        having more components to choose from and misses is a list of
+        the keys not found at all
+        """
+        hits, ambiguous, misses = {}, {}, []
+        for key in keys:
+            refdata = self.findComponent(dict(zip(self.header.UNIQUEITEM,
+                                                  key)))
+            if not refdata:
+                misses.append(key)
+            elif len(refdata) == 1:
+                hits[key] = list(refdata)[0][1]
+            else:
+                ambiguous[key] = [data for _, data in refdata]
+        return hits, ambiguous, misses
+
+    def getComponents(self, key):
+        """ returns dictionary {hash: data} of the components stored
+        under the key (libref, value, footprint). Indexed access is
+        queried for the stored components and the components added
+        since the last save are looked up in the added ones
+        """
+        if self.componentsCache is None:
+            refdata = self.componentsCacheFile.find(*key)
+            refdata.update(self.added.get(key, {}))
+            return refdata
+        libref, value, footprint = key
+        return self.componentsCache.get(libref, {}).get(
+            value, {}).get(footprint, {})
+
+    def getKey(self, itms):
+        """ returns tuple (libref, value, footprint) of the component
+        """
+        return (itms[self.header.LIBREF],
+                itms[self.header.VALUE],
+                itms[self.header.FOOTPRINT])
 
     def createKey(self, keydata):
         """ in the cache creates libref/value/footprint key
@@ -122,29 +282,57 @@ class QBOMComponentCache(QtCore.QObject):
                        sort_keys=True).encode("utf-8")).hexdigest()
 
         for component in complist:
-            # we have to find if the component is already used or not
-            # we make a hash of all values of each component. these
-            # should be only libref, value, footprint
-            try:
-                cmpdict = self.componentsCache[component[self.header.LIBREF]]\
-                          [component[self.header.VALUE]]\
-                          [component[self.header.FOOTPRINT]]
-            except KeyError:
-                # the key does not exist at all, let's create it
-                cmpdict = self.createKey(component)
-
-            if cmphash in cmpdict.keys():
-                # component already defined in cache by some previous
-                # operations, no need to do anything here
-                continue
-            self.componentsCache\
-                [component[self.header.LIBREF]]\
-                [component[self.header.VALUE]]\
-                [component[self.header.FOOTPRINT]]\
-                [cmphash] = data
+            if self.componentsCache is None:
+                # indexed access is queried whether the component is
+                # already known
+                if cmphash in self.getComponents(self.getKey(component)):
+                    continue
+            else:
+                # we have to find if the component is already used or
+                # not we make a hash of all values of each
+                # component. these should be only libref, value,
+                # footprint
+                try:
+                    cmpdict = self.componentsCache\
+                              [component[self.header.LIBREF]]\
+                              [component[self.header.VALUE]]\
+                              [component[self.header.FOOTPRINT]]
+                except KeyError:
+                    # the key does not exist at all, let's create it
+                    cmpdict = self.createKey(component)
+
+                if cmphash in cmpdict.keys():
+                    # component already defined in cache by some
+                    # previous operations, no need to do anything here
+                    continue
+                cmpdict[cmphash] = data
+            if self.incremental:
+                # stored when the cache is saved
+                self.addEntry(self.getKey(component) + (cmphash, ), data)
+            self.indexKeys([self.getKey(component)])
             self.addedComponentIntoCache.emit(data, component)
 
     def save(self):
-        """ signal caught when component cache changed and save is required
+        """ signal caught when component cache changed and save is
+        required. Incremental access writes only the changes
+        """
+        if not self.incremental:
+            self.componentsCacheFile.save(self.componentsCache)
+            return
+        if self.removed:
+            self.componentsCacheFile.remove(sorted(self.removed))
+        entries = [key + (cmphash, data)
+                   for key, added in self.added.items()
+                   for cmphash, data in added.items()]
+        if entries:
+            self.componentsCacheFile.store(entries)
+        self.added = {}
+        self.removed = set()
+
+    def close(self, wait=True):
+        """ finishes the pending operations of the access. Without
+        wait they finish in background
         """
-        self.componentsCacheFile.save(self.componentsCache)
+        # the cache is not notified of the changes any more
+        self.componentsCacheFile.setListener(None)
+        self.componentsCacheFile.close(wait)
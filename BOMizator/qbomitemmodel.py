@@ -101,7 +101,7 @@ class QBOMItemModel(QtGui.QStandardItemModel):
                                    suppno,
                                    {self.header.DONOTORDER:
                                     int(notorder)})
-            cm = self.SCH.getComponentsByOrderCode(suppno)
+            cm = self.SCH.getComponentsByOrderCode(suppno, supplier)
             desset = list(map(lambda cmpn:
                               cmpn[self.header.DESIGNATOR],
                               cm))
@@ -221,9 +221,19 @@ class QBOMModel(QtGui.QStandardItemModel):
         """
         # clearout the model
         self.removeRows(0, self.rowCount())
+        self.appendComponents(self.SCH.BOM(),
+                              disabledDesignators,
+                              hideDisabled)
+
+    def appendComponents(self, designatorKeys, disabledDesignators=[],
+                         hideDisabled=False):
+        """ appends to the model rows of the components identified
+        by their normalised designators. Used to fill the model by
+        chunks while the project is being loaded
+        """
         # having headers we might deploy the data into the multicolumn
         # view. We need to collect all the data:
-        for designatorKey in self.SCH.BOM():
+        for designatorKey in designatorKeys:
 
             component = self.SCH.getComponent(designatorKey)
             # each component can have multiple designators. That
@@ -449,3 +459,66 @@ class QBOMModel(QtGui.QStandardItemModel):
         QtWidgets.QApplication.restoreOverrideCursor()
         # we return list of unique compoents
         return collector
+
+    def getUnassignedComponents(self):
+        """ returns dictionary {(libref, value, footprint): [rows]} of
+        all enabled rows IN MODEL VIEW, which do not have any user
+        data (manufacturer, supplier...) assigned yet. The rows are
+        grouped by the unique component, hence each group can be
+        resolved by a single lookup into the components cache
+        """
+        uniqcols = list(self.header.getColumns(self.header.UNIQUEITEM))
+        usercols = list(self.header.getColumns(self.header.USERITEMS))
+        desigcol = self.header.getColumn(self.header.DESIGNATOR)
+        groups = defaultdict(list)
+        for row in range(self.rowCount()):
+            if not self.item(row, desigcol).data(self.header.ItemEnabled):
+                continue
+            if any(self.item(row, col).text() for col in usercols):
+                continue
+            key = tuple(self.item(row, col).text() for col in uniqcols)
+            groups[key].append(row)
+        return groups
+
+    def assignComponents(self, assignments):
+        """ assignments is a list of (rows, data), where rows is a
+        list of rows IN MODEL VIEW and data is dictionary of
+        header:value to be set in all these rows. Contrary to
+        updateModelData the items are changed with the signals
+        blocked, the schematic components are updated once per
+        assignment and the views are notified by single dataChanged
+        at the end. This makes the assignment of thousands of rows
+        fast
+        """
+        if not assignments:
+            return
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        changedRows = set()
+        changedColumns = set()
+        self.blockSignals(True)
+        try:
+            for rows, data in assignments:
+                columns = [(self.header.getColumn(key), value)
+                           for key, value in data.items()]
+                designators = []
+                for row in rows:
+                    for col, value in columns:
+                        self.item(row, col).setText(value)
+                    designators.append(self.getDesignator(row).text())
+                self.SCH.updateComponents(designators, data)
+                changedRows.update(rows)
+                changedColumns.update(col for col, _ in columns)
+        finally:
+            self.blockSignals(False)
+        # the model emits itemChanged for each item of dataChanged
+        # range, hence the components would be updated second time by
+        # cellDataChanged
+        self.itemChanged.disconnect(self.cellDataChanged)
+        try:
+            self.dataChanged.emit(
+                self.index(min(changedRows), min(changedColumns)),
+                self.index(max(changedRows), max(changedColumns)))
+        finally:
+            self.itemChanged.connect(self.cellDataChanged)
+            QtWidgets.QApplication.restoreOverrideCursor()
+        self.setModified(True)
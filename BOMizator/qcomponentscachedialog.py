@@ -54,8 +54,13 @@ class QComponentsCacheDialog(QtWidgets.QDialog, loaded_dialog):
         self.isModified = False
         self.model = QtGui.QStandardItemModel(self)
 
+        # WE HAVE TO WORK OVER DICTIONARY COPY TO AVOID MODIFICATION
+        # OF ORIGINAL DICTIONARY - JUST IN CASE SOMEONE PRESSES CANCEL
+        # BUTTON ON THIS DIALOG BOX. The copy is made once, deletions
+        # and imports modify it only
+        self.components = self.copyCache(cache.getCache())
         # fill in the treewidget with appropriate data
-        self.fillModel(cache.getCache())
+        self.fillModel(self.components)
         self.importButton.clicked.connect(self.importAnother)
         self.deleteButton.clicked.connect(self.deleteItems)
         self.treeView.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
@@ -156,16 +161,23 @@ class QComponentsCacheDialog(QtWidgets.QDialog, loaded_dialog):
                                         key],
                                        QtCore.Qt.UserRole)
                         self.model.appendRow(row)
-        # WE HAVE TO WORK OVER DICTIONARY COPY TO AVOID MODIFICATION
-        # OF ORIGINAL DICTIONARY - JUST IN CASE SOMEONE PRESSES CANCEL
-        # BUTTON ON THIS DIALOG BOX
-        self.components = cc.copy()
         self.treeView.setModel(self.model)
         self.treeView.setSortingEnabled(True)
         self.treeView.sortByColumn(2, QtCore.Qt.AscendingOrder)
         for i in range(len(hx)):
             self.treeView.resizeColumnToContents(i)
 
+    def copyCache(self, cc):
+        """ returns copy of the cache dictionary cc. The nested
+        dictionaries are copied, as the components are deleted from
+        them, the data of the components are shared (they are never
+        modified, only replaced)
+        """
+        return {libref: {value: {footprint: dict(hashes)
+                                 for footprint, hashes in footprints.items()}
+                         for value, footprints in values.items()}
+                for libref, values in cc.items()}
+
     def makeKey(self, cm, nk):
         """ makes in cm dictionary a new key identified by tuple
         (libref, value, footprint). If that key already exists,
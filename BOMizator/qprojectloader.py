@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Loads the project in a background thread. The schematic files are
+collected and parsed outside of the GUI thread, hence the window
+stays responsive while large projects are loaded
+"""
+
+from PyQt5 import QtCore
+import logging
+
+
+class QProjectLoader(QtCore.QThread):
+    """ parses the schematic files of the project in a separate
+    thread. Components of the sheets are not merged into the project
+    here: each parsed sheet is announced by the signal and the
+    receiver (living in the GUI thread) merges it. Hence the list of
+    components is touched only by the GUI thread.
+    """
+
+    """ emitted for each sheet of the project, in the project order,
+    when its components are available. Carries the filename, the
+    number of the sheet and the number of all the sheets
+    """
+    sheetParsed = QtCore.pyqtSignal(str, int, int)
+
+    def __init__(self, projectData, parent=None):
+        """ projectData is the project parser, which sheets are
+        parsed
+        """
+        super(QProjectLoader, self).__init__(parent)
+        self.logger = logging.getLogger('bomizator')
+        self.SCH = projectData
+        # true when all the sheets were parsed
+        self.completed = False
+
+    def run(self):
+        """ parses the sheets and announces them one by one. Stops
+        after the sheet being just parsed when cancelled
+        """
+        self.completed = False
+        # parsing is part of the operation profile (if profiled)
+        with self.SCH.timer.profile():
+            sheets = self.SCH.iterParseSheets()
+            try:
+                for fname, number, count in sheets:
+                    self.sheetParsed.emit(fname, number, count)
+                    if number < count and self.isInterruptionRequested():
+                        self.logger.warning("Loading of the project\
+ cancelled after %d of %d sheets" % (number, count))
+                        break
+                else:
+                    self.completed = True
+            except Exception as e:
+                self.logger.error("Loading of the project failed: %s" %
+                                  (str(e),))
+            finally:
+                # closing the generator cancels the parsing of the
+                # remaining sheets and saves the parse cache
+                sheets.close()
+
+    def cancel(self):
+        """ requests the loading to stop. The thread finishes after
+        the sheet, which is being parsed
+        """
+        self.requestInterruption()
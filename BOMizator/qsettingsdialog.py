@@ -35,6 +35,7 @@ import imp
 import fnmatch
 import shutil
 from BOMizator.qnewcomponentscachedialog import QNewComponentsCacheDialog
+from BOMizator.bomdataaccess import getBOMDataAccessTypes, DEFAULT_ACCESS_TYPE
 import logging
 
 localpath = os.path.dirname(os.path.realpath(__file__))
@@ -61,7 +62,22 @@ class QSettingsDialog(QtWidgets.QDialog, loaded_dialog):
             '',
             str)
         self.settingsComponentCache.setText(componentsCacheFile)
-
+        # number of processes parsing the schematics
+        self.settingsParserWorkers.setValue(self.settings.value(
+            "parserWorkers",
+            1,
+            int))
+
+        # storages of BOM data, identified by their filenames
+        bomDataAccessType = self.settings.value(
+            "bomDataAccessType",
+            DEFAULT_ACCESS_TYPE,
+            str)
+        for data, info in getBOMDataAccessTypes().items():
+            self.settingsBOMDataAccessType.addItem(info().name(), data)
+            if data == bomDataAccessType:
+                self.settingsBOMDataAccessType.setCurrentIndex(
+                    self.settingsBOMDataAccessType.count() - 1)
 
         matches = []
         for root, dirnames, filenames in os.walk(localpath):
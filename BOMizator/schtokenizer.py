@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Implements tokenizer of the lines of legacy KiCad schematic files. It
+replaces shlex, which is general purpose and hence very slow when
+called for each attribute line of large projects
+"""
+
+import re
+
+
+class schTokenizer(object):
+    """ splits a single line of the schematic file into the list of
+    tokens. The result is the same as the one of shlex.split (posix
+    mode), hence quoted fields containing spaces are returned as a
+    single token, quotes are removed and escaped quotes are resolved
+    """
+
+    # a line is split into tokens by the alternatives tried in
+    # order: quoted string without escapes, plain word (these two
+    # cover nearly all the tokens of the schematic and need no
+    # further treatment), general token composed of quoted strings,
+    # escaped characters and ordinary characters not separated by
+    # whitespace, and finally a lone quote or backslash, which means
+    # malformed line
+    TOKEN = re.compile(r'''"([^"\\]*)"(?![^ \t\r\n])'''
+                       r'''|([^ \t\r\n"'\\]+)(?![^ \t\r\n])'''
+                       r'''|((?:"(?:[^"\\]|\\.)*"|'[^']*'|\\.|[^ \t\r\n"'\\])+)'''
+                       r'''|([^ \t\r\n])''',
+                       re.DOTALL)
+    # parts of the general token which have to be rewritten: double
+    # quoted string, single quoted string and escaped character
+    QUOTED = re.compile(r'''"((?:[^"\\]|\\.)*)"|'([^']*)'|\\(.)''',
+                        re.DOTALL)
+    # inside double quotes only quote and backslash can be escaped
+    ESCAPED = re.compile(r'\\(["\\])')
+
+    def __call__(self, line):
+        """ returns list of tokens of the line
+        """
+        return self.split(line)
+
+    def split(self, line):
+        """ splits the line into list of tokens. ValueError is raised
+        when the line contains non-terminated quotation
+        """
+        # most of the lines (L, P, U, pins...) do not contain any
+        # quotes, these can be split directly
+        if '"' not in line and "'" not in line and '\\' not in line:
+            return line.split()
+        tokens = []
+        for quoted, plain, general, error in self.TOKEN.findall(line):
+            if general:
+                tokens.append(self.QUOTED.sub(self._unquote, general))
+            elif error:
+                raise ValueError("No closing quotation in: %s" % (line, ))
+            else:
+                tokens.append(quoted or plain)
+        return tokens
+
+    def _unquote(self, match):
+        """ replaces matched quoted string or escaped character by
+        its content
+        """
+        dquoted, squoted, escaped = match.groups()
+        if dquoted is not None:
+            return self.ESCAPED.sub(r'\1', dquoted)
+        if squoted is not None:
+            return squoted
+        return escaped
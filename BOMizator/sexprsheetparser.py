@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Parses KiCad 6+ schematic files (.kicad_sch, S-expression format) for
+components and sub-sheets and updates the properties of the
+components in these files. Components are returned as the same
+records as produced from the legacy schematic files
+"""
+
+import logging
+from .headernames import headernames
+from .sexprtokenizer import sexprTokenizer
+from .componentrecord import componentRecord
+
+
+def isSexprSheet(content):
+    """ returns true if the content of schematic file (bytes) is in
+    S-expression format
+    """
+    return content.lstrip()[:1] == b'('
+
+
+class sexprSheetParser(object):
+    """ Parses the content of KiCad 6+ schematic file. Only the
+    placed symbols, sheets and symbol instances (direct children of
+    the root node) are examined, everything else is skipped by the
+    tokenizer
+    """
+
+    # properties identifying the component, these are not written
+    REFERENCE = "Reference"
+    VALUE = "Value"
+    FOOTPRINT = "Footprint"
+    DATASHEET = "Datasheet"
+    # name of the property of the sheet giving its filename. KiCad 6
+    # used the name with space
+    SHEETFILE = ["Sheetfile", "Sheet file"]
+
+    def __init__(self, project=None, references=None):
+        """ project is the name of the project (project filename
+        without extension), the instances of the symbols belonging to
+        other projects sharing the sheet are ignored. References is
+        dictionary {symbol uuid: [designators]} of the symbols of this
+        sheet as listed by the symbol_instances of the top-level sheet
+        (KiCad 6), it takes precedence over the instances stored in the
+        symbols (KiCad 7+)
+        """
+        self.logger = logging.getLogger('bomizator')
+        self.header = headernames()
+        self.tokenizer = sexprTokenizer()
+        self.project = project
+        self.references = references or {}
+
+    def parse(self, content):
+        """ parses the content of the schematic file (bytes) and
+        returns the list of components found
+        """
+        components = []
+        for node in self.tokenizer.iterNodes(content.decode('utf-8'),
+                                             ['symbol']):
+            xm = self.getComponent(node)
+            if xm is not None:
+                # duplicates (multi-unit symbols) are resolved when
+                # the sheets are merged, as for legacy files
+                components.append(xm)
+        return components
+
+    def getHierarchy(self, content):
+        """ returns tuple (subsheets, sheetids, instances) describing
+        the content of the schematic file. Subsheets is the list of
+        filenames of the sub-sheets referenced, one item per sheet
+        instance, and sheetids the list of uuids of these instances
+        in the same order. Instances is dictionary {path: designator}
+        of the symbol_instances of the top-level sheet of KiCad 6, the
+        path is composed of the uuids of the sheet instances and of the
+        symbol, e.g. /sheet uuid/symbol uuid
+        """
+        subsheets, sheetids, instances = [], [], {}
+        for node in self.tokenizer.iterNodes(content.decode('utf-8'),
+                                             ['sheet', 'symbol_instances']):
+            if node.name() == 'symbol_instances':
+                for path in node.children('path'):
+                    reference = path.child('reference')
+                    if len(path) > 1 and reference is not None and\
+                       len(reference) > 1:
+                        instances[path[1]] = reference[1]
+                continue
+            properties = self.getProperties(node)
+            for name in self.SHEETFILE:
+                if name in properties:
+                    subsheets.append(properties[name][0])
+                    sheetids.append(self.getUuid(node))
+                    break
+        return subsheets, sheetids, instances
+
+    def getUuid(self, node):
+        """ returns uuid of the symbol or sheet node, empty string if
+        it has none
+        """
+        uuid = node.child('uuid')
+        if uuid is None or len(uuid) < 2:
+            return ''
+        return uuid[1]
+
+    def getProperties(self, node):
+        """ returns dictionary of the properties of the node, the
+        values are tuples (value, property node). Properties keep the
+        order of the file
+        """
+        properties = {}
+        for prop in node.children('property'):
+            if len(prop) > 2 and prop[1] not in properties:
+                properties[prop[1]] = (prop[2], prop)
+        return properties
+
+    def getDesignators(self, node, properties):
+        """ returns list of designators of the symbol. Symbols of
+        sheets used several times list the designators of each
+        instance (similar to AR attributes of the legacy files): KiCad
+        6 in the symbol_instances of the top-level sheet (given as
+        references), KiCad 7+ in the instances of the symbol, where
+        only the ones of this project are taken. Otherwise the
+        reference property is used
+        """
+        designators = list(self.references.get(self.getUuid(node), []))
+        instances = node.child('instances')
+        if not designators and instances is not None:
+            for project in instances.children('project'):
+                if self.project is not None and len(project) > 1 and\
+                   project[1] != self.project:
+                    continue
+                for path in project.children('path'):
+                    reference = path.child('reference')
+                    if reference is not None and len(reference) > 1 and\
+                       reference[1] not in designators:
+                        designators.append(reference[1])
+        if not designators and self.REFERENCE in properties:
+            designators.append(properties[self.REFERENCE][0])
+        return designators
+
+    def getComponent(self, node):
+        """ returns component record of the symbol node, None for
+        power symbols and the other symbols with references starting
+        by hash
+        """
+        properties = self.getProperties(node)
+        designators = self.getDesignators(node, properties)
+        if not designators or any(map(lambda desig: desig.startswith('#'),
+                                      designators)):
+            return None
+        libid = node.child('lib_id')
+        xm = componentRecord()
+        xm[self.header.DESIGNATOR] = set(designators)
+        xm[self.header.LIBREF] = libid[1] if libid is not None else ''
+        xm[self.header.VALUE] = properties.get(self.VALUE, ('',))[0]
+        xm[self.header.FOOTPRINT] = properties.get(self.FOOTPRINT, ('',))[0]
+        for name, (value, _) in properties.items():
+            key = self.getField(name)
+            if key is not None:
+                xm[key] = value
+        return xm
+
+    def getField(self, name):
+        """ returns the record field the property name is stored to,
+        None if the property is not of interest. The user properties
+        are matched in the same way as the user fields of legacy files
+        """
+        if name == self.DATASHEET:
+            return self.header.DATASHEET
+        if name in [self.REFERENCE, self.VALUE, self.FOOTPRINT]:
+            return None
+        for key in [self.header.SUPPNO,
+                    self.header.SUPPLIER,
+                    self.header.MANUFACTURER,
+                    self.header.MFRNO]:
+            if name.find(key) != -1:
+                return key
+        return None
+
+    def update(self, text, getComponent):
+        """ returns the text of the schematic file with properties of
+        the symbols updated. getComponent is called with the
+        designator of each symbol and returns its component record
+        (KeyError is raised for unknown designator). Only the values of
+        the properties which differ are replaced, missing properties
+        are added after the last property of the symbol, everything
+        else is kept byte by byte
+        """
+        edits = []
+        for node in self.tokenizer.iterNodes(text, ['symbol']):
+            properties = self.getProperties(node)
+            designators = self.getDesignators(node, properties)
+            if not designators or any(map(lambda desig: desig.startswith('#'),
+                                          designators)):
+                continue
+            datain = getComponent(designators[0])
+            # we need to create a copy for poping the data out (such
+            # we find which items are still to be written into the
+            # component), items identifying the component are not
+            # written
+            replaceby = dict(datain.items())
+            for key in [self.header.VALUE,
+                        self.header.FOOTPRINT,
+                        self.header.LIBREF,
+                        self.header.DESIGNATOR]:
+                replaceby.pop(key, None)
+            for name, (value, prop) in properties.items():
+                if name == self.DATASHEET:
+                    key = self.header.DATASHEET
+                else:
+                    key = name
+                if key in replaceby:
+                    new = replaceby.pop(key)
+                    if new != value:
+                        edits.append(prop.spans[2] +
+                                     (self.tokenizer.quote(new), ))
+            if replaceby:
+                edits.append(self.addProperties(text, node, properties,
+                                                replaceby))
+        # edits are in the order of the text
+        out = []
+        pos = 0
+        for start, end, replacement in edits:
+            out.append(text[pos:start])
+            out.append(replacement)
+            pos = end
+        out.append(text[pos:])
+        return ''.join(out)
+
+    def addProperties(self, text, node, properties, data):
+        """ returns edit adding properties of data to the symbol
+        node. New property is a copy of the datasheet property (hidden
+        one) with name, value and id changed
+        """
+        props = [prop for _, prop in properties.values()]
+        last = max(props, key=lambda prop: prop.end) if props else None
+        if self.DATASHEET in properties:
+            template = properties[self.DATASHEET][1]
+        else:
+            template = last
+        ids = [int(prop.child('id')[1]) for prop in props
+               if prop.child('id') is not None]
+        if last is None:
+            # symbol without properties, add them at its end
+            position = node.end - 1
+            indent = ' '
+        else:
+            position = last.end
+            # indentation of the last property
+            indent = text[text.rfind('\n', 0, last.start):last.start]
+            if not indent.strip() == '':
+                indent = ' '
+        added = []
+        for number, (key, value) in enumerate(data.items()):
+            if template is None:
+                added.append('(property %s %s (at 0 0 0) (effects\
+ (font (size 1.27 1.27)) hide))' % (self.tokenizer.quote(key),
+                                    self.tokenizer.quote(value)))
+                continue
+            pieces = []
+            pos = template.start
+            replaced = [(template.spans[1], self.tokenizer.quote(key)),
+                        (template.spans[2], self.tokenizer.quote(value))]
+            idnode = template.child('id')
+            if idnode is not None:
+                replaced.append(
+                    (idnode.spans[1],
+                     str(max(ids + [0]) + 1 + number)))
+            for (start, end), replacement in replaced:
+                pieces.append(text[pos:start])
+                pieces.append(replacement)
+                pos = end
+            pieces.append(text[pos:template.end])
+            added.append(''.join(pieces))
+        return (position, position,
+                ''.join(map(lambda prop: indent + prop, added)))
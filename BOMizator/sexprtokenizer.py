@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Implements streaming tokenizer of KiCad 6+ S-expression files
+(.kicad_sch). The files of large designs have several MB, most of it
+being library symbols and graphics, hence the tree of the whole file
+is never built. Only the top-level nodes of interest (e.g. placed
+symbols) are built, the others are skipped
+"""
+
+import re
+
+
+class sexprNode(list):
+    """ node of S-expression. It is a list of its children: strings
+    (both atoms and quoted strings, the latter unquoted) and nodes.
+    start and end are the offsets of its parentheses in the text
+    (end is behind the closing one), spans are the (start, end)
+    offsets of each of its children
+    """
+
+    def __init__(self, start):
+        super(sexprNode, self).__init__()
+        self.start = start
+        self.end = None
+        self.spans = []
+
+    def name(self):
+        """ returns the first atom of the node, e.g. 'symbol'
+        """
+        if self and isinstance(self[0], str):
+            return self[0]
+        return None
+
+    def children(self, name):
+        """ returns list of child nodes of given name
+        """
+        return [child for child in self
+                if isinstance(child, sexprNode) and child.name() == name]
+
+    def child(self, name):
+        """ returns the first child node of given name or None
+        """
+        for child in self:
+            if isinstance(child, sexprNode) and child.name() == name:
+                return child
+        return None
+
+
+class sexprTokenizer(object):
+    """ splits the text of S-expression file into tokens and builds
+    the nodes of interest
+    """
+
+    # token is opening or closing parenthesis, quoted string (which
+    # can contain escaped characters) or atom
+    TOKEN = re.compile(r'''\s*(\(|\)|"((?:[^"\\]|\\.)*)"|[^\s()"]+)''',
+                       re.DOTALL)
+    # when a node is skipped, only its parentheses matter, but these
+    # can appear in the strings as well
+    PARENTHESIS = re.compile(r'''[()]|"(?:[^"\\]|\\.)*"''', re.DOTALL)
+    ESCAPED = re.compile(r'\\(.)', re.DOTALL)
+    # characters escaped in the quoted strings
+    ESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+
+    def iterNodes(self, text, names):
+        """ generator of the nodes, which are direct children of the
+        root node and which name is one of names. The nodes are
+        yielded in the order of their appearance in the text
+        """
+        pos = self.expect(text, 0, '(')
+        # name of the root node
+        pos = self.TOKEN.match(text, pos).end()
+        while True:
+            match = self.TOKEN.match(text, pos)
+            if match is None:
+                raise ValueError("Unterminated S-expression")
+            token = match.group(1)
+            if token == ')':
+                # end of root node
+                return
+            if token != '(':
+                pos = match.end()
+                continue
+            head = self.TOKEN.match(text, match.end())
+            if head is not None and head.group(1) in names:
+                node = self.readNode(text, match.start(1))
+                pos = node.end
+                yield node
+            else:
+                pos = self.skipNode(text, match.end())
+
+    def expect(self, text, pos, token):
+        """ checks that the token at position is the expected one and
+        returns position behind it
+        """
+        match = self.TOKEN.match(text, pos)
+        if match is None or match.group(1) != token:
+            raise ValueError("Expected %s at offset %d" % (token, pos))
+        return match.end()
+
+    def skipNode(self, text, pos):
+        """ skips the node which opening parenthesis is just before
+        the position, returns the position behind its closing
+        parenthesis
+        """
+        depth = 1
+        for match in self.PARENTHESIS.finditer(text, pos):
+            token = match.group()
+            if token == '(':
+                depth += 1
+            elif token == ')':
+                depth -= 1
+                if not depth:
+                    return match.end()
+        raise ValueError("Unterminated S-expression")
+
+    def readNode(self, text, pos):
+        """ builds the node which opening parenthesis is at the
+        position
+        """
+        stack = []
+        while True:
+            match = self.TOKEN.match(text, pos)
+            if match is None:
+                raise ValueError("Unterminated S-expression")
+            pos = match.end()
+            token = match.group(1)
+            if token == '(':
+                node = sexprNode(match.start(1))
+                if stack:
+                    stack[-1].append(node)
+                    stack[-1].spans.append(None)
+                stack.append(node)
+            elif token == ')':
+                node = stack.pop()
+                node.end = pos
+                if not stack:
+                    return node
+                stack[-1].spans[-1] = (node.start, node.end)
+            else:
+                if match.group(2) is not None:
+                    token = self.unquote(match.group(2))
+                stack[-1].append(token)
+                stack[-1].spans.append(match.span(1))
+
+    def unquote(self, text):
+        """ resolves escaped characters of quoted string
+        """
+        if '\\' not in text:
+            return text
+        return self.ESCAPED.sub(lambda match:
+                                self.ESCAPES.get(match.group(1),
+                                                 match.group(1)),
+                                text)
+
+    def quote(self, text):
+        """ returns quoted string as written in the file
+        """
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"').\
+            replace('\n', '\\n') + '"'
@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Class responsible for parsing of a single schematic file. It takes as
+input the content of the file and returns the list of components
+defined in it. It does not depend on the rest of the project, hence it
+can run in a separate process
+"""
+
+import io
+import re
+import locale
+from array import array
+import logging
+from .headernames import headernames
+from .schtokenizer import schTokenizer
+from .componentrecord import componentRecord
+from .sexprsheetparser import sexprSheetParser, isSexprSheet
+
+# version of the parser. It has to be increased whenever the parser
+# changes the way how it creates the components, as it invalidates
+# the components stored in the parse cache
+PARSER_VERSION = 6
+
+# encoding of the schematic files, the same as used when the files are
+# opened in text mode
+SHEET_ENCODING = locale.getpreferredencoding(False)
+
+
+def sheetLines(content):
+    """ returns iterator over text lines of the content of the
+    schematic file. Lines are decoded in the same way as when the file
+    is opened in text mode
+    """
+    return io.TextIOWrapper(io.BytesIO(content))
+
+
+def indexedSheetLines(content):
+    """ returns iterator over tuples (offset, line), where line is
+    decoded as by sheetLines and offset is the position of its first
+    byte in the content
+    """
+    offset = 0
+    for line in io.BytesIO(content):
+        yield offset, line.decode(SHEET_ENCODING).replace('\r\n', '\n')
+        offset += len(line)
+
+
+def parseSheet(content, project=None, references=None):
+    """ returns tuple (components, layout) of the list of components
+    defined in the content of the schematic file and their layout
+    (see sheetParser.getSheetLayout, None for KiCad 6+ files). This is
+    the function run by the worker processes when the sheets are
+    parsed in parallel. Both legacy and KiCad 6+ (S-expression)
+    schematic files are accepted, project and references resolve the
+    designators of the latter (see sexprSheetParser)
+    """
+    if isSexprSheet(content):
+        return sexprSheetParser(project, references).parse(content), None
+    parser = sheetParser(recordLayout=True)
+    components = parser.parse(content)
+    return components, parser.getSheetLayout()
+
+
+class sheetParser(object):
+    """ Parses the content of KiCad schematic file for components. If
+    requested, it records as well the layout of each component in the
+    file, which allows to update the F attributes of the components
+    without parsing the file again. As it is kept for each sheet of
+    the project, it is stored compactly as array of integers, see
+    getSheetLayout
+    """
+
+    # value of the F attribute, which is the third token of its line
+    FVALUE = re.compile(r'F\s+\S+\s+("(?:[^"\\]|\\.)*"|\S+)')
+    # any non-ascii character (str.isascii is not available before
+    # python 3.7)
+    NONASCII = re.compile(r'[^\x00-\x7f]')
+
+    def __init__(self, recordLayout=False):
+        """ the layout of the components is recorded only if
+        recordLayout is set, it is needed only when the file is saved
+        """
+        self.logger = logging.getLogger('bomizator')
+        self.debug = False
+        self.recordLayout = recordLayout
+        self.header = headernames()
+        self.tokenize = schTokenizer()
+        # define attributes dictionary for the component, each entry
+        # has to correspond to specific attributes
+        self.attribute_entry = {
+            'L': self._attributeGeneric,
+            'U': self._ignoreLine,
+            'P': self._attributePosition,
+            'A': self._attributeAr,
+            'F': self._attributeF,
+            '\t': self._attributeBody,
+            '$': self._attributeTermination}
+        self.current_state = self._smCatchHeader
+        # components is a list of components in the order of their
+        # appearance in the file. Each component is a componentRecord
+        # of designator/libref/value/footprint ....
+        self.components = []
+        # layout of the components of the list above, None when it
+        # cannot be recorded, names are the attribute names
+        # referenced by the layout
+        self.layout = array('l')
+        self.names = {}
+        # offset of the line being parsed
+        self.offset = 0
+
+    def parse(self, content):
+        """ parses the content of the schematic file (bytes) and
+        returns the list of components found
+        """
+        self.components = []
+        self.layout = array('l')
+        self.names = {}
+        self.current_state = self._smCatchHeader
+        # parsing the file for specific tokens of component
+        # start/stop is a simple state machine
+        for self.offset, line in indexedSheetLines(content):
+            self.current_state(line)
+        return self.components
+
+    def _smCatchHeader(self, line):
+        """ state machine state catching the component start in the
+        line of the code. line is a single line read from the
+        schematic file
+        """
+        if line.startswith("$Comp"):
+            self.current_component = {}
+            self.current_state = self._smComponentBody
+
+    def _smComponentBody(self, line):
+        """ state machine state decoding the body of the
+        component. This is done by looking for each particular
+        attributes and processing them into separate flags, added into
+        current_component dictionary
+        """
+        # the point here is, that we use the first character as a
+        # deteminant of which attribute the component entry
+        # corresponds to. If it is not found, then the 'default' line
+        # attribute is assigned
+        self.attribute_entry[line[0]](line.strip())
+
+    def _attributeTermination(self, line):
+        """ dollar sign introduces entity ending
+        """
+        if line.startswith('$EndComp'):
+            # state machine ends here and we store the component
+            # information into the list of components, we have to
+            # check here if it is not a power supply or ground, as
+            # these are in principle not components
+            if not self.current_component['L'][1].startswith('#'):
+                if self.debug:
+                    print("Found component ",
+                          self.current_component['L'][1], ":",
+                          self.current_component['F']['1'][0])
+                # now we compact the information such, that we create
+                # record of items and we form list of it
+                xm = componentRecord()
+                # if AR attribute is defined for the component, it
+                # takes over the default designator
+                try:
+                    designators = self.current_component['AR'].keys()
+                except KeyError:
+                    # otherwise take default component designator
+                    designators = [self.current_component['L'][1], ]
+
+                if self.debug:
+                    print(self.current_component)
+                # designator
+                xm[self.header.DESIGNATOR] = set(designators)
+                # library reference
+                xm[self.header.LIBREF] = self.current_component['L'][0]
+                # value
+                xm[self.header.VALUE] = self.stripQuote(
+                    self.current_component['F']['1'][0])  # value
+                # footprint
+                xm[self.header.FOOTPRINT] = self.stripQuote(
+                    self.current_component['F']['2'][0])  # footprint
+
+                for f_number, f_data in self.current_component['F'].items():
+                    if int(f_number) == 3:
+                        # datasheet (this is part of schematics)
+                        xm[self.header.DATASHEET] = self.stripQuote(f_data[0])
+                    elif int(f_number) > 3 and\
+                         f_data[-1].find(self.header.SUPPNO) != -1:
+                        # supplier reference number
+                        xm[self.header.SUPPNO] = self.stripQuote(f_data[0])
+                    elif int(f_number) > 3 and\
+                         f_data[-1].find(self.header.SUPPLIER) != -1:
+                        # supplier name
+                        xm[self.header.SUPPLIER] = self.stripQuote(f_data[0])
+                    elif int(f_number) > 3 and\
+                         f_data[-1].find(self.header.MANUFACTURER) != -1:
+                        # supplier name
+                        xm[self.header.MANUFACTURER] = self.stripQuote(f_data[0])
+                    elif int(f_number) > 3 and\
+                         f_data[-1].find(self.header.MFRNO) != -1:
+                        # supplier name
+                        xm[self.header.MFRNO] = self.stripQuote(f_data[0])
+
+                # duplicates are not resolved here, as they might be
+                # defined in another sheet. The list of components
+                # of the project is assembled from all the sheets by
+                # projectParser.mergeSheet
+                self.components.append(xm)
+                if self.recordLayout and self.layout is not None:
+                    self.recordComponentLayout()
+
+            self.current_state = self._smCatchHeader
+
+    def getSheetLayout(self):
+        """ returns the layout of the components of the sheet as tuple
+        (names, layout), None if the layout of any component could not
+        be recorded. Layout is array of integers, for each component
+        in the order of the components: highest F attribute number, x,
+        y, body offset, number of fields and for each field F attribute
+        number, index of the attribute name into names and start and
+        end. x, y is the position of the component, body offset is the
+        offset of its first tab-indented line (new attributes are
+        inserted before it, -1 if there is none) and the fields are the
+        F attributes starting by F3. Start and end are the byte offsets
+        of the quoted value of the attribute
+        """
+        if self.layout is None:
+            return None
+        return list(self.names), self.layout
+
+    def recordComponentLayout(self):
+        """ appends layout of the current component to the layout of
+        the sheet. If the value of any of its F attributes was not
+        located, the sheet has no layout
+        """
+        fields = []
+        try:
+            for f_number, f_data in self.current_component['F'].items():
+                if int(f_number) >= 3:
+                    start, end = self.current_component['spans'][f_number]
+                    name = self.names.setdefault(f_data[-1],
+                                                 len(self.names))
+                    fields.extend((int(f_number), name, start, end))
+            x, y = self.current_component.get('P', ['0', '0'])[:2]
+            self.layout.extend(
+                (max(map(int, self.current_component['F'].keys())),
+                 int(x), int(y),
+                 self.current_component.get('body', -1),
+                 len(fields) // 4))
+        except (KeyError, ValueError):
+            self.layout = None
+            return
+        self.layout.extend(fields)
+
+    def _attributeGeneric(self, line):
+        """ parses 'L' attribute of the component. This type of
+        attribute is generic, e.g. L MCP23016 U2, where first value is
+        library reference, and we just store all the parameters from
+        this one to a list, which we add as dictionary item
+        """
+        attrs = line.split(" ")
+        self.current_component[line[0]] = attrs[1:]
+
+    def _ignoreLine(self, line):
+        """ skips the line of the component, which is of no use for
+        the bill of material (e.g. U unit attribute)
+        """
+        pass
+
+    def _attributePosition(self, line):
+        """ position of the component, e.g. P 6450 6700. It is kept
+        for the attributes added to the component when saved
+        """
+        self.current_component['P'] = line.split()[1:]
+
+    def _attributeBody(self, line):
+        """ tab attribute starts the component body (pins, graphical
+        position), which is of no use for the bill of material. Only
+        the offset of its first line is kept, as the new attributes
+        are inserted before it
+        """
+        if 'body' not in self.current_component:
+            self.current_component['body'] = self.offset
+
+    # def getDesignatorText(self, desig):
+    #     """ input is a set of designators, output is the _textual
+    #     representation_ of the designators, they are concatenated by
+    #     comma and sorted in ascending order
+    #     """
+
+    def _attributeAr(self, line):
+        """ AR-type attribute is used in hierarchical design. Its form
+        is e.g. following:
+AR Path="/55092EEE/56BE633D/56BE9140" Ref="C202"  Part="1"
+AR Path="/55092EEE/56C1F5DB/56BE9140" Ref="C219"  Part="1"
+
+        It states, that this particular component is used in two
+        sheets identified by their paths and refered as two
+        components: C202 and C219. This greatly simplifies parsing of
+        the components as we do not need to store the hiearchy and by
+        hard way analyse the trees, but it is just enough to collect
+        all AR attributes as these were the real components (which in
+        fact they are). Note as well, that one of the AR attributes
+        will always point to the original designator of firstly
+        generated board, hence AR attributes _always_ supercede the L
+        attribute, where the original designator is stored. Note that
+        there are always multiple ARs, hence we need to store them as
+        dictionarys identified _by designator_
+        """
+
+        # first make list of a=b parameters
+        separate = filter(lambda dat:
+                          dat != '',
+                          line.replace('"', '').split(" ")[1:])
+        # then separate them into dictionary
+        args = dict(map(lambda c: c.split('='), separate))
+        # get rid of 'Ref' designator from the dictionary as this one
+        # is used as key to 'AR' attribute
+        dfields = dict(filter(lambda keyval:
+                              keyval[0] != 'Ref',
+                              args.items()))
+        # we try to assign the data, however if we succeed, this
+        # is faulty condition as it means, that there was already
+        # previous designator of the same name. And designators
+        # should be unique
+        # first we find if the designator is not by chance already
+        # in. If so, WE SHOW IT AS WARNING
+        try:
+            if args['Ref'] in self.current_component['AR'].keys():
+                self.logger.error("Designator " +
+                                  args['Ref'] +
+                                  """ defined multiple times in the\
+ project. CHECK YOUR ANNOTATIONS AS THEY MIGHT BE INCORRECT. KEEPING
+THE FIRST DESIGNATOR FOUND""")
+            else:
+                self.current_component['AR'][args['Ref']] = dfields
+        except KeyError:
+            # AR attribute for the first time declared
+            self.current_component['AR'] = {}
+            self.current_component['AR'][args['Ref']] = dfields
+        if self.debug and not args['Ref'][0] == '#':
+            print("Defined AR attribute as ",
+                  self.current_component['AR'])
+
+    def _attributeF(self, line):
+        """ F-type attributes are different. the second number is
+        specific. There can be up to 11 F parameters depending of
+        values which user uses as data fields in the components. We
+        are interested in supplier and supplier_ref attributes, as
+        those are used for us to generate the bill of material. First
+        4 parameters are _given_ by specs of kicad, the additional up
+        to 11 are user specific. We have to explode these into list of
+        lists separately. Typically the F attributes might look like
+        this:
+
+        F 0 "U2" H 6450 6900 50  0000 C CNN
+        F 1 "MCP23016-I/SO" H 6300 6800 50  0000 C CNN
+        F 2 "Housings_SOIC:SOIC-28W_7.5x17.9mm_Pitch1.27mm" H 1250 -3050 50  0001 L CNN
+        F 3 "" H 1350 -1100 50  0001 C CNN
+        F 4 "1439758" H 5900 5800 60  0001 C CNN "supplier_ref"
+        F 5 "FARNELL" H 5900 5800 60  0001 C CNN "supplier"
+
+        the real danger is, when a user defined attribute contains
+        spaces (and it can), hence we cannot simply split the data by
+        space, but we need to have a look locally between
+        quotes. e.g.:
+        F 5 "FARNELL" H 5900 5800 60  0001 C CNN "supplier reference"
+        is still valid attribute. This split is done by schTokenizer
+
+        """
+
+        data = self.tokenize(line)
+        # what we do here: F attribute is just another dictionary with
+        # key equal to attribute number (as they have to be exported
+        # in the same way later), all the rest of the attributes is
+        # stored 'as is' and various manipulation functions have to
+        # deal with it.
+        try:
+            self.current_component['F'][data[1]] = data[2:]
+        except KeyError:
+            # for the first time
+            self.current_component['F'] = {}
+            self.current_component['F'][data[1]] = data[2:]
+        if not self.recordLayout:
+            return
+        # byte offsets of the value, lines are mostly ascii, hence the
+        # characters are counted only when needed
+        value = self.FVALUE.match(line)
+        if value is not None:
+            start, end = value.span(1)
+            if self.NONASCII.search(line) is not None:
+                start = len(line[:start].encode(SHEET_ENCODING))
+                end = start + len(value.group(1).encode(SHEET_ENCODING))
+            self.current_component.setdefault('spans', {})[data[1]] =\
+                (self.offset + start, self.offset + end)
+
+    def stripQuote(self, text):
+        """ helper function replacing quotes by empty string
+        """
+        return text.replace('"', '')
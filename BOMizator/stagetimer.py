@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Measures the durations of the stages of long operations (opening,
+saving the project ...). When the operation finishes, its summary is
+written to the log and appended as a single JSON line to the timing
+file. Optionally each operation is profiled and the profile is dumped
+into given directory
+"""
+
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import logging
+
+
+class stageTimer(object):
+    """ collects the stages of the operation being just measured. Only
+    single operation is measured at a time, stages measured while no
+    operation is running are ignored, hence the timer costs nothing
+    when not used. Stages can be measured by several threads, the
+    stage of the same name measured several times is accumulated
+    """
+
+    def __init__(self, timingFile=None, profileDirectory=None):
+        """ timingFile is JSON-lines file the summaries are appended
+        to, profileDirectory is the directory the profiles of the
+        operations are dumped to. Both are optional
+        """
+        self.logger = logging.getLogger('bomizator')
+        self.timingFile = timingFile
+        self.profileDirectory = profileDirectory
+        if profileDirectory:
+            os.makedirs(profileDirectory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.operation = None
+        self.profiler = None
+        # profiles of the other threads working for the operation
+        self.threadProfiles = []
+        # number of profiles dumped, used to name the profile files
+        self.profiles = 0
+
+    def begin(self, operation):
+        """ starts measuring the operation. If other operation is
+        still running, it is finished first
+        """
+        if self.operation:
+            self.finish()
+        with self.lock:
+            self.operation = operation
+            self.start = time.perf_counter()
+            self.stages = OrderedDict()
+            self.threadProfiles = []
+        if self.profileDirectory:
+            # profiles the thread the operation is started in, the
+            # other threads are profiled by profile()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def profile(self):
+        """ profiles the calling thread (e.g. the thread loading the
+        project) until the block exits, the profile is added to the
+        profile of the current operation. Processes (the workers
+        parsing the sheets in parallel) are not profiled, the time
+        spent waiting for them is
+        """
+        if not self.profiler:
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self.lock:
+                if self.operation:
+                    self.threadProfiles.append(profiler)
+
+    @contextmanager
+    def stage(self, name):
+        """ measures the duration of the stage of the current
+        operation. Yields dictionary, which can be filled by the
+        numbers of processed items, these are summed when the stage
+        is measured several times
+        """
+        items = {}
+        start = time.perf_counter()
+        try:
+            yield items
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                if self.operation:
+                    stage = self.stages.setdefault(
+                        name, {'duration': 0.0, 'items': {}})
+                    stage['duration'] += duration
+                    for key, count in items.items():
+                        stage['items'][key] =\
+                            stage['items'].get(key, 0) + count
+
+    def finish(self):
+        """ finishes the current operation, logs its summary and
+        writes it to the timing file. Returns the summary, None if no
+        operation is running
+        """
+        with self.lock:
+            if not self.operation:
+                return None
+            summary = OrderedDict([
+                ('time', time.strftime("%Y-%m-%dT%H:%M:%S")),
+                ('operation', self.operation),
+                ('duration', time.perf_counter() - self.start),
+                ('stages', [OrderedDict([('stage', name),
+                                         ('duration', stage['duration']),
+                                         ('items', stage['items'])])
+                            for name, stage in self.stages.items()])])
+            self.operation = None
+        if self.profiler:
+            self.profiler.disable()
+            self.profiles += 1
+            fname = os.path.join(self.profileDirectory, "%s-%d.prof" %
+                                 (summary['operation'], self.profiles))
+            stats = pstats.Stats(self.profiler)
+            with self.lock:
+                for profiler in self.threadProfiles:
+                    stats.add(profiler)
+                self.threadProfiles = []
+            stats.dump_stats(fname)
+            self.profiler = None
+            self.logger.info("Profile of %s dumped into %s" %
+                             (summary['operation'], fname))
+        self.logger.info(self.formatSummary(summary))
+        if self.timingFile:
+            try:
+                with open(self.timingFile, "at") as f:
+                    f.write(json.dumps(summary) + "\n")
+            except OSError as e:
+                self.logger.error("Cannot write timing into %s: %s" %
+                                  (self.timingFile, str(e)))
+        return summary
+
+    def formatSummary(self, summary):
+        """ returns single line text of the summary
+        """
+        stages = []
+        for stage in summary['stages']:
+            text = "%s %.3f s" % (stage['stage'], stage['duration'])
+            if stage['items']:
+                text += " (%s)" % (', '.join(
+                    map(lambda item: "%d %s" % (item[1], item[0]),
+                        sorted(stage['items'].items()))), )
+            stages.append(text)
+        return "%s took %.3f s: %s" % (summary['operation'],
+                                       summary['duration'],
+                                       ', '.join(stages))
@@ -44,3 +44,7 @@ class NoProjectGiven(Exception):
 
 class ComponentParsingFailed(Exception):
     pass
+
+
+class DesignatorNotFound(Exception):
+    pass
@@ -35,7 +35,7 @@ try:
 except ImportError:
     from bs4 import BeautifulSoup
 # import headers to be able to match the string names correctly
-from BOMizator.headers import headers
+from BOMizator.headernames import headernames
 from BOMizator.suppexceptions import NotMatchingHeader, MalformedURL
 
 # FOR THE MOMENT THE FARNELL LOOKUP IS DONE BY PARSING THEIR WEB
@@ -54,7 +54,7 @@ class farnell(object):
 
     def __init__(self):
         self.name = "Farnell"
-        self.header = headers()
+        self.header = headernames()
         self.debug = False
 
     def getUrl(self, searchtext):
@@ -36,7 +36,7 @@ try:
 except ImportError:
     from bs4 import BeautifulSoup
 # import headers to be able to match the string names correctly
-from BOMizator.headers import headers
+from BOMizator.headernames import headernames
 from BOMizator.suppexceptions import NotMatchingHeader, MalformedURL
 import logging
 
@@ -56,7 +56,7 @@ class mouser(object):
 
     def __init__(self):
         self.name = "Mouser"
-        self.header = headers()
+        self.header = headernames()
         self.debug = False
         self.logger = logging.getLogger('bomizator')
         self.ua = UserAgent()
@@ -34,7 +34,7 @@ try:
 except ImportError:
     from bs4 import BeautifulSoup
 from BOMizator.suppexceptions import NotMatchingHeader, MalformedURL
-from BOMizator.headers import headers
+from BOMizator.headernames import headernames
 
 
 class radiospares(object):
@@ -44,7 +44,7 @@ class radiospares(object):
     def __init__(self):
         self.name = "RS Components"
         self.debug = False
-        self.header = headers()
+        self.header = headernames()
 
     def getUrl(self, searchtext):
         """ returns URL of farnell, which triggers searching for a
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Benchmark of the consolidated order of several projects. Synthetic
+projects are generated into temporary directory and their order is
+calculated with increasing number of worker processes. Run as:
+
+python3 -m benchmarks.batch [projects] [sheets] [components_per_sheet]
+"""
+import os
+import sys
+import glob
+import time
+import tempfile
+from BOMizator.batchorder import batchOrder
+from benchmarks.generator import generateProject
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    projects = int(args[0]) if len(args) > 0 else 16
+    sheets = int(args[1]) if len(args) > 1 else 4
+    components = int(args[2]) if len(args) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiles = []
+        for number in range(projects):
+            subdir = os.path.join(directory, "project%d" % (number, ))
+            os.mkdir(subdir)
+            profiles.append((generateProject(subdir, sheets, components),
+                             number + 1))
+        print("Ordering %d projects of %d sheets of %d components" %
+              (projects, sheets, components))
+        workers = 1
+        reference = None
+        while workers <= max(8, os.cpu_count()):
+            # parse cache would make all but the first run skip the
+            # parsing
+            for cache in glob.glob(os.path.join(directory, "*", "*.bpc")):
+                os.remove(cache)
+            start = time.perf_counter()
+            batchOrder(profiles, workers).getOrder()
+            duration = time.perf_counter() - start
+            if reference is None:
+                reference = duration
+            print("%2d workers: %8.3f s (%4.1f x)" % (workers,
+                                                        duration,
+                                                        reference / duration))
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Generates synthetic legacy KiCad projects used by the benchmarks. The
+top-level schematic references given number of sheets, each of them
+possibly instantiated several times (the components of such sheets
+carry AR attributes with designators of each instance). Each sheet
+contains given number of components and can reference another sheet
+down to given depth of the hierarchy
+"""
+import os
+
+HEADER = """EESchema Schematic File Version 4
+EELAYER 30 0
+EELAYER END
+$Descr A4 11693 8268
+encoding utf-8
+Sheet 1 1
+Title ""
+$EndDescr
+"""
+
+VALUES = ["10k", "4k7", "100nF", "1uF", "22pF", "1M", "0R"]
+
+
+def componentText(designator, uid, paths=[], fields=0):
+    """ returns text of single component as stored in the schematic
+    file. paths are the uids of the sheet instances containing the
+    component, when given, the component gets AR attribute for each of
+    them. fields is the number of additional user fields
+    """
+    x, y = 1000 + uid % 9000, 1000 + uid % 6000
+    value = VALUES[uid % len(VALUES)]
+    references = list(map(lambda instance: "%s_%d" % (designator,
+                                                      instance),
+                          range(len(paths))))
+    if references:
+        # schematic shows designator of one of the instances
+        designator = references[0]
+    data = {'d': designator, 'uid': uid, 'x': x, 'y': y, 'v': value,
+            'code': 1000000 + uid % 500}
+    text = """$Comp
+L Device:R %(d)s
+U 1 1 5A%(uid)06X
+P %(x)d %(y)d
+""" % data
+    for path, reference in zip(paths, references):
+        text += 'AR Path="%s/5A%06X" Ref="%s"  Part="1" \n' % (
+            path, uid, reference)
+    text += """F 0 "%(d)s" H %(x)d %(y)d 50  0000 L CNN
+F 1 "%(v)s" H %(x)d %(y)d 50  0000 L CNN
+F 2 "Resistor_SMD:R_0603_1608Metric" V %(x)d %(y)d 50  0001 C CNN
+F 3 "" H %(x)d %(y)d 50  0001 C CNN
+F 4 "FARNELL" H %(x)d %(y)d 60  0001 C CNN "Supplier"
+F 5 "%(code)d" H %(x)d %(y)d 60  0001 C CNN "Supplier no"
+""" % data
+    for field in range(fields):
+        text += 'F %d "user %d" H %d %d 60  0001 C CNN "Field%d"\n' % (
+            6 + field, uid, x, y, field)
+    text += """\t1    %(x)d %(y)d
+\t1    0    0    -1  
+$EndComp
+""" % data
+    return text
+
+
+def sheetText(name, fname, uid):
+    """ returns text of the sheet reference
+    """
+    return """$Sheet
+S 5000 %(y)d 1000 500 
+U %(uid)08X
+F0 "%(name)s" 50
+F1 "%(fname)s" 50
+$EndSheet
+""" % {'name': name, 'fname': fname, 'uid': uid, 'y': 1000 + 600 * uid}
+
+
+def generateProject(directory, sheets=8, components=1000, depth=1,
+                    reuse=1, fields=0):
+    """ writes the project into directory and returns the filename of
+    its .pro file. Top-level schematic references sheets, each of
+    them reuse times. Each of these sheets starts a chain of depth
+    nested sheets, each sheet contains components. fields is the
+    number of additional user fields of each component
+    """
+    os.makedirs(directory, exist_ok=True)
+    profile = os.path.join(directory, "bench.pro")
+    with open(profile, "wt") as f:
+        f.write("update=\n")
+    # sheet uids have to be unique in the whole project, as they
+    # compose the paths of AR attributes
+    uid = 0
+    with open(os.path.join(directory, "bench.sch"), "wt") as f:
+        f.write(HEADER)
+        paths = {}
+        for sheet in range(sheets):
+            paths[sheet] = []
+            for instance in range(reuse):
+                name = "Sheet%d" % (sheet, )
+                if instance:
+                    name += "_%d" % (instance, )
+                f.write(sheetText(name, "sheet%d.sch" % (sheet, ), uid))
+                paths[sheet].append("/%08X" % (uid, ))
+                uid += 1
+        f.write("$EndSCHEMATC\n")
+    number = 0
+    for level in range(depth):
+        for sheet in range(sheets):
+            fname = "sheet%d.sch" % (sheet, )
+            if level:
+                fname = "sheet%d_%d.sch" % (sheet, level)
+            with open(os.path.join(directory, fname), "wt") as f:
+                f.write(HEADER)
+                if level < depth - 1:
+                    f.write(sheetText("Sheet%d_%d" % (sheet, level + 1),
+                                      "sheet%d_%d.sch" % (sheet,
+                                                          level + 1),
+                                      uid))
+                    nested = ["%s/%08X" % (path, uid)
+                              for path in paths[sheet]]
+                    uid += 1
+                # designators are unique per sheet file, the first
+                # level keeps the designators of the flat projects
+                for component in range(components):
+                    f.write(componentText(
+                        "R%d_%d" % (component + 1,
+                                    level * sheets + sheet),
+                        number,
+                        paths[sheet] if reuse > 1 else [],
+                        fields))
+                    number += 1
+                f.write("$EndSCHEMATC\n")
+            if level < depth - 1:
+                paths[sheet] = nested
+    return profile
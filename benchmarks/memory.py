@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Benchmark of the memory used by the parsed components. Synthetic
+project is generated into temporary directory and parsed while the
+allocations are traced. Peak memory of the parsing and memory
+retained by the components are reported, the latter compared to the
+same components kept as dictionaries. Run as:
+
+python3 -m benchmarks.memory [sheets] [components_per_sheet]
+"""
+import sys
+import tracemalloc
+import tempfile
+from collections import defaultdict
+from BOMizator.sch_parser import schParser
+from benchmarks.generator import generateProject
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    sheets = int(args[0]) if len(args) > 0 else 16
+    components = int(args[1]) if len(args) > 1 else 5000
+
+    with tempfile.TemporaryDirectory() as directory:
+        profile = generateProject(directory, sheets, components)
+        print("Parsing %d sheets of %d components" % (sheets, components))
+        tracemalloc.start()
+        sch = schParser(profile)
+        sch.parseComponents()
+        retained, peak = tracemalloc.get_traced_memory()
+        print("parsing peak:  %10.1f kB" % (peak / 1024, ))
+        print("parser retained: %8.1f kB" % (retained / 1024, ))
+        # memory of the components only, the sheets keep the
+        # original records and the parser its working copies
+        before = tracemalloc.get_traced_memory()[0]
+        records = [component.copy()
+                   for component in sch.components.values()]
+        used = tracemalloc.get_traced_memory()[0] - before
+        print("records:       %10.1f kB (%5.1f B/component)" %
+              (used / 1024, used / len(records)))
+        before = tracemalloc.get_traced_memory()[0]
+        dicts = [defaultdict(str, component.items())
+                 for component in sch.components.values()]
+        used = tracemalloc.get_traced_memory()[0] - before
+        print("dictionaries:  %10.1f kB (%5.1f B/component)" %
+              (used / 1024, used / len(dicts)))
+        tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
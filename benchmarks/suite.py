@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Benchmark suite of the project processing. Synthetic project is
+generated into temporary directory and the main stages of its
+processing are timed: parsing of the schematic files (without and with
+the parse cache), collecting of the components by suppliers, saving of
+modified components, storing of the components into the components
+cache (and looking them up), building of the BOM view and generating
+of the report. Results are printed and optionally written as JSON,
+which can be compared with the results of another version to track
+the regressions.
+
+The suite imports the benchmarks package, hence it has to be run as a
+module from the top directory of the repository (python3
+benchmarks/suite.py fails with ModuleNotFoundError):
+
+python3 -m benchmarks.suite [--sheets N] [--components N] [--depth N]
+                            [--reuse N] [--fields N] [--workers N]
+                            [--cache ACCESS] [--repeat N] [--label TEXT]
+                            [--output results.json]
+                            [--compare previous.json]
+"""
+import os
+import sys
+import imp
+import json
+import time
+import argparse
+import platform
+import tempfile
+from collections import OrderedDict
+from benchmarks.generator import generateProject
+
+# BOM view and report need widgets, these run without display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5 import QtWidgets
+import BOMizator
+from BOMizator.sch_parser import schParser
+from BOMizator.headernames import headernames
+from BOMizator.qbomcomponentscache import QBOMComponentCache
+from BOMizator.qbomitemmodel import QBOMItemModel
+from BOMizator.reports_selector import reports_selector
+
+# plugin generating the report
+REPORTER = "Simple PDF reporter"
+
+
+class benchmarkSuite(object):
+    """ runs the stages over the project and collects their
+    durations. Stages are run in order, as each of them works with the
+    data produced by the previous ones
+    """
+
+    def __init__(self, profile, workers=1, repeat=3,
+                 cacheAccess="cachefileaccess.py"):
+        self.profile = profile
+        self.workers = workers
+        self.repeat = repeat
+        self.cacheAccess = cacheAccess
+        self.cacheFile = os.path.join(os.path.dirname(profile), "bench.bmc")
+        self.header = headernames()
+        self.results = OrderedDict()
+
+    def measure(self, stage, function, setup=None):
+        """ calls function repeat times and stores the durations of
+        the calls under the stage name. setup is called before each
+        call and is not timed. Returns the result of the last call
+        """
+        durations = []
+        for run in range(self.repeat):
+            if setup:
+                setup(run)
+            start = time.perf_counter()
+            result = function()
+            durations.append(time.perf_counter() - start)
+        self.results[stage] = durations
+        return result
+
+    def removeParseCache(self, run):
+        """ parse cache would make the parsing skip all the sheets
+        """
+        try:
+            os.remove(os.path.splitext(self.profile)[0] + ".bpc")
+        except FileNotFoundError:
+            pass
+
+    def parse(self):
+        """ parses the project and returns its parser
+        """
+        sch = schParser(self.profile, workers=self.workers)
+        sch.parseComponents()
+        return sch
+
+    def modifyComponents(self, run):
+        """ modifies all the components, hence all the sheets have to
+        be saved
+        """
+        self.sch.updateComponents(list(self.sch.getComponents()),
+                                  {self.header.MANUFACTURER:
+                                   "Manufacturer %d" % (run, )})
+
+    def createCacheAccess(self):
+        """ returns access of the components cache as created by the
+        application
+        """
+        info = imp.load_source('', os.path.join(
+            os.path.dirname(os.path.realpath(BOMizator.__file__)),
+            self.cacheAccess)).DEFAULT_CLASS
+        access = info(self.cacheFile)
+        if not access.validate():
+            access.create(self.cacheFile)
+        return access
+
+    def removeComponentsCache(self, run):
+        """ each run stores the components into a new cache
+        """
+        for fname in os.listdir(os.path.dirname(self.cacheFile)):
+            if fname.startswith(os.path.basename(self.cacheFile)):
+                os.remove(os.path.join(os.path.dirname(self.cacheFile),
+                                       fname))
+
+    def storeComponents(self):
+        """ stores all the components into a new components cache in
+        the same way as when dropped from the web pages, one drop for
+        each ordering code, and saves the cache
+        """
+        cache = QBOMComponentCache(self.createCacheAccess())
+        drops = OrderedDict()
+        for component in self.sch.getComponents().values():
+            drops.setdefault(component[self.header.SUPPNO], []).append(
+                dict(map(lambda key: (key, component[key]),
+                         [self.header.LIBREF,
+                          self.header.VALUE,
+                          self.header.FOOTPRINT])))
+        for ordercode, complist in drops.items():
+            cache.storeComponents(complist,
+                                  {self.header.SUPPLIER: "FARNELL",
+                                   self.header.SUPPNO: ordercode})
+        cache.save()
+        return cache
+
+    def findComponents(self):
+        """ opens the stored components cache and looks up each
+        component, as done for the context menu of the component
+        """
+        cache = QBOMComponentCache(self.createCacheAccess())
+        for component in self.sch.getComponents().values():
+            cache.findComponent(component)
+
+    def generateReport(self):
+        """ generates PDF report of the BOM as exported by the
+        application
+        """
+        order, additional = self.bomModel.getAllComponents()
+        self.reporters.generateBOM(
+            REPORTER, order,
+            os.path.join(os.path.dirname(self.profile), "bench.pdf"),
+            additional)
+
+    def run(self):
+        """ runs all the stages and returns the results
+        """
+        self.sch = self.measure("parse", self.parse,
+                                self.removeParseCache)
+        self.measure("parse cached", self.parse)
+        self.measure("collect", self.sch.getCollectedComponents)
+        self.measure("save", self.sch.save, self.modifyComponents)
+        self.measure("cache store", self.storeComponents,
+                     self.removeComponentsCache)
+        self.measure("cache lookup", self.findComponents)
+        self.bomModel = self.measure(
+            "BOM model", lambda: QBOMItemModel(self.sch, False))
+        self.reporters = reports_selector()
+        self.measure("report", self.generateReport)
+        return self.results
+
+
+def report(results, previous=None):
+    """ prints the results, when previous results are given, the
+    ratio of the durations is printed as well. The best of the runs is
+    compared, as it is the least disturbed by the rest of the system
+    """
+    for stage, durations in results["results"].items():
+        line = "%-14s %8.3f s" % (stage, min(durations))
+        if previous and stage in previous["results"]:
+            line += " (%5.2f x %s)" % (
+                min(durations) / min(previous["results"][stage]),
+                previous.get("label") or "previous")
+        print(line)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Times processing of a synthetic KiCad project")
+    parser.add_argument("--sheets", type=int, default=8,
+                        help="number of sheets of top-level schematic")
+    parser.add_argument("--components", type=int, default=1000,
+                        help="number of components per sheet")
+    parser.add_argument("--depth", type=int, default=1,
+                        help="depth of the hierarchy of sheets")
+    parser.add_argument("--reuse", type=int, default=1,
+                        help="number of instances of each sheet")
+    parser.add_argument("--fields", type=int, default=0,
+                        help="number of user fields of each component")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes parsing the sheets")
+    parser.add_argument("--cache", default="cachefileaccess.py",
+                        help="access plugin of the components cache\
+ (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of runs of each stage")
+    parser.add_argument("--label", default="",
+                        help="identifies the results, e.g. version")
+    parser.add_argument("--output",
+                        help="writes the results as JSON into file")
+    parser.add_argument("--compare",
+                        help="JSON results to compare with")
+    options = parser.parse_args(args)
+
+    parameters = OrderedDict(map(lambda key: (key, getattr(options, key)),
+                                 ["sheets", "components", "depth",
+                                  "reuse", "fields", "workers",
+                                  "cache"]))
+    app = QtWidgets.QApplication.instance() or\
+        QtWidgets.QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as directory:
+        profile = generateProject(directory,
+                                  options.sheets,
+                                  options.components,
+                                  options.depth,
+                                  options.reuse,
+                                  options.fields)
+        suite = benchmarkSuite(profile, options.workers, options.repeat,
+                               options.cache)
+        print("Processing %d sheets of %d components" % (
+            options.sheets * options.depth, options.components))
+        results = OrderedDict([
+            ("label", options.label),
+            ("time", time.strftime("%Y-%m-%dT%H:%M:%S")),
+            ("python", platform.python_version()),
+            ("platform", platform.platform()),
+            ("parameters", parameters),
+            ("repeat", options.repeat),
+            ("results", suite.run())])
+    previous = None
+    if options.compare:
+        with open(options.compare) as f:
+            previous = json.load(f)
+        if previous["parameters"] != parameters:
+            print("Warning: compared results were measured with\
+ different parameters")
+    report(results, previous)
+    if options.output:
+        with open(options.output, "wt") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
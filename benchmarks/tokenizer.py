@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Benchmark of the schematic lines tokenizer against shlex. Synthetic
+project of 50k components is generated in memory and all its
+attribute lines are split by both of the tokenizers. Run as:
+
+python3 -m benchmarks.tokenizer [number_of_components]
+"""
+import sys
+import shlex
+import time
+from BOMizator.schtokenizer import schTokenizer
+
+
+def componentLines(number):
+    """ generates attribute lines of a single component as they
+    appear in the legacy schematic file
+    """
+    return ['L Device:C C%d' % (number, ),
+            'U 1 1 5A%06X' % (number, ),
+            'P %d %d' % (1000 + number % 5000, 2000 + number % 3000),
+            'F 0 "C%d" H 1070 1046 50  0000 L CNN' % (number, ),
+            'F 1 "100nF 50V \\"X7R\\"" H 1070 955 50  0000 L CNN',
+            'F 2 "Capacitor_SMD:C_0603_1608Metric" V 930 1000 50  0001 C CNN',
+            'F 3 "" H 1000 1000 50  0001 C CNN',
+            'F 4 "1759122" H 1000 1000 60  0001 C CNN "Supplier no"',
+            'F 5 "FARNELL" H 1000 1000 60  0001 C CNN "Supplier"',
+            'F 6 "Kemet Electronics" H 1000 1000 60  0001 C CNN "Manufacturer"']
+
+
+def timeit(tokenizer, lines):
+    """ returns time in seconds needed to tokenize all the lines
+    """
+    start = time.perf_counter()
+    for line in lines:
+        tokenizer(line)
+    return time.perf_counter() - start
+
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    try:
+        components = int(args[0])
+    except IndexError:
+        components = 50000
+
+    lines = []
+    for number in range(components):
+        lines += componentLines(number)
+
+    tokenizer = schTokenizer()
+    # both have to give the same results, otherwise comparison does
+    # not make any sense
+    for line in lines[:1000]:
+        assert tokenizer(line) == shlex.split(line), line
+
+    tshlex = timeit(shlex.split, lines)
+    tfast = timeit(tokenizer, lines)
+    print("Tokenized %d lines of %d components" % (len(lines), components))
+    print("shlex:        %8.3f s" % (tshlex, ))
+    print("schTokenizer: %8.3f s" % (tfast, ))
+    print("speedup:      %8.1f x" % (tshlex / tfast, ))
+
+
+if __name__ == '__main__':
+    main()
@@ -48,5 +48,8 @@ setup(name='BOMizator',
       entry_points={
           'gui_scripts': [
               'bomizator = BOMizator.__main__:main'
+              ],
+          'console_scripts': [
+              'bomizator-cli = BOMizator.cli:main'
               ]
       })
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for resolving of the components in the components cache
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from BOMizator.cachefileaccess import cacheFileAccess
+from BOMizator.qbomcomponentscache import QBOMComponentCache
+
+RS = {'Supplier': 'RS', 'Supplier no': '1'}
+FARNELL = {'Supplier': 'FARNELL', 'Supplier no': '2'}
+DATA = {'Device:R': {'10k': {'R_0603': {'a1': RS}},
+                     '4k7': {'R_0603': {'a1': RS, 'b2': FARNELL}}},
+        'Device:C': {'0.1uF': {'Capacitor_SMD:C_0603': {'c3': FARNELL}}}}
+
+
+class TestResolveComponents(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        access = cacheFileAccess(os.path.join(self.directory,
+                                              "components.bmc"))
+        access.save(DATA)
+        self.cache = QBOMComponentCache(access)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testResolve(self):
+        hits, ambiguous, misses = self.cache.resolveComponents(
+            [('Device:R', '10k', 'R_0603'),
+             ('Device:R', '4k7', 'R_0603'),
+             ('Device:C', '100n', 'C_0603'),
+             ('Device:R', '47k', 'R_0603')])
+        self.assertEqual(hits, {('Device:R', '10k', 'R_0603'): RS,
+                                ('Device:C', '100n', 'C_0603'): FARNELL})
+        self.assertEqual(list(ambiguous.keys()),
+                         [('Device:R', '4k7', 'R_0603')])
+        self.assertEqual(len(ambiguous[('Device:R', '4k7', 'R_0603')]), 2)
+        self.assertEqual(misses, [('Device:R', '47k', 'R_0603')])
+
+
+if __name__ == '__main__':
+    unittest.main()
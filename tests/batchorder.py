@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for merging orders of several projects
+"""
+import os
+import unittest
+from collections import OrderedDict
+from BOMizator.headernames import headernames
+from BOMizator.batchorder import batchOrder
+
+
+def item(ordercode, total, designators, donotorder=False):
+    return OrderedDict([(headernames.SUPPNO, ordercode),
+                        (headernames.TOTAL, total),
+                        (headernames.DESIGNATORS, designators),
+                        (headernames.MANUFACTURER, ''),
+                        (headernames.DONOTORDER, donotorder)])
+
+
+class TestBatchOrder(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = batchOrder([])
+
+    def testRoundingAfterSummation(self):
+        # each project needs 2 pieces, rounded to 5 separately would
+        # give 10
+        order = self.batch.merge([
+            ('a', [('FARNELL', item('123', 5, ['R1', 'R2']), 2, 5)]),
+            ('b', [('FARNELL', item('123', 5, ['R1', 'R2']), 2, 5)])])
+        merged = order['FARNELL'][0]
+        self.assertEqual(merged[headernames.TOTAL], 5)
+        self.assertEqual(merged[headernames.DESIGNATORS],
+                         ['a:R1', 'a:R2', 'b:R1', 'b:R2'])
+
+    def testCoarsestPolicyAndManualTotal(self):
+        order = self.batch.merge([
+            ('a', [('RS', item('1', 10, ['C1']), 3, 10),
+                   ('RS', item('2', 7, ['C2']), None, 1)]),
+            ('b', [('RS', item('1', 2, ['C1']), 2, 1),
+                   ('MOUSER', item('3', 4, ['U1']), 4, 1)])])
+        self.assertEqual(list(order.keys()), ['MOUSER', 'RS'])
+        self.assertEqual([(it[headernames.SUPPNO], it[headernames.TOTAL])
+                          for it in order['RS']],
+                         [('1', 10), ('2', 7)])
+
+    def testProjectNames(self):
+        names = self.batch.getNames([
+            os.path.join('panel', 'left', 'board.pro'),
+            os.path.join('panel', 'right', 'board.pro'),
+            os.path.join('panel', 'left', 'power.pro'),
+            os.path.join('panel', 'left', 'power.pro')])
+        self.assertEqual(names, ['left/board', 'right/board', 'power#1',
+                                 'power#2'])
+        # same named projects are not merged
+        order = self.batch.merge(zip(names[:2], [
+            [('FARNELL', item('123', 5, ['R1']), 2, 1)],
+            [('FARNELL', item('123', 5, ['R1']), 2, 1)]]))
+        self.assertEqual(order['FARNELL'][0][headernames.DESIGNATORS],
+                         ['left/board:R1', 'right/board:R1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
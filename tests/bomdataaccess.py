@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for BOM data storages
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from PyQt5 import QtCore
+from BOMizator.bomdataaccess import createBOMDataAccess
+from BOMizator.projectparser import projectParser
+
+DATA = {'FARNELL': {'1737246': {'Multiplier': '2',
+                                'Adder': '',
+                                'Total': 12,
+                                'Do not order': 0,
+                                'Rounding Policy': 10}},
+        'RS': {'123-456': {'Multiplier': '1',
+                           'Adder': '0',
+                           'Total': -1,
+                           'Do not order': 1,
+                           'Rounding Policy': 1}}}
+
+
+class TestBOMDataAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.project = os.path.join(self.directory, "project.pro")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def roundTrip(self, accessType):
+        access = createBOMDataAccess(self.project, accessType)
+        self.assertFalse(access.validate())
+        access.save(DATA)
+        self.assertTrue(access.validate())
+        self.assertEqual(access.load(), DATA)
+        # data can be replaced completely
+        access.save({'RS': DATA['RS']})
+        self.assertEqual(access.load(), {'RS': DATA['RS']})
+        return access
+
+    def testJSON(self):
+        access = self.roundTrip("bomdatajsonaccess.py")
+        self.assertEqual(access.name(), "JSON")
+
+    def testSQLite(self):
+        access = self.roundTrip("bomdatasqliteaccess.py")
+        self.assertEqual(access.name(), "SQLite")
+
+    def testExistingStorageIsUsed(self):
+        createBOMDataAccess(self.project, "bomdatasqliteaccess.py").save(DATA)
+        access = createBOMDataAccess(self.project)
+        self.assertEqual(access.name(), "SQLite")
+
+
+class TestBOMDataMigration(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.project = os.path.join(self.directory, "project.pro")
+        open(self.project, "wt").close()
+        self.bmzfile = os.path.join(self.directory, "project.bmz")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def getSettings(self):
+        return QtCore.QSettings(self.bmzfile, QtCore.QSettings.IniFormat)
+
+    def testMigration(self):
+        # older projects keep BOM data in the settings file, one group
+        # per supplier and order code
+        settings = self.getSettings()
+        for supplier, items in DATA.items():
+            for ref, data in items.items():
+                settings.beginGroup(supplier)
+                settings.beginGroup(ref)
+                for key, value in data.items():
+                    settings.setValue(key, value)
+                settings.endGroup()
+                settings.endGroup()
+        settings.setValue('globalMultiplier', 3)
+        settings.sync()
+        project = projectParser(self.project, self.getSettings())
+        self.assertEqual(project.bomdata, DATA)
+        project.saveBOMData()
+        project.localSettings.sync()
+        # supplier groups are moved into the BOM data storage, the
+        # other settings are kept
+        settings = self.getSettings()
+        self.assertEqual(settings.childGroups(), [])
+        self.assertEqual(settings.value('globalMultiplier', 1, int), 3)
+        self.assertTrue(createBOMDataAccess(self.project).validate())
+        project = projectParser(self.project, self.getSettings())
+        self.assertEqual(project.bomdata, DATA)
+
+    def testNullValues(self):
+        createBOMDataAccess(self.project, "bomdatajsonaccess.py").save(
+            {'RS': {'123-456': {'Multiplier': None,
+                                'Total': None,
+                                'Rounding Policy': 'x'}}})
+        project = projectParser(self.project, self.getSettings())
+        self.assertEqual(project.bomdata,
+                         {'RS': {'123-456': {'Multiplier': '',
+                                             'Total': -1,
+                                             'Rounding Policy': -1}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
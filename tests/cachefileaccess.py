@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for file access to the components cache
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from BOMizator.cachefileaccess import cacheFileAccess
+
+A1 = {'Supplier': 'FARNELL', 'Supplier no': '1737246'}
+DATA = {'Device:R': {'10k': {'R_0603': {'a1': A1},
+                             'R_0805': {'a1': A1}}},
+        'Device:C': {'100n': {'C_0603': {
+            'c3': {'Supplier': 'RS', 'Supplier no': '2'}}}}}
+
+
+class TestCacheFileAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cacheFile = os.path.join(self.directory, "components.bmc")
+        self.access = cacheFileAccess(self.cacheFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertShared(self, data):
+        self.assertIs(data['Device:R']['10k']['R_0603']['a1'],
+                      data['Device:R']['10k']['R_0805']['a1'])
+
+    def testDataStoredOnce(self):
+        self.access.save(DATA)
+        with open(self.cacheFile) as f:
+            content = json.load(f)
+        self.assertEqual(sorted(content['components']), ['a1', 'c3'])
+        self.assertEqual(content['index']['Device:R']['10k'],
+                         {'R_0603': ['a1'], 'R_0805': ['a1']})
+        data = self.access.load()
+        self.assertEqual(data, DATA)
+        self.assertShared(data)
+
+    def testPreviousVersion(self):
+        with open(self.cacheFile, "wt") as f:
+            json.dump(DATA, f)
+        data = self.access.load()
+        self.assertEqual(data, DATA)
+        self.assertShared(data)
+
+    def testUnsupportedVersion(self):
+        with open(self.cacheFile, "wt") as f:
+            json.dump({"version": 3}, f)
+        self.assertRaises(ValueError, self.access.load)
+
+
+if __name__ == '__main__':
+    unittest.main()
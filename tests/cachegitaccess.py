@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for git access to the components cache
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import subprocess
+from BOMizator.cachegitaccess import cacheGitAccess
+
+R10K = {'Device:R': {'10k': {'R_0603': {
+    'a1': {'Supplier': 'FARNELL', 'Supplier no': '1737246'}}}}}
+C100N = {'Device:C': {'100n': {'C_0603': {
+    'c3': {'Supplier': 'RS', 'Supplier no': '2'}}}}}
+R4K7 = {'Device:R': {'4k7': {'R_0603': {
+    'b2': {'Supplier': 'RS', 'Supplier no': '3'}}}}}
+
+
+class TestCacheGitAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.git("init", "--quiet", "--bare", "remote.git")
+        self.accesses = []
+
+    def tearDown(self):
+        for access in self.accesses:
+            access.close()
+        shutil.rmtree(self.directory)
+
+    def git(self, *args):
+        subprocess.run(("git", ) + args, cwd=self.directory, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def clone(self, name):
+        """ returns access to the cache in a new clone of the remote
+        """
+        self.git("clone", "--quiet",
+                 "file://" + os.path.join(self.directory, "remote.git"),
+                 name)
+        access = cacheGitAccess(os.path.join(self.directory, name,
+                                             "components.bmc"))
+        access.commitDelay = 0
+        self.accesses.append(access)
+        return access
+
+    def merged(self, *caches):
+        access = cacheGitAccess()
+        entries = {}
+        for cache in caches:
+            entries.update(access.getEntries(cache))
+        return access.getCache(entries)
+
+    def testCreate(self):
+        access = cacheGitAccess(os.path.join(self.directory, "new",
+                                             "components.bmc"))
+        self.accesses.append(access)
+        self.assertFalse(access.validate())
+        access.create(access.filename)
+        self.assertEqual(access.load(), {})
+        access.save(R10K)
+        access.flush()
+        self.assertTrue(access.validate())
+        self.assertEqual(access.show("HEAD"), access.getEntries(R10K))
+
+    def testConcurrentChanges(self):
+        first = self.clone("first")
+        second = self.clone("second")
+        changed = []
+        second.setListener(lambda: changed.append(True))
+        self.assertEqual(first.load(), {})
+        first.save(R10K)
+        first.flush()
+        # pulled in background when loaded
+        self.assertEqual(second.load(), {})
+        second.flush()
+        self.assertEqual(changed, [True])
+        self.assertEqual(second.merge({}), R10K)
+        # different components added in both clones are merged
+        first.save(self.merged(R10K, C100N))
+        first.flush()
+        second.save(self.merged(R10K, R4K7))
+        second.flush()
+        first.load()
+        first.flush()
+        for access in (first, second):
+            self.assertEqual(access.show("HEAD"),
+                             access.getEntries(
+                                 self.merged(R10K, C100N, R4K7)))
+
+    def testOtherFilesMerged(self):
+        first = self.clone("first")
+        second = self.clone("second")
+        first.load()
+        first.save(R10K)
+        first.flush()
+        second.load()
+        second.flush()
+        # other file of the repository changed together with the cache
+        with open(os.path.join(self.directory, "first", "notes.txt"),
+                  "wt") as f:
+            f.write("notes\n")
+        self.git("-C", "first", "add", "notes.txt")
+        self.git("-C", "first", "-c", "user.name=test", "-c",
+                 "user.email=test@localhost", "commit", "--quiet", "-m",
+                 "Add notes")
+        first.save(self.merged(R10K, C100N))
+        first.flush()
+        second.save(self.merged(R10K, R4K7))
+        second.flush()
+        self.assertEqual(second.show("HEAD"),
+                         second.getEntries(self.merged(R10K, C100N, R4K7)))
+        self.assertEqual(second.git("show", "HEAD:notes.txt").stdout,
+                         "notes\n")
+
+    def testOnlyCacheCommitted(self):
+        access = self.clone("first")
+        access.load()
+        access.flush()
+        # file staged by the user stays staged
+        with open(os.path.join(self.directory, "first", "notes.txt"),
+                  "wt") as f:
+            f.write("notes\n")
+        self.git("-C", "first", "add", "notes.txt")
+        access.save(R10K)
+        access.flush()
+        self.assertEqual(access.show("HEAD"), access.getEntries(R10K))
+        self.assertEqual(access.git("diff", "--cached", "--name-only").stdout,
+                         "notes.txt\n")
+
+    def testCloseWithoutWaiting(self):
+        access = self.clone("first")
+        access.commitDelay = 3600
+        access.load()
+        access.save(R10K)
+        # the commit is handed to the background thread, the cache
+        # opened next sees it when its operations finish
+        access.close(wait=False)
+        other = self.clone("second")
+        other.load()
+        other.flush()
+        self.assertEqual(other.merge({}), R10K)
+        self.assertEqual(access.show("HEAD"), access.getEntries(R10K))
+
+    def testSaveBeforeReload(self):
+        access = cacheGitAccess(os.path.join(self.directory, "new",
+                                             "components.bmc"))
+        self.accesses.append(access)
+        access.create(access.filename)
+        data = access.load()
+        access.flush()
+        # components pulled in background, application saves before
+        # it merges them
+        access.write(C100N)
+        data = self.merged(data, R10K)
+        access.save(data)
+        data = access.merge(data)
+        self.assertEqual(data, self.merged(R10K, C100N))
+        access.save(self.merged(data, R4K7))
+        access.flush()
+        self.assertEqual(access.show("HEAD"),
+                         access.getEntries(self.merged(R10K, C100N, R4K7)))
+
+    def testMergeEntries(self):
+        access = cacheGitAccess()
+        base = access.getEntries(self.merged(R10K, C100N))
+        # removed in ours, added in theirs
+        ours = access.getEntries(C100N)
+        theirs = access.getEntries(self.merged(R10K, C100N, R4K7))
+        self.assertEqual(access.mergeEntries(base, ours, theirs),
+                         access.getEntries(self.merged(C100N, R4K7)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for journaled file access to the components cache
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from BOMizator.cachejournalaccess import cacheJournalAccess
+
+DATA = {'Device:R': {'10k': {'R_0603': {
+    'a1': {'Supplier': 'FARNELL', 'Supplier no': '1737246'}}}}}
+
+
+class TestCacheJournalAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cacheFile = os.path.join(self.directory, "components.bmc")
+        self.access = cacheJournalAccess(self.cacheFile)
+        self.access.save(DATA)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def snapshot(self):
+        with open(self.cacheFile) as f:
+            return self.access.unpack(json.load(f))[0]
+
+    def testJournal(self):
+        self.access.store([('Device:C', '100n', 'C_0603', 'c3',
+                            {'Supplier': 'RS'})])
+        self.access.remove([('Device:R', '10k', 'R_0603', 'a1')])
+        # snapshot is not rewritten
+        self.assertEqual(self.snapshot(), DATA)
+        self.assertEqual(cacheJournalAccess(self.cacheFile).load(),
+                         {'Device:C': {'100n': {'C_0603': {
+                             'c3': {'Supplier': 'RS'}}}}})
+
+    def testIncompleteRecord(self):
+        self.access.store([('Device:C', '100n', 'C_0603', 'c3',
+                            {'Supplier': 'RS'})])
+        # crash when writing the record
+        with open(self.access.getJournal(), "at") as f:
+            f.write('["+", "Device:C", "100n"')
+        self.access.remove([('Device:R', '10k', 'R_0603', 'a1')])
+        self.assertEqual(self.access.load(),
+                         {'Device:C': {'100n': {'C_0603': {
+                             'c3': {'Supplier': 'RS'}}}}})
+
+    def testDataStoredOnce(self):
+        self.access.load()
+        self.access.store([('Device:R', '10k', 'R_0805', 'a1',
+                            DATA['Device:R']['10k']['R_0603']['a1']),
+                           ('Device:C', '100n', 'C_0603', 'c3',
+                            {'Supplier': 'RS'}),
+                           ('Device:C', '100n', 'C_0805', 'c3',
+                            {'Supplier': 'RS'})])
+        with open(self.access.getJournal()) as f:
+            records = list(map(json.loads, f))
+        # data of a1 are in the snapshot, data of c3 in the first record
+        self.assertEqual(list(map(len, records)), [5, 6, 5])
+        data = cacheJournalAccess(self.cacheFile).load()
+        self.assertIs(data['Device:R']['10k']['R_0603']['a1'],
+                      data['Device:R']['10k']['R_0805']['a1'])
+        self.assertEqual(data['Device:C']['100n']['C_0805'],
+                         {'c3': {'Supplier': 'RS'}})
+
+    def testCompaction(self):
+        self.access.compactRecords = 2
+        entries = [('Device:C', '100n', 'C_0603', str(number),
+                    {'Supplier': 'RS'}) for number in range(3)]
+        self.access.store(entries)
+        data = self.access.load()
+        self.assertFalse(os.path.isfile(self.access.getJournal()))
+        self.assertEqual(self.snapshot(), data)
+        self.assertEqual(len(data['Device:C']['100n']['C_0603']), 3)
+
+    def testCompactionWhenStored(self):
+        self.access.compactRecords = 2
+        self.access.store([('Device:C', '100n', 'C_0603', '0',
+                            {'Supplier': 'RS'})])
+        self.access.remove([('Device:R', '10k', 'R_0603', 'a1')])
+        self.assertTrue(os.path.isfile(self.access.getJournal()))
+        self.access.store([('Device:C', '100n', 'C_0603', '1',
+                            {'Supplier': 'RS'})])
+        # the third record compacts the journal without loading
+        self.assertFalse(os.path.isfile(self.access.getJournal()))
+        self.assertEqual(self.snapshot(),
+                         {'Device:C': {'100n': {'C_0603': {
+                             '0': {'Supplier': 'RS'},
+                             '1': {'Supplier': 'RS'}}}}})
+
+    def testCrashWhenCompacting(self):
+        self.access.store([('Device:C', '100n', 'C_0603', 'c3',
+                            {'Supplier': 'RS'})])
+        self.access.remove([('Device:R', '10k', 'R_0603', 'a1')])
+        expected = {'Device:C': {'100n': {'C_0603': {
+            'c3': {'Supplier': 'RS'}}}}}
+        # crashed after the journal was rotated, the snapshot is not
+        # replaced yet
+        os.replace(self.access.getJournal(),
+                   self.access.getRotatedJournal())
+        self.access.store([('Device:C', '100n', 'C_0805', 'c3',
+                            {'Supplier': 'RS'})])
+        expected['Device:C']['100n']['C_0805'] = {'c3': {'Supplier': 'RS'}}
+        self.assertEqual(self.snapshot(), DATA)
+        self.assertEqual(cacheJournalAccess(self.cacheFile).load(),
+                         expected)
+        # crashed after the snapshot was replaced, the rotated journal
+        # is not removed yet
+        shutil.copy(self.access.getRotatedJournal(),
+                    self.access.getJournal() + "copy")
+        self.access.save(self.access.load())
+        os.replace(self.access.getJournal() + "copy",
+                   self.access.getRotatedJournal())
+        self.assertEqual(self.snapshot(), expected)
+        self.assertEqual(cacheJournalAccess(self.cacheFile).load(),
+                         expected)
+
+    def testCompactedByOtherInstance(self):
+        self.access.load()
+        # another instance removes the component and compacts the
+        # journal, the data of a1 are not stored any more
+        other = cacheJournalAccess(self.cacheFile)
+        other.remove([('Device:R', '10k', 'R_0603', 'a1')])
+        other.save(other.load())
+        self.access.store([('Device:R', '10k', 'R_0805', 'a1',
+                            DATA['Device:R']['10k']['R_0603']['a1'])])
+        with open(self.access.getJournal()) as f:
+            records = list(map(json.loads, f))
+        self.assertEqual(list(map(len, records)), [6])
+        self.assertEqual(cacheJournalAccess(self.cacheFile).load(),
+                         {'Device:R': {'10k': {'R_0805': {
+                             'a1': DATA['Device:R']['10k']['R_0603'][
+                                 'a1']}}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for SQLite access to the components cache
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from BOMizator.cachesqliteaccess import cacheSQLiteAccess
+
+DATA = {'Device:R': {'10k': {'R_0603': {
+    'a1': {'Supplier': 'FARNELL', 'Supplier no': '1737246'},
+    'b2': {'Supplier': 'RS', 'Supplier no': '123-456'}}}},
+        'Device:C': {'100n': {'C_0603': {
+            'c3': {'Supplier': 'FARNELL', 'Supplier no': '9406352'}}}}}
+
+
+class TestCacheSQLiteAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cacheFile = os.path.join(self.directory, "components.bmc")
+        with open(self.cacheFile, "wt") as f:
+            json.dump(DATA, f)
+        self.access = cacheSQLiteAccess(self.cacheFile)
+
+    def tearDown(self):
+        self.access.close()
+        shutil.rmtree(self.directory)
+
+    def testCreateImportsCacheFile(self):
+        self.assertFalse(self.access.validate())
+        self.access.create(self.cacheFile)
+        self.assertTrue(self.access.validate())
+        self.assertTrue(os.path.isfile(os.path.join(
+            self.directory, "components.bmc.sqlite")))
+        self.assertEqual(self.access.load(), DATA)
+
+    def testFind(self):
+        self.access.create(self.cacheFile)
+        self.assertEqual(self.access.find('Device:R', '10k', 'R_0603'),
+                         DATA['Device:R']['10k']['R_0603'])
+        self.assertEqual(self.access.find('Device:R', '10k', 'R_0402'), {})
+
+    def testStore(self):
+        self.access.create(self.cacheFile)
+        self.access.find('Device:C', '100n', 'C_0603')
+        self.access.store([('Device:C', '100n', 'C_0603', 'd4',
+                            {'Supplier': 'RS'}),
+                           # already stored components are kept
+                           ('Device:R', '10k', 'R_0603', 'a1',
+                            {'Supplier': 'DIGIKEY'})])
+        self.assertEqual(self.access.find('Device:C', '100n', 'C_0603'),
+                         {'c3': DATA['Device:C']['100n']['C_0603']['c3'],
+                          'd4': {'Supplier': 'RS'}})
+        self.assertEqual(self.access.find('Device:R', '10k', 'R_0603'),
+                         DATA['Device:R']['10k']['R_0603'])
+        # another access sees the stored data
+        access = cacheSQLiteAccess(self.cacheFile)
+        self.assertEqual(len(access.find('Device:C', '100n', 'C_0603')), 2)
+        access.close()
+
+    def testSaveReplaces(self):
+        self.access.create(self.cacheFile)
+        self.access.save({'Device:C': DATA['Device:C']})
+        self.assertEqual(self.access.load(), {'Device:C': DATA['Device:C']})
+        self.assertEqual(self.access.find('Device:R', '10k', 'R_0603'), {})
+
+    def testDataStoredOnce(self):
+        self.access.create(self.cacheFile)
+        a1 = DATA['Device:R']['10k']['R_0603']['a1']
+        self.access.store([('Device:R', '10k', 'R_0805', 'a1', a1)])
+        connection = self.access.connect()
+        self.assertEqual(connection.execute(
+            "SELECT COUNT(*) FROM componentdata").fetchone()[0], 3)
+        data = self.access.load()
+        self.assertIs(data['Device:R']['10k']['R_0603']['a1'],
+                      data['Device:R']['10k']['R_0805']['a1'])
+        # data are removed with the last component using them
+        self.access.remove([('Device:R', '10k', 'R_0603', 'a1')])
+        self.assertEqual(connection.execute(
+            "SELECT COUNT(*) FROM componentdata").fetchone()[0], 3)
+        self.access.remove([('Device:R', '10k', 'R_0805', 'a1')])
+        self.assertEqual(connection.execute(
+            "SELECT COUNT(*) FROM componentdata").fetchone()[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for the command line generation of the order list and for
+its output formats
+"""
+import io
+import os
+import csv
+import json
+import tempfile
+import unittest
+from collections import OrderedDict
+from BOMizator import cli
+from BOMizator.bomdatajsonaccess import bomDataJSONAccess
+from BOMizator.headernames import headernames
+
+HEADER = '''EESchema Schematic File Version 4
+$Descr A4 11693 8268
+$EndDescr
+'''
+
+COMPONENT = '''$Comp
+L Device:%s %s
+U 1 1 5A0000%02d
+P 1000 2000
+F 0 "%s" H 1070 1046 50  0000 L CNN
+F 1 "%s" H 1070 955 50  0000 L CNN
+F 2 "" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+F 4 "%s" H 1000 1000 60  0001 C CNN "Supplier"
+F 5 "%s" H 1000 1000 60  0001 C CNN "Supplier no"
+\t1    1000 2000
+\t1    0    0    -1  
+$EndComp
+'''
+
+FOOTER = '''$EndSCHEMATC
+'''
+
+
+def component(number, designator, value, supplier, ordercode):
+    """ returns the text of the component ordered from the supplier
+    """
+    return COMPONENT % (designator[0], designator, number, designator,
+                        value, supplier, ordercode)
+
+
+def item(ordercode, total, designators):
+    return OrderedDict([(headernames.SUPPNO, ordercode),
+                        (headernames.TOTAL, total),
+                        (headernames.DESIGNATORS, designators),
+                        (headernames.DONOTORDER, False)])
+
+
+ORDER = OrderedDict([
+    ('ACME', [item('X1', 1, ['U1'])]),
+    ('Farnell', [item('1737246', 10, ['R1', 'R2']),
+                 item('9406352', 2, ['C2'])]),
+    ('Mouser', [item('81-GRM', 3, ['C1'])])])
+
+
+class TestCLI(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectFile = os.path.join(self.directory.name, "test.pro")
+        self.output = os.path.join(self.directory.name, "order")
+        open(self.projectFile, "wt").close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def format(self, name):
+        output = io.StringIO()
+        cli.FORMATS[name](ORDER, output)
+        return output.getvalue()
+
+    def testText(self):
+        # fast-paste format of the supplier plugin, if there is one
+        self.assertEqual(self.format('text'), '''[ACME]
+X1, 1
+
+[Farnell]
+1737246, 10
+9406352, 2
+
+[Mouser]
+81-GRM|3
+
+''')
+
+    def testCSV(self):
+        rows = list(csv.reader(io.StringIO(self.format('csv'))))
+        self.assertEqual(rows[0], [headernames.SUPPLIER, headernames.SUPPNO,
+                                   headernames.TOTAL,
+                                   headernames.DESIGNATORS,
+                                   headernames.DONOTORDER])
+        self.assertEqual(rows[1:3],
+                         [['ACME', 'X1', '1', 'U1', 'False'],
+                          ['Farnell', '1737246', '10', 'R1, R2', 'False']])
+        self.assertEqual(len(rows), 5)
+
+    def testJSON(self):
+        self.assertEqual(json.loads(self.format('json'),
+                                    object_pairs_hook=OrderedDict), ORDER)
+
+    def testProject(self):
+        with open(os.path.join(self.directory.name, "test.sch"), "wt") as f:
+            f.write(HEADER +
+                    component(1, 'R1', '10k', 'Farnell', '1737246') +
+                    component(2, 'R2', '10k', 'Farnell', '1737246') +
+                    component(3, 'C1', '100n', 'Mouser', '81-GRM') +
+                    component(4, 'C2', '1u', 'Mouser', '81-GRM1u') +
+                    FOOTER)
+        bomDataJSONAccess(self.projectFile).save({
+            'Farnell': {'1737246': {headernames.MULTIPLYFACTOR: "2",
+                                    headernames.ADDFACTOR: "1",
+                                    headernames.POLICY: 10,
+                                    headernames.TOTAL: -1,
+                                    headernames.DONOTORDER: 0}},
+            'Mouser': {'81-GRM1u': {headernames.MULTIPLYFACTOR: "1",
+                                    headernames.ADDFACTOR: "0",
+                                    headernames.POLICY: 1,
+                                    headernames.TOTAL: -1,
+                                    headernames.DONOTORDER: 1}}})
+        cli.main([self.projectFile + ":3", '-f', 'json', '-o',
+                  self.output])
+        with open(self.output) as f:
+            order = json.load(f)
+        # two resistors times 2 times 3 plus 1 rounded up to multiple
+        # of 10, component not to be ordered is skipped
+        self.assertEqual(
+            dict((supplier, [(item[headernames.SUPPNO],
+                              item[headernames.TOTAL],
+                              item[headernames.DESIGNATORS])
+                             for item in items])
+                 for supplier, items in order.items()),
+            {'Farnell': [('1737246', 20, ['R1', 'R2'])],
+             'Mouser': [('81-GRM', 3, ['C1'])]})
+
+
+if __name__ == '__main__':
+    unittest.main()
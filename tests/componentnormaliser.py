@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for normalisation of the components keys
+"""
+import unittest
+from BOMizator.componentnormaliser import componentNormaliser
+
+
+class TestComponentNormaliser(unittest.TestCase):
+
+    def setUp(self):
+        self.normaliser = componentNormaliser()
+
+    def assertSameValue(self, values):
+        normalised = set(map(self.normaliser.normaliseValue, values))
+        self.assertEqual(len(normalised), 1, normalised)
+
+    def testEngineeringValues(self):
+        self.assertSameValue(["100n", "100nF", "0.1u", "0.1uF", "100 nF",
+                              "100nF 10%", "100nF/10%", "0.1µF", "0,1u"])
+        self.assertSameValue(["4k7", "4K7", "4.7k", "4700", "4k7 1%",
+                              "4.7 kΩ", "4k7Ω"])
+        self.assertSameValue(["2R2", "2.2R", "2.2", "2.2 ohm"])
+        self.assertNotEqual(self.normaliser.normaliseValue("1M"),
+                            self.normaliser.normaliseValue("1m"))
+        self.assertNotEqual(self.normaliser.normaliseValue("4k7"),
+                            self.normaliser.normaliseValue("47k"))
+
+    def testOtherValues(self):
+        self.assertSameValue(["MCP23016", "mcp23016", "MCP 23016"])
+        # not only tolerance, hence not engineering value
+        self.assertEqual(self.normaliser.normaliseValue("100nF 50V"),
+                         "100nf50v")
+
+    def testFootprint(self):
+        self.assertEqual(
+            self.normaliser.normaliseFootprint(
+                "Capacitor_SMD:C_0603_1608Metric_HandSolder"),
+            self.normaliser.normaliseFootprint("C_0603"))
+
+    def testKey(self):
+        self.assertEqual(
+            self.normaliser("Device:C", "0.1uF", "Capacitor_SMD:C_0603"),
+            self.normaliser("device:C", "100n", "C_0603_1608Metric"))
+
+
+if __name__ == '__main__':
+    unittest.main()
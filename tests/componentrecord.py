@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for compact component record
+"""
+import pickle
+import marshal
+import unittest
+from BOMizator.headernames import headernames
+from BOMizator.componentrecord import componentRecord
+
+
+class TestComponentRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.record = componentRecord()
+        self.record[headernames.DESIGNATOR] = set(['R1'])
+        self.record[headernames.LIBREF] = 'Device:R'
+        self.record[headernames.VALUE] = '10k'
+
+    def testBehavesAsDefaultDict(self):
+        self.assertNotIn(headernames.SUPPNO, self.record)
+        self.assertEqual(self.record[headernames.SUPPNO], '')
+        # as with defaultdict, reading sets the attribute
+        self.assertIn(headernames.SUPPNO, self.record)
+        self.assertEqual(self.record.keys(), [headernames.DESIGNATOR,
+                                              headernames.LIBREF,
+                                              headernames.VALUE,
+                                              headernames.SUPPNO])
+
+    def testUnknownAttribute(self):
+        with self.assertRaises(KeyError):
+            self.record['Unknown'] = 1
+
+    def testCopyIsIndependent(self):
+        other = self.record.copy()
+        other[headernames.VALUE] = '1k'
+        other[headernames.SUPPLIER] = 'FARNELL'
+        self.assertEqual(self.record[headernames.VALUE], '10k')
+        self.assertNotIn(headernames.SUPPLIER, self.record)
+
+    def testPop(self):
+        self.assertEqual(self.record.pop(headernames.VALUE), '10k')
+        self.assertNotIn(headernames.VALUE, self.record)
+        self.assertEqual(self.record.pop(headernames.VALUE, None), None)
+        with self.assertRaises(KeyError):
+            self.record.pop(headernames.VALUE)
+
+    def testSerialisation(self):
+        data = marshal.loads(marshal.dumps(self.record.toTuple()))
+        self.assertEqual(componentRecord.fromTuple(data), self.record)
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)),
+                         self.record)
+
+    def testValuesAreInterned(self):
+        other = componentRecord()
+        other[headernames.LIBREF] = ''.join(['Device', ':R'])
+        self.assertIs(other[headernames.LIBREF], self.record[headernames.LIBREF])
+
+
+if __name__ == '__main__':
+    unittest.main()
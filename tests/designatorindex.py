@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for the designator index of the project, which resolves
+each single designator into its component, and for saving of the
+sheets containing designators, which do not resolve
+"""
+import os
+import tempfile
+import unittest
+from PyQt5 import QtCore
+from BOMizator.headernames import headernames
+from BOMizator.projectparser import projectParser
+from BOMizator.suppexceptions import DesignatorNotFound
+
+HEADER = '''EESchema Schematic File Version 4
+$Descr A4 11693 8268
+$EndDescr
+'''
+
+# component of the sheet used twice in the hierarchy
+SHARED = '''$Comp
+L Device:R R1
+U 1 1 5A000001
+AR Path="/5A100001/5A000001" Ref="R1"  Part="1"
+AR Path="/5A100002/5A000001" Ref="R12"  Part="1"
+P 1000 2000
+F 0 "R1" H 1070 1046 50  0000 L CNN
+F 1 "10k" H 1070 955 50  0000 L CNN
+F 2 "R_0603" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+\t1    1000 2000
+\t1    0    0    -1  
+$EndComp
+'''
+
+COMPONENT = '''$Comp
+L Device:C %s
+U 1 1 5A000002
+P 1500 2500
+F 0 "%s" H 1070 1046 50  0000 L CNN
+F 1 "100n" H 1070 955 50  0000 L CNN
+F 2 "C_0603" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+\t1    1500 2500
+\t1    0    0    -1  
+$EndComp
+'''
+
+FOOTER = '''$EndSCHEMATC
+'''
+
+
+class TestDesignatorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.schfile = os.path.join(self.directory.name, "test.sch")
+        self.projectFile = os.path.join(self.directory.name, "test.pro")
+        open(self.projectFile, "wt").close()
+        self.write(SHARED, COMPONENT % ('C1', 'C1'))
+        # saving writes the project settings, hence they are accessed
+        # through QSettings
+        self.project = projectParser(
+            self.projectFile,
+            QtCore.QSettings(os.path.join(self.directory.name, "test.bmz"),
+                             QtCore.QSettings.IniFormat))
+        self.project.parseComponents()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, *items):
+        with open(self.schfile, "wt") as f:
+            f.write(HEADER + ''.join(items) + FOOTER)
+
+    def testLookup(self):
+        project = self.project
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1', 'R1, R12'])
+        # any single designator resolves in the component
+        shared = project.getComponent('R1, R12')
+        self.assertIs(project.getComponent('R1'), shared)
+        self.assertIs(project.getComponent('R12'), shared)
+        self.assertEqual(project.getNormalisedKey('R12'), 'R1, R12')
+        self.assertTrue(project.designatorDefined(['R3', 'R12']))
+        self.assertFalse(project.designatorDefined(['R3', 'C2']))
+        with self.assertRaises(KeyError):
+            project.getComponent('R3')
+        # removed component is not resolved any more
+        project.removeComponent('R12')
+        self.assertFalse(project.designatorDefined(['R1', 'R12']))
+        with self.assertRaises(KeyError):
+            project.getComponent('R1')
+
+    def testSaveUnknownDesignator(self):
+        self.project.updateComponents(['C1'], {headernames.SUPPLIER: 'RS'})
+        # component added to the schematic after the project was
+        # loaded
+        self.write(SHARED, COMPONENT % ('C1', 'C1'),
+                   COMPONENT % ('C2', 'C2'))
+        with open(self.schfile, "rb") as f:
+            content = f.read()
+        with self.assertRaises(DesignatorNotFound):
+            self.project.save()
+        # the schematic file is kept
+        with open(self.schfile, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def testSpliceUnknownDesignator(self):
+        self.project.updateComponents(['C1'], {headernames.SUPPLIER: 'RS'})
+        # the layout of the sheet is valid, but the component is not
+        # known any more
+        self.project.removeComponent('R1')
+        with self.assertRaises(DesignatorNotFound):
+            self.project.spliceLegacySheet(self.schfile)
+
+
+if __name__ == '__main__':
+    unittest.main()
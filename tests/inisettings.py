@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for reader of project configuration files written by
+QSettings
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from BOMizator.inisettings import iniSettings
+
+# file as written by QSettings (IniFormat)
+CONTENT = r'''[General]
+disabledDesignators=R1, "C101, C201"
+globalMultiplier=5
+single=@Variant(\0\0\0\t\0\0\0\x1\0\0\0\n\0\0\0\x4\0R\0\x31)
+empty=@Invalid()
+escaped="a\"b\\c;d=e,f"
+
+[%General]
+x=@@y
+
+[FARNELL]
+120000\Adder=0
+120000\Do%20not%20order=1
+120000\Rounding%20Policy=10
+'''
+
+
+class TestIniSettings(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        fname = os.path.join(self.directory, "project.bmz")
+        with open(fname, "wt") as f:
+            f.write(CONTENT)
+        self.settings = iniSettings(fname)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testLists(self):
+        self.assertEqual(self.settings.value('disabledDesignators', [], str),
+                         ['R1', 'C101, C201'])
+        self.assertEqual(self.settings.value('single', [], str), ['R1'])
+        self.assertEqual(self.settings.value('empty', [], str), [])
+
+    def testValues(self):
+        self.assertEqual(self.settings.value('globalMultiplier', 1, int), 5)
+        self.assertEqual(self.settings.value('missing', 1, int), 1)
+        self.assertEqual(self.settings.value('escaped'), 'a"b\\c;d=e,f')
+
+    def testGroups(self):
+        self.assertEqual(self.settings.childGroups(), ['FARNELL', 'General'])
+        self.settings.beginGroup('General')
+        self.assertEqual(self.settings.value('x'), '@y')
+        self.settings.endGroup()
+        self.settings.beginGroup('FARNELL')
+        self.assertEqual(self.settings.childGroups(), ['120000'])
+        self.settings.beginGroup('120000')
+        self.assertEqual(self.settings.childKeys(),
+                         ['Adder', 'Do not order', 'Rounding Policy'])
+        self.assertEqual(self.settings.value('Do not order', -1, int), 1)
+        self.settings.endGroup()
+        self.settings.endGroup()
+
+    def testMissingFile(self):
+        settings = iniSettings(os.path.join(self.directory, "none.bmz"))
+        self.assertEqual(settings.childGroups(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for index of the components by their ordering codes and
+for the components collected by the ordering codes
+"""
+import os
+import tempfile
+import unittest
+from BOMizator.headernames import headernames
+from BOMizator.componentrecord import componentRecord
+from BOMizator.inisettings import iniSettings
+from BOMizator.projectparser import projectParser
+
+
+def component(designators, supplier=None, ordercode=None):
+    record = componentRecord()
+    record[headernames.DESIGNATOR] = set(designators)
+    if supplier is not None:
+        record[headernames.SUPPLIER] = supplier
+        record[headernames.SUPPNO] = ordercode
+    return record
+
+
+class ProjectTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        project = os.path.join(self.directory.name, "test.pro")
+        self.project = projectParser(
+            project,
+            iniSettings(os.path.join(self.directory.name, "test.bmz")))
+        self.project.addComponent(component(['R1'], 'FARNELL', '123'))
+        self.project.addComponent(component(['R2', 'R3'], 'FARNELL', '123'))
+        self.project.addComponent(component(['R4'], 'RS', '123'))
+        self.project.addComponent(component(['C1']))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+class TestOrderCodeIndex(ProjectTestCase):
+
+    def testLookup(self):
+        self.assertEqual(
+            self.project.getOrderCodeDesignators('FARNELL', '123'),
+            set(['R1', 'R2, R3']))
+        cm = self.project.getComponentsByOrderCode('123', 'RS')
+        self.assertEqual([c[headernames.DESIGNATOR] for c in cm],
+                         [set(['R4'])])
+        # without supplier the code matches all the suppliers
+        self.assertEqual(len(self.project.getComponentsByOrderCode('123')),
+                         3)
+        self.assertEqual(self.project.getOrderCodeDesignators('', ''),
+                         set(['C1']))
+        # index does not create empty fields of the components
+        self.assertNotIn(headernames.SUPPLIER,
+                         self.project.getComponent('C1'))
+
+    def testUpdateMovesComponent(self):
+        self.project.updateComponents(['R3', 'C1'],
+                                      {headernames.SUPPLIER: 'RS',
+                                       headernames.SUPPNO: '123'})
+        self.assertEqual(
+            self.project.getOrderCodeDesignators('FARNELL', '123'),
+            set(['R1']))
+        self.assertEqual(self.project.getOrderCodeDesignators('RS', '123'),
+                         set(['R4', 'R2, R3', 'C1']))
+        self.assertNotIn(('', ''), self.project.orderCodeIndex)
+
+    def testRemove(self):
+        self.project.removeComponent('R1')
+        self.project.removeComponent('R2')
+        self.assertNotIn(('FARNELL', '123'), self.project.orderCodeIndex)
+
+
+class TestCollectedComponents(ProjectTestCase):
+
+    def collect(self, includeDisabledComponents=False):
+        collected = self.project.getCollectedComponents(
+            includeDisabledComponents)
+        return dict((supplier, dict((ordercode,
+                                     cdata[headernames.DESIGNATORS])
+                                    for ordercode, cdata in codes.items()))
+                    for supplier, codes in collected.items())
+
+    def testCollected(self):
+        self.assertEqual(self.collect(),
+                         {'FARNELL': {'123': set(['R1', 'R2', 'R3'])},
+                          'RS': {'123': set(['R4'])}})
+
+    def testFollowsModifications(self):
+        self.collect()
+        self.project.updateComponents(['R1'],
+                                      {headernames.SUPPNO: '456'})
+        self.project.updateComponents(['C1'],
+                                      {headernames.SUPPLIER: 'RS',
+                                       headernames.SUPPNO: '123'})
+        self.project.enableDesignator('R4', False)
+        self.assertEqual(self.collect(),
+                         {'FARNELL': {'123': set(['R2', 'R3']),
+                                      '456': set(['R1'])},
+                          'RS': {'123': set(['C1'])}})
+        self.assertEqual(self.collect(True)['RS'],
+                         {'123': set(['R4', 'C1'])})
+        self.project.removeComponent('R1')
+        self.project.enableDesignator('R4', True)
+        self.assertEqual(self.collect(),
+                         {'FARNELL': {'123': set(['R2', 'R3'])},
+                          'RS': {'123': set(['R4', 'C1'])}})
+
+    def testBOMDataAndRevision(self):
+        revision = self.project.getRevision()
+        self.project.getCollectedComponents()
+        self.project.updateBOMData('RS', '123',
+                                   {headernames.MULTIPLYFACTOR: '3'})
+        self.assertNotEqual(self.project.getRevision(), revision)
+        cdata = self.project.getCollectedComponents()['RS']['123']
+        self.assertEqual(cdata[headernames.MULTIPLYFACTOR], '3')
+        # returned data are copies
+        cdata[headernames.DESIGNATORS].add('X1')
+        cdata = self.project.getCollectedComponents()['RS']['123']
+        self.assertEqual(cdata[headernames.DESIGNATORS], set(['R4']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for calculation of the order list of the project
+"""
+import unittest
+from BOMizator.headernames import headernames
+from BOMizator.orderlist import orderList
+
+
+def cdata(designators, multiplier="1", adder="0", policy=1, total=-1,
+          donotorder=0):
+    """ returns component data collected by supplier and ordering
+    code together with their BOM data
+    """
+    return {headernames.DESIGNATORS: set(designators),
+            headernames.MULTIPLYFACTOR: multiplier,
+            headernames.ADDFACTOR: adder,
+            headernames.POLICY: policy,
+            headernames.TOTAL: total,
+            headernames.DONOTORDER: donotorder,
+            headernames.MANUFACTURER: 'Vishay',
+            headernames.MFRNO: 'CRCW0603',
+            headernames.VALUE: '10k',
+            headernames.LIBREF: 'Device:R',
+            headernames.DATASHEET: ''}
+
+
+class project(object):
+    """ parsed project providing the collected components
+    """
+
+    def __init__(self, collected, globalMultiplier=1):
+        self.collected = collected
+        self.globalMultiplier = globalMultiplier
+
+    def getGlobalMultiplier(self):
+        return self.globalMultiplier
+
+    def getCollectedComponents(self, includeDisabledComponents=False):
+        return self.collected
+
+
+class TestOrderList(unittest.TestCase):
+
+    def totals(self, orders, *args):
+        return dict((supplier, [(item[headernames.SUPPNO],
+                                 item[headernames.TOTAL])
+                                for item in items])
+                    for supplier, items in orders.getOrder(*args).items())
+
+    def testTotals(self):
+        orders = orderList(project({
+            'RS': {'2': cdata(['C1', 'C2', 'C3']),
+                   '1': cdata(['C4'], multiplier="3", adder="2")},
+            'FARNELL': {'3': cdata(['R10', 'R2', 'R1'])}}))
+        order = orders.getOrder()
+        # sorted by supplier and ordering code
+        self.assertEqual(list(order.keys()), ['FARNELL', 'RS'])
+        self.assertEqual(self.totals(orders), {'FARNELL': [('3', 3)],
+                                               'RS': [('1', 5), ('2', 3)]})
+        self.assertEqual(order['FARNELL'][0][headernames.DESIGNATORS],
+                         ['R1', 'R2', 'R10'])
+
+    def testGlobalMultiplier(self):
+        collected = {'RS': {'1': cdata(['C1', 'C2'], multiplier="2",
+                                       adder="1")}}
+        self.assertEqual(self.totals(orderList(project(collected, 3))),
+                         {'RS': [('1', 13)]})
+        # multiplier of the project overriden
+        self.assertEqual(self.totals(orderList(project(collected, 3), 1)),
+                         {'RS': [('1', 5)]})
+
+    def testRounding(self):
+        orders = orderList(project({'RS': {
+            '1': cdata(['C1', 'C2', 'C3'], policy=5),
+            '2': cdata(['C4'], multiplier="10", policy=10),
+            '3': cdata(['C5'], multiplier="101", policy=100)}}))
+        # always rounded up, exact multiples are kept
+        self.assertEqual(self.totals(orders),
+                         {'RS': [('1', 5), ('2', 10), ('3', 200)]})
+
+    def testManualTotal(self):
+        orders = orderList(project({'RS': {
+            '1': cdata(['C1', 'C2'], multiplier="", adder="", total=42,
+                       policy=100)}}))
+        self.assertEqual(self.totals(orders), {'RS': [('1', 42)]})
+        self.assertEqual(orders.getQuantities(),
+                         [('RS', orders.getOrder()['RS'][0], None, 100)])
+
+    def testDoNotOrder(self):
+        orders = orderList(project({
+            'RS': {'1': cdata(['C1'], donotorder=1),
+                   '2': cdata(['C2'])},
+            'MOUSER': {'3': cdata(['U1'], donotorder=1)}}))
+        # supplier of skipped items only does not appear
+        self.assertEqual(self.totals(orders), {'RS': [('2', 1)]})
+        order = orders.getOrder(False, True)
+        self.assertEqual(list(order.keys()), ['MOUSER', 'RS'])
+        self.assertEqual([item[headernames.DONOTORDER]
+                          for item in order['RS']], [True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for the persistent cache of the parsed schematic files
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from BOMizator import projectparser
+from BOMizator.headernames import headernames
+from BOMizator.inisettings import iniSettings
+from BOMizator.parsecache import parseCache
+from BOMizator.projectparser import projectParser
+
+SHEET = '''EESchema Schematic File Version 4
+$Descr A4 11693 8268
+$EndDescr
+$Comp
+L Device:R R1
+U 1 1 5A000001
+P 1000 2000
+F 0 "R1" H 1070 1046 50  0000 L CNN
+F 1 "%s" H 1070 955 50  0000 L CNN
+F 2 "R_0603" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+\t1    1000 2000
+\t1    0    0    -1  
+$EndComp
+$EndSCHEMATC
+'''
+
+
+def sheet(number):
+    """ returns the data of the sheet as stored in the cache
+    """
+    return {'subsheets': ['sub%d.sch' % number], 'sheetids': [],
+            'symbolinstances': {}, 'references': {}, 'components': [],
+            'layout': None}
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectFile = os.path.join(self.directory.name, "test.pro")
+        self.cacheFile = os.path.join(self.directory.name, "test.bpc")
+        open(self.projectFile, "wt").close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, value):
+        with open(os.path.join(self.directory.name, "test.sch"), "wt") as f:
+            f.write(SHEET % (value, ))
+
+    def load(self):
+        """ returns the value of R1 of newly opened project and the
+        number of the sheets parsed
+        """
+        project = projectParser(
+            self.projectFile,
+            iniSettings(os.path.join(self.directory.name, "test.bmz")))
+        with mock.patch.object(projectparser, 'parseSheet',
+                               wraps=projectparser.parseSheet) as parse:
+            project.parseComponents()
+        return project.getComponent('R1')[headernames.VALUE],\
+            parse.call_count
+
+    def testUnchangedSheet(self):
+        self.write('10k')
+        self.assertEqual(self.load(), ('10k', 1))
+        self.assertEqual(self.load(), ('10k', 0))
+
+    def testContentChanged(self):
+        self.write('10k')
+        self.load()
+        self.write('4k7')
+        self.assertEqual(self.load(), ('4k7', 1))
+        # the previous content is still cached
+        self.write('10k')
+        self.assertEqual(self.load(), ('10k', 0))
+
+    def testParserVersionChanged(self):
+        self.write('10k')
+        self.load()
+        with mock.patch('BOMizator.parsecache.PARSER_VERSION', -1):
+            self.assertEqual(self.load(), ('10k', 1))
+            self.assertEqual(self.load(), ('10k', 0))
+        # the cache was overwritten by the other version
+        self.assertEqual(self.load(), ('10k', 1))
+
+    def testTruncatedCache(self):
+        self.write('10k')
+        self.load()
+        size = os.path.getsize(self.cacheFile)
+        with open(self.cacheFile, "r+b") as f:
+            f.truncate(size // 2)
+        self.assertEqual(self.load(), ('10k', 1))
+        # rewritten when parsed again
+        self.assertEqual(os.path.getsize(self.cacheFile), size)
+        self.assertEqual(self.load(), ('10k', 0))
+
+    def testCorruptedCache(self):
+        self.write('10k')
+        with open(self.cacheFile, "wb") as f:
+            f.write(b'\x00BOMizator')
+        self.assertEqual(self.load(), ('10k', 1))
+        self.assertEqual(self.load(), ('10k', 0))
+
+    def testEviction(self):
+        cache = parseCache(self.cacheFile)
+        for number in range(5):
+            cache.store(str(number), sheet(number))
+        # recently used
+        cache.get('0')
+        with mock.patch('BOMizator.parsecache.PARSE_CACHE_SIZE', 2):
+            cache.save({'1'})
+        self.assertEqual(list(parseCache(self.cacheFile).getEntries()),
+                         ['1', '4', '0'])
+        self.assertEqual(parseCache(self.cacheFile).get('1'), sheet(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
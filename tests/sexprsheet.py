@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for parsing and saving of KiCad 6+ (S-expression) schematic
+files
+"""
+import os
+import tempfile
+import unittest
+from BOMizator.headernames import headernames
+from BOMizator.inisettings import iniSettings
+from BOMizator.projectparser import projectParser
+from BOMizator.sexprtokenizer import sexprTokenizer
+
+ROOT = '''(kicad_sch (version 20230121) (generator eeschema)
+  (lib_symbols
+    (symbol "Device:R" (property "Reference" "R" (at 0 0 0))
+      (symbol "R_0_1" (rectangle (start -1 -2) (end 1 2))))
+  )
+  (symbol (lib_id "Device:R") (at 10 10 0) (unit 1)
+    (property "Reference" "R1" (at 12 9 0)
+      (effects (font (size 1.27 1.27)))
+    )
+    (property "Value" "10k" (at 12 11 0)
+      (effects (font (size 1.27 1.27)))
+    )
+    (property "Footprint" "R_0603" (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+    (property "Datasheet" "~" (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+    (property "Supplier" "FARNELL" (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+    (pin "1" (uuid 0f6d4c3e-0000-0000-0000-000000000001))
+  )
+  (symbol (lib_id "power:GND") (at 20 20 0) (unit 1)
+    (property "Reference" "#PWR01" (at 20 20 0))
+    (property "Value" "GND" (at 20 20 0))
+  )
+  (sheet (at 50 50) (size 20 20)
+    (property "Sheetname" "Sub (1)" (at 50 49 0))
+    (property "Sheetfile" "sub.kicad_sch" (at 50 71 0))
+  )
+)
+'''
+
+SUB = '''(kicad_sch (version 20230121) (generator eeschema)
+  (symbol (lib_id "Device:C") (at 10 10 0) (unit 1)
+    (property "Reference" "C1" (at 12 9 0)
+      (effects (font (size 1.27 1.27)))
+    )
+    (property "Value" "100n \\"X7R\\"" (at 12 11 0)
+      (effects (font (size 1.27 1.27)))
+    )
+    (property "Footprint" "C_0603" (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+    (property "Datasheet" "~" (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+  )
+)
+'''
+
+# KiCad 6 top-level sheet using the sub-sheet twice, the designators of
+# the symbols of the sub-sheet are given by the symbol_instances
+ROOT6 = '''(kicad_sch (version 20211123) (generator eeschema)
+  (uuid 00000000-0000-0000-0000-0000000000a0)
+  (symbol (lib_id "Device:R") (at 10 10 0) (unit 1)
+    (uuid 00000000-0000-0000-0000-0000000000a1)
+    (property "Reference" "R1" (id 0) (at 12 9 0))
+    (property "Value" "10k" (id 1) (at 12 11 0))
+  )
+  (sheet (at 50 50) (size 20 20)
+    (uuid 00000000-0000-0000-0000-0000000000b1)
+    (property "Sheet name" "A" (id 0) (at 50 49 0))
+    (property "Sheet file" "sub.kicad_sch" (id 1) (at 50 71 0))
+  )
+  (sheet (at 80 50) (size 20 20)
+    (uuid 00000000-0000-0000-0000-0000000000b2)
+    (property "Sheet name" "B" (id 0) (at 80 49 0))
+    (property "Sheet file" "sub.kicad_sch" (id 1) (at 80 71 0))
+  )
+  (symbol_instances
+    (path "/00000000-0000-0000-0000-0000000000a1"
+      (reference "R1") (unit 1) (value "10k") (footprint ""))
+    (path "/00000000-0000-0000-0000-0000000000b1/\
+00000000-0000-0000-0000-0000000000c1"
+      (reference "C1") (unit 1) (value "100n") (footprint "C_0603"))
+    (path "/00000000-0000-0000-0000-0000000000b2/\
+00000000-0000-0000-0000-0000000000c1"
+      (reference "C2") (unit 1) (value "100n") (footprint "C_0603"))
+  )
+)
+'''
+
+SUB6 = '''(kicad_sch (version 20211123) (generator eeschema)
+  (symbol (lib_id "Device:C") (at 10 10 0) (unit 1)
+    (uuid 00000000-0000-0000-0000-0000000000c1)
+    (property "Reference" "C1" (id 0) (at 12 9 0))
+    (property "Value" "100n" (id 1) (at 12 11 0))
+    (property "Footprint" "C_0603" (id 2) (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+    (property "Datasheet" "~" (id 3) (at 10 10 0)
+      (effects (font (size 1.27 1.27)) hide)
+    )
+  )
+)
+'''
+
+# KiCad 7 sub-sheet used twice in this project and once in another one
+SUB7 = '''(kicad_sch (version 20230121) (generator eeschema)
+  (symbol (lib_id "Device:C") (at 10 10 0) (unit 1)
+    (uuid 00000000-0000-0000-0000-0000000000c1)
+    (property "Reference" "C1" (at 12 9 0))
+    (property "Value" "100n" (at 12 11 0))
+    (property "Footprint" "C_0603" (at 10 10 0))
+    (instances
+      (project "other"
+        (path "/00000000-0000-0000-0000-0000000000f0/\
+00000000-0000-0000-0000-0000000000f1"
+          (reference "C9") (unit 1)))
+      (project "test"
+        (path "/00000000-0000-0000-0000-0000000000a0/\
+00000000-0000-0000-0000-0000000000b1"
+          (reference "C1") (unit 1))
+        (path "/00000000-0000-0000-0000-0000000000a0/\
+00000000-0000-0000-0000-0000000000b2"
+          (reference "C2") (unit 1)))
+    )
+  )
+)
+'''
+
+
+class TestSexprTokenizer(unittest.TestCase):
+
+    def testNodes(self):
+        tokenizer = sexprTokenizer()
+        nodes = list(tokenizer.iterNodes(SUB, ['symbol']))
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual(nodes[0].child('lib_id')[1], 'Device:C')
+        value = nodes[0].children('property')[1]
+        self.assertEqual(value[2], '100n "X7R"')
+        # spans point to the text of the tokens
+        start, end = value.spans[2]
+        self.assertEqual(SUB[start:end], tokenizer.quote(value[2]))
+        self.assertEqual(SUB[value.start:value.end].split()[0],
+                         '(property')
+
+
+class TestSexprProject(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        for name, content in [("test.kicad_sch", ROOT),
+                              ("sub.kicad_sch", SUB)]:
+            with open(os.path.join(self.directory.name, name), "wt") as f:
+                f.write(content)
+        self.projectFile = os.path.join(self.directory.name, "test.kicad_pro")
+        open(self.projectFile, "wt").close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def load(self):
+        project = projectParser(
+            self.projectFile,
+            iniSettings(os.path.join(self.directory.name, "test.bmz")))
+        project.parseComponents()
+        return project
+
+    def testParse(self):
+        project = self.load()
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1', 'R1'])
+        r1 = project.getComponent('R1')
+        self.assertEqual(r1[headernames.LIBREF], 'Device:R')
+        self.assertEqual(r1[headernames.VALUE], '10k')
+        self.assertEqual(r1[headernames.FOOTPRINT], 'R_0603')
+        self.assertEqual(r1[headernames.DATASHEET], '~')
+        self.assertEqual(r1[headernames.SUPPLIER], 'FARNELL')
+        self.assertEqual(project.getComponent('C1')[headernames.VALUE],
+                         '100n "X7R"')
+
+    def testSave(self):
+        project = self.load()
+        project.updateComponents(['R1'], {headernames.SUPPLIER: 'RS'})
+        project.updateComponents(['C1'], {headernames.SUPPLIER: 'RS',
+                                          headernames.SUPPNO: '12-34'})
+        # project settings are read only, hence the sheets are written
+        # directly and then replaced by their updated versions
+        for name in ["test.kicad_sch", "sub.kicad_sch"]:
+            schfile = os.path.join(self.directory.name, name)
+            project.writeSexprSheet(schfile)
+            os.replace(schfile + "tmp", schfile)
+        with open(os.path.join(self.directory.name, "test.kicad_sch")) as f:
+            root = f.read()
+        # only the value of the property is replaced
+        self.assertEqual(root, ROOT.replace('"FARNELL"', '"RS"'))
+        project = self.load()
+        self.assertEqual(project.getComponent('R1')[headernames.SUPPLIER],
+                         'RS')
+        c1 = project.getComponent('C1')
+        self.assertEqual(c1[headernames.SUPPLIER], 'RS')
+        self.assertEqual(c1[headernames.SUPPNO], '12-34')
+        self.assertEqual(c1[headernames.VALUE], '100n "X7R"')
+
+
+class TestSexprSharedSheet(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectFile = os.path.join(self.directory.name, "test.kicad_pro")
+        open(self.projectFile, "wt").close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory.name, name), "wt") as f:
+            f.write(content)
+
+    def load(self):
+        project = projectParser(
+            self.projectFile,
+            iniSettings(os.path.join(self.directory.name, "test.bmz")))
+        project.parseComponents()
+        return project
+
+    def testSymbolInstances(self):
+        self.write("test.kicad_sch", ROOT6)
+        self.write("sub.kicad_sch", SUB6)
+        project = self.load()
+        # each instance of the sub-sheet has its own designator
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1, C2', 'R1'])
+        self.assertEqual(project.getComponent('C1, C2')[headernames.VALUE],
+                         '100n')
+        # designators are resolved as well from the parse cache
+        project = self.load()
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1, C2', 'R1'])
+        # re-annotation changes only the top-level sheet, the
+        # sub-sheet has to be resolved again
+        self.write("test.kicad_sch", ROOT6.replace('"C2"', '"C7"'))
+        project.parseComponents()
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1, C7', 'R1'])
+        project = self.load()
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1, C7', 'R1'])
+
+    def testSaveSymbolInstances(self):
+        self.write("test.kicad_sch", ROOT6)
+        self.write("sub.kicad_sch", SUB6)
+        project = self.load()
+        project.updateComponents(['C1, C2'], {headernames.SUPPLIER: 'RS'})
+        schfile = os.path.join(self.directory.name, "sub.kicad_sch")
+        project.writeSexprSheet(schfile)
+        os.replace(schfile + "tmp", schfile)
+        project = self.load()
+        self.assertEqual(
+            project.getComponent('C1, C2')[headernames.SUPPLIER], 'RS')
+
+    def testProjectInstances(self):
+        self.write("test.kicad_sch", ROOT6.replace(
+            ROOT6[ROOT6.index('  (symbol_instances'):], ')\n'))
+        self.write("sub.kicad_sch", SUB7)
+        project = self.load()
+        # instances of the other project are ignored
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1, C2', 'R1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for handling of the sheet hierarchy of legacy projects:
+reparsing of the changed sheets only, cyclic references and saving
+of the sheets with modified components only
+"""
+import os
+import tempfile
+import unittest
+from PyQt5 import QtCore
+from BOMizator.headernames import headernames
+from BOMizator.inisettings import iniSettings
+from BOMizator.projectparser import projectParser
+from BOMizator.qbommodel import QBOMModel
+
+HEADER = '''EESchema Schematic File Version 4
+$Descr A4 11693 8268
+$EndDescr
+'''
+
+FOOTER = '''$EndSCHEMATC
+'''
+
+COMPONENT = '''$Comp
+L Device:%s %s
+U 1 1 5A0000%02d
+P 1000 2000
+F 0 "%s" H 1070 1046 50  0000 L CNN
+F 1 "%s" H 1070 955 50  0000 L CNN
+F 2 "%s" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+\t1    1000 2000
+\t1    0    0    -1  
+$EndComp
+'''
+
+SHEET = '''$Sheet
+S 5000 1000 1000 500 
+U 5A1000%02d
+F0 "%s" 50
+F1 "%s" 50
+$EndSheet
+'''
+
+
+def component(number, designator, value, footprint):
+    """ returns the text of the component
+    """
+    return COMPONENT % (designator[0], designator, number, designator,
+                        value, footprint)
+
+
+def sheet(number, fname):
+    """ returns the text of the sheet referencing fname
+    """
+    return SHEET % (number, os.path.splitext(fname)[0], fname)
+
+
+class TestSheetHierarchy(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.projectFile = os.path.join(self.directory.name, "test.pro")
+        open(self.projectFile, "wt").close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, fname, *items):
+        """ writes the schematic file fname composed of the items
+        """
+        with open(os.path.join(self.directory.name, fname), "wt") as f:
+            f.write(HEADER + ''.join(items) + FOOTER)
+
+    def load(self, workers=1):
+        project = projectParser(
+            self.projectFile,
+            iniSettings(os.path.join(self.directory.name, "test.bmz")),
+            workers)
+        project.parseComponents()
+        return project
+
+    def getSheet(self, project, fname):
+        return project.sheets[os.path.realpath(
+            os.path.join(self.directory.name, fname))]
+
+    def testReparseChangedSheet(self):
+        self.write("test.sch", component(1, 'R1', '10k', 'R_0603'),
+                   sheet(1, "sub.sch"))
+        self.write("sub.sch", component(2, 'C1', '100n', 'C_0603'))
+        project = self.load()
+        root = self.getSheet(project, "test.sch")['components']
+        self.write("sub.sch", component(2, 'C1', '4u7', 'C_0805'))
+        project.reload()
+        # only the edited sheet is parsed again
+        self.assertIs(self.getSheet(project, "test.sch")['components'],
+                      root)
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1', 'R1'])
+        c1 = project.getComponent('C1')
+        self.assertEqual(c1[headernames.VALUE], '4u7')
+        self.assertEqual(c1[headernames.FOOTPRINT], 'C_0805')
+        # the new project takes the unchanged sheets from the parse
+        # cache
+        project = self.load()
+        self.assertEqual(project.getComponent('C1')[headernames.VALUE],
+                         '4u7')
+        self.assertEqual(project.getComponent('R1')[headernames.VALUE],
+                         '10k')
+
+    def testParallelParsing(self):
+        self.write("test.sch", component(1, 'R1', '10k', 'R_0603'),
+                   sheet(1, "sub1.sch"), sheet(2, "sub2.sch"),
+                   sheet(3, "sub3.sch"))
+        for number in range(1, 4):
+            self.write("sub%d.sch" % number,
+                       component(2, 'C%d' % number, '100n', 'C_0603'),
+                       component(3, 'R%d' % (number + 1), '1k', 'R_0402'))
+        serial = self.load()
+        # the sheets have to be parsed again by the workers
+        os.remove(os.path.join(self.directory.name, "test.bpc"))
+        parallel = self.load(workers=2)
+        self.assertEqual(parallel.matches, serial.matches)
+        self.assertEqual(list(parallel.getComponents().items()),
+                         list(serial.getComponents().items()))
+        self.assertEqual(len(serial.getComponents()), 7)
+
+    def testCyclicReference(self):
+        # sub-sheet references itself and the top-level sheet
+        self.write("test.sch", component(1, 'R1', '10k', 'R_0603'),
+                   sheet(1, "sub.sch"), sheet(2, "sub.sch"))
+        self.write("sub.sch", component(2, 'C1', '100n', 'C_0603'),
+                   sheet(3, "sub.sch"), sheet(4, "test.sch"))
+        with self.assertLogs('bomizator', 'ERROR') as logs:
+            project = self.load()
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual([os.path.basename(fname)
+                          for fname in project.matches],
+                         ['test.sch', 'sub.sch'])
+        self.assertEqual(sorted(project.getComponents().keys()),
+                         ['C1', 'R1'])
+        # cyclic references are not counted as instances
+        self.assertEqual(
+            sorted(project.sheetInstances.values()), [1, 2])
+
+    def testSaveModifiedSheets(self):
+        self.write("test.sch", component(1, 'R1', '10k', 'R_0603'),
+                   sheet(1, "a.sch"), sheet(2, "b.sch"))
+        self.write("a.sch", component(2, 'C1', '100n', 'C_0603'))
+        self.write("b.sch", component(3, 'C2', '100n', 'C_0603'))
+        contents = {}
+        for fname in ["test.sch", "a.sch", "b.sch"]:
+            with open(os.path.join(self.directory.name, fname), "rb") as f:
+                contents[fname] = f.read()
+        # saving writes the project settings, hence they are accessed
+        # through QSettings
+        project = projectParser(
+            self.projectFile,
+            QtCore.QSettings(os.path.join(self.directory.name, "test.bmz"),
+                             QtCore.QSettings.IniFormat))
+        project.parseComponents()
+        project.updateComponents(['C1'], {headernames.SUPPLIER: 'RS'})
+        self.assertEqual([os.path.basename(fname)
+                          for fname in project.getModifiedSheets()],
+                         ['a.sch'])
+        project.save()
+        for fname in ["test.sch", "b.sch"]:
+            with open(os.path.join(self.directory.name, fname), "rb") as f:
+                self.assertEqual(f.read(), contents[fname])
+            self.assertFalse(os.path.exists(os.path.join(
+                self.directory.name, os.path.splitext(fname)[0] + ".bak")))
+        with open(os.path.join(self.directory.name, "a.bak"), "rb") as f:
+            self.assertEqual(f.read(), contents["a.sch"])
+        project = self.load()
+        self.assertEqual(project.getComponent('C1')[headernames.SUPPLIER],
+                         'RS')
+        self.assertNotIn(headernames.SUPPLIER, project.getComponent('C2'))
+        # nothing to write
+        self.assertEqual(project.getModifiedSheets(), [])
+
+    def testSaveAfterEnable(self):
+        # the model sets all the columns of the row when the row gets
+        # disabled and enabled, designator column included
+        self.write("test.sch", component(1, 'R1', '10k', 'R_0603'),
+                   sheet(1, "a.sch"))
+        self.write("a.sch", component(2, 'C1', '100n', 'C_0603'))
+        project = projectParser(
+            self.projectFile,
+            QtCore.QSettings(os.path.join(self.directory.name, "test.bmz"),
+                             QtCore.QSettings.IniFormat))
+        project.parseComponents()
+        model = QBOMModel(project)
+        model.appendComponents(sorted(project.getComponents().keys()))
+        row = [row for row in range(model.rowCount())
+               if model.getDesignator(row).text() == 'R1'][0]
+        items = [model.item(row, col) for col in range(model.columnCount())]
+        model.enableItems(items, False)
+        model.enableItems(items, True)
+        self.assertEqual(project.getComponent('R1')[headernames.DESIGNATOR],
+                         {'R1'})
+        model.item(row, model.header.getColumn(
+            headernames.SUPPNO)).setText('1737246')
+        self.assertEqual([os.path.basename(fname)
+                          for fname in project.getModifiedSheets()],
+                         ['test.sch'])
+        project.save()
+        self.assertEqual(self.load().getComponent('R1')[headernames.SUPPNO],
+                         '1737246')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for saving of the legacy schematic files by splicing the
+changed attributes using the layout recorded when parsed
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from BOMizator.headernames import headernames
+from BOMizator.inisettings import iniSettings
+from BOMizator.projectparser import projectParser
+from BOMizator.sheetparser import sheetParser
+
+SHEET = '''EESchema Schematic File Version 4
+$Descr A4 11693 8268
+$EndDescr
+$Comp
+L Device:R R1
+U 1 1 5A000001
+P 1000 2000
+F 0 "R1" H 1070 1046 50  0000 L CNN
+F 1 "10k" H 1070 955 50  0000 L CNN
+F 2 "R_0603" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+F 4 "FARNELL" H 1000 1000 60  0001 C CNN "Supplier"
+F 5 "Vishay Intertechnology" H 1000 1000 60  0001 C CNN "Manufacturer"
+\t1    1000 2000
+\t1    0    0    -1  
+$EndComp
+$Comp
+L Device:C C1
+U 1 1 5A000002
+P 1500 2500
+F 0 "C1" H 1070 1046 50  0000 L CNN
+F 1 "100n" H 1070 955 50  0000 L CNN
+F 2 "C_0603" V 930 1000 50  0001 C CNN
+F 3 "" H 1000 1000 50  0001 C CNN
+\t1    1500 2500
+\t1    0    0    -1  
+$EndComp
+$EndSCHEMATC
+'''
+
+
+class TestSpliceSave(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.schfile = os.path.join(self.directory.name, "test.sch")
+        self.projectFile = os.path.join(self.directory.name, "test.pro")
+        open(self.projectFile, "wt").close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def save(self, content):
+        """ writes the content into the sheet, modifies the components
+        and returns the sheet written by splicing and by the full
+        rewrite
+        """
+        with open(self.schfile, "wb") as f:
+            f.write(content)
+        project = projectParser(
+            self.projectFile,
+            iniSettings(os.path.join(self.directory.name, "test.bmz")))
+        project.parseComponents()
+        project.updateComponents(['R1'], {headernames.SUPPLIER: 'RS',
+                                          headernames.DATASHEET: 'r.pdf'})
+        project.updateComponents(['C1'], {headernames.SUPPLIER: 'Würth',
+                                          headernames.SUPPNO: '885012'})
+        self.assertTrue(project.spliceLegacySheet(self.schfile))
+        with open(self.schfile + "tmp", "rb") as f:
+            spliced = f.read()
+        project.writeLegacySheet(self.schfile)
+        with open(self.schfile + "tmp", "rb") as f:
+            rewritten = f.read()
+        return project, spliced, rewritten
+
+    def testSameAsRewrite(self):
+        content = SHEET.replace('Vishay', 'Vishay Böhm').encode('utf-8')
+        _, spliced, rewritten = self.save(content)
+        self.assertEqual(spliced, rewritten)
+        self.assertIn(b'F 5 "885012" H 1500 2500 60  0001 C CNN "Supplier no"',
+                      spliced)
+
+    def testLineEndingsKept(self):
+        content = SHEET.replace('\n', '\r\n').encode('utf-8')
+        _, spliced, rewritten = self.save(content)
+        self.assertEqual(spliced.replace(b'\r\n', b'\n'), rewritten)
+        self.assertNotIn(b'\n', spliced.replace(b'\r\n', b''))
+
+    def testLayoutFromParseCache(self):
+        content = SHEET.replace('Vishay', 'Vishay Böhm').encode('utf-8')
+        self.save(content)
+        # the second project takes the layout of the sheet from the
+        # parse cache, the sheet is not tokenised again
+        with mock.patch.object(sheetParser, 'parse',
+                               side_effect=AssertionError):
+            _, spliced, rewritten = self.save(content)
+        self.assertEqual(spliced, rewritten)
+
+    def testModifiedSheet(self):
+        project, _, _ = self.save(SHEET.encode('utf-8'))
+        # layout does not correspond to the modified file
+        with open(self.schfile, "ab") as f:
+            f.write(b'\n')
+        self.assertFalse(project.spliceLegacySheet(self.schfile))
+
+
+if __name__ == '__main__':
+    unittest.main()
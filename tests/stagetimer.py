@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+
+"""
+Unit test for timing of the operation stages
+"""
+import os
+import json
+import pstats
+import tempfile
+import threading
+import unittest
+from BOMizator.stagetimer import stageTimer
+
+
+class TestStageTimer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.timingFile = os.path.join(self.directory.name, "timing.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testStagesAccumulate(self):
+        timer = stageTimer(self.timingFile)
+        timer.begin("openProject")
+        for sheet in range(3):
+            with timer.stage("parsing") as items:
+                items['sheets'] = 1
+        with timer.stage("column resizing"):
+            pass
+        summary = timer.finish()
+        self.assertEqual(summary['operation'], "openProject")
+        self.assertEqual([stage['stage'] for stage in summary['stages']],
+                         ["parsing", "column resizing"])
+        self.assertEqual(summary['stages'][0]['items'], {'sheets': 3})
+        self.assertGreaterEqual(summary['duration'],
+                                summary['stages'][0]['duration'])
+
+    def testSummaryLines(self):
+        timer = stageTimer(self.timingFile)
+        for operation in ["saveProject", "tabChanged"]:
+            timer.begin(operation)
+            with timer.stage("stage"):
+                pass
+            timer.finish()
+        with open(self.timingFile) as f:
+            lines = list(map(json.loads, f))
+        self.assertEqual([line['operation'] for line in lines],
+                         ["saveProject", "tabChanged"])
+
+    def testIgnoredWithoutOperation(self):
+        timer = stageTimer(self.timingFile)
+        with timer.stage("parsing") as items:
+            items['sheets'] = 1
+        self.assertIsNone(timer.finish())
+        self.assertFalse(os.path.exists(self.timingFile))
+
+    def testProfileDumped(self):
+        profiles = os.path.join(self.directory.name, "profiles")
+        timer = stageTimer(profileDirectory=profiles)
+        timer.begin("export_bom")
+        sorted(range(1000), key=str)
+        timer.finish()
+        fname = os.path.join(profiles, "export_bom-1.prof")
+        self.assertTrue(os.path.isfile(fname))
+        pstats.Stats(fname)
+
+    def testThreadProfiled(self):
+        profiles = os.path.join(self.directory.name, "profiles")
+        timer = stageTimer(profileDirectory=profiles)
+        timer.begin("openProject")
+
+        def parse():
+            return sorted(range(1000), key=str)
+
+        def load():
+            with timer.profile():
+                parse()
+        thread = threading.Thread(target=load)
+        thread.start()
+        thread.join()
+        timer.finish()
+        stats = pstats.Stats(os.path.join(profiles, "openProject-1.prof"))
+        self.assertIn('parse', [name for _, _, name in stats.stats])
+
+
+if __name__ == '__main__':
+    unittest.main()
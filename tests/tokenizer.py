@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2006 David Belohrad
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street,
+# Fifth Floor, Boston, MA  02110-1301, USA.
+#
+# You can dowload a copy of the GNU General Public License here:
+# http://www.gnu.org/licenses/gpl.txt
+#
+# Author: David Belohrad
+# Email:  david.belohrad@cern.ch
+#
+
+"""
+Unit test for schematic lines tokenizer
+"""
+import shlex
+import unittest
+from BOMizator.schtokenizer import schTokenizer
+
+
+class TestTokenizer(unittest.TestCase):
+
+    def setUp(self):
+        self.tokenize = schTokenizer()
+
+    def testLineWithoutQuotes(self):
+        self.assertEqual(self.tokenize("L Device:R R12\n"),
+                         ['L', 'Device:R', 'R12'])
+        self.assertEqual(self.tokenize("P 5500 3700"),
+                         ['P', '5500', '3700'])
+
+    def testQuotedFieldWithSpaces(self):
+        line = 'F 5 "FARNELL" H 5900 5800 60  0001 C CNN "supplier reference"'
+        self.assertEqual(self.tokenize(line),
+                         ['F', '5', 'FARNELL', 'H', '5900', '5800', '60',
+                          '0001', 'C', 'CNN', 'supplier reference'])
+
+    def testEmptyField(self):
+        self.assertEqual(self.tokenize('F 3 "" H 1350 -1100 50  0001 C CNN'),
+                         ['F', '3', '', 'H', '1350', '-1100', '50',
+                          '0001', 'C', 'CNN'])
+
+    def testEscapedQuotes(self):
+        self.assertEqual(self.tokenize(r'F 1 "10\" rack \\ 1U" H 0 0'),
+                         ['F', '1', '10" rack \\ 1U', 'H', '0', '0'])
+
+    def testUnterminatedQuote(self):
+        with self.assertRaises(ValueError):
+            self.tokenize('F 1 "10k H 0 0')
+
+    def testSameAsShlex(self):
+        lines = ['F 0 "U2" H 6450 6900 50  0000 C CNN',
+                 'F 2 "Housings_SOIC:SOIC-28W_7.5x17.9mm" H 1 2 50  0001 L CNN',
+                 'F 4 "a"b\'c d\' H\t1 2',
+                 'F 6 "x\\y" \\"z H',
+                 '\t1    5500 3700\n']
+        for line in lines:
+            self.assertEqual(self.tokenize(line), shlex.split(line))
+
+
+if __name__ == '__main__':
+    unittest.main()